@@ -100,10 +100,20 @@ public:
     return mLastTimestamp;
   }
 
+  /**
+   * @brief Returns the number of track steps run so far
+   *
+   */
+  inline uint64_t getStepCount() const
+  {
+    return mStepCount;
+  }
+
 private:
   TrackManager mTrackManager;
   DistanceType mDistanceType;
   double mDistanceThreshold{5.0};
+  uint64_t mStepCount{0};
 
   std::chrono::system_clock::time_point mLastTimestamp;
 };
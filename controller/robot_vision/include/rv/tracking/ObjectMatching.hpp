@@ -48,5 +48,20 @@ void match(const std::vector<TrackedObject> &tracks,
             std::vector<size_t> &unassignedMeasurements,
             const DistanceType &distanceType, double threshold);
 
+/**
+ * @brief Sets the number of threads used to compute the cost matrix in match()
+ *
+ * Defaults to 1, which computes the matrix on the calling thread. A value of 0 uses all hardware
+ * threads. Each call to match() starts and joins its own threads, so when several trackers match
+ * concurrently the total number of threads is the number of trackers times this value. Small
+ * matrices are always computed on the calling thread.
+ */
+void setMatchingThreads(int threads);
+
+/**
+ * @brief Returns the number of threads used to compute the cost matrix in match()
+ */
+int getMatchingThreads();
+
 } // namespace tracking
 } // namespace rv
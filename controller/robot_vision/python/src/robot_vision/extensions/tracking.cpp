@@ -20,6 +20,7 @@
 #include <opencv2/core.hpp>
 #include <pybind11/chrono.h>
 #include <pybind11/eigen.h>
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <rv/tracking/MultiModelKalmanEstimator.hpp>
@@ -29,11 +30,112 @@
 #include <rv/tracking/TrackedObject.hpp>
 #include <rv/tracking/Classification.hpp>
 #include <chrono>
+#include <stdexcept>
+#include <string>
 #include <vector>
 #include <Eigen/Dense>
 
 namespace py = pybind11;
 
+using DoubleArray = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+// Attributes used to map reliable tracks back to the rows of the measurement array
+static const std::string MeasurementStepAttribute = "measurement_step";
+static const std::string MeasurementIndexAttribute = "measurement_index";
+
+// Columns of the measurement array passed to MultipleObjectTracker.track_arrays()
+static const py::ssize_t MeasurementColumns = 7;
+// Columns of the state array returned by MultipleObjectTracker.track_arrays()
+static const py::ssize_t StateColumns = 8;
+
+/**
+ * @brief Run one track step from contiguous arrays and return the reliable tracks as arrays
+ *
+ * Each measurement row holds x, y, z, length, width, height and yaw. Each state row
+ * holds x, y, z, vx, vy, ax, ay and yaw. The returned measurement index is the row of
+ * the measurement that corrected the track in this step, or -1 if it was not measured.
+ */
+static py::tuple trackArrays(rv::tracking::MultipleObjectTracker &tracker,
+                             const DoubleArray &measurements,
+                             const DoubleArray &classifications,
+                             const std::chrono::system_clock::time_point &timestamp,
+                             const rv::tracking::DistanceType &distanceType,
+                             double distanceThreshold,
+                             double scoreThreshold)
+{
+  if (measurements.ndim() != 2 || measurements.shape(1) != MeasurementColumns)
+  {
+    throw std::invalid_argument("measurements must be an (N, 7) array");
+  }
+  if (classifications.ndim() != 2 || classifications.shape(0) != measurements.shape(0))
+  {
+    throw std::invalid_argument("classifications must be an (N, C) array with one row per measurement");
+  }
+
+  auto rows = measurements.unchecked<2>();
+  auto classes = classifications.unchecked<2>();
+  const std::string step = std::to_string(tracker.getStepCount() + 1);
+
+  std::vector<rv::tracking::TrackedObject> objects(rows.shape(0));
+  for (py::ssize_t i = 0; i < rows.shape(0); ++i)
+  {
+    auto &object = objects[i];
+    object.x = rows(i, 0);
+    object.y = rows(i, 1);
+    object.z = rows(i, 2);
+    object.length = rows(i, 3);
+    object.width = rows(i, 4);
+    object.height = rows(i, 5);
+    object.yaw = rows(i, 6);
+    object.classification.resize(classes.shape(1));
+    for (py::ssize_t j = 0; j < classes.shape(1); ++j)
+    {
+      object.classification(j) = classes(i, j);
+    }
+    object.attributes[MeasurementStepAttribute] = step;
+    object.attributes[MeasurementIndexAttribute] = std::to_string(i);
+  }
+
+  std::vector<rv::tracking::TrackedObject> tracks;
+  {
+    py::gil_scoped_release release;
+    tracker.track(std::move(objects), timestamp, distanceType, distanceThreshold, scoreThreshold);
+    tracks = tracker.getReliableTracks();
+  }
+
+  const py::ssize_t count = tracks.size();
+  py::array_t<int32_t> ids(count);
+  py::array_t<double> states({count, StateColumns});
+  py::array_t<int64_t> indices(count);
+  auto idsView = ids.mutable_unchecked<1>();
+  auto statesView = states.mutable_unchecked<2>();
+  auto indicesView = indices.mutable_unchecked<1>();
+
+  for (py::ssize_t i = 0; i < count; ++i)
+  {
+    auto const &track = tracks[i];
+    idsView(i) = track.id;
+    statesView(i, 0) = track.x;
+    statesView(i, 1) = track.y;
+    statesView(i, 2) = track.z;
+    statesView(i, 3) = track.vx;
+    statesView(i, 4) = track.vy;
+    statesView(i, 5) = track.ax;
+    statesView(i, 6) = track.ay;
+    statesView(i, 7) = track.yaw;
+
+    indicesView(i) = -1;
+    auto stepIt = track.attributes.find(MeasurementStepAttribute);
+    auto indexIt = track.attributes.find(MeasurementIndexAttribute);
+    if (stepIt != track.attributes.end() && indexIt != track.attributes.end() && stepIt->second == step)
+    {
+      indicesView(i) = std::stoll(indexIt->second);
+    }
+  }
+
+  return py::make_tuple(ids, states, indices);
+}
+
 PYBIND11_MODULE(tracking, tracking)
 {
   tracking.doc() = R"pbdoc(
@@ -302,6 +404,18 @@ py::class_<rv::tracking::Classification>(tracking, "Classification", "Classifica
          py::arg("distance_type"),
          py::arg("distance_threshold"),
          py::arg("probability_threshold") = 0.5)
+    .def("track_arrays",
+         &trackArrays,
+         "Trigger the track step for the next timestamp from an (N, 7) array of measurements (x, y, z, length, width, height, yaw) and an (N, C) array of classifications. "
+         "Returns a tuple (ids, states, measurement_indices) for the reliable tracks, where states is an (M, 8) array (x, y, z, vx, vy, ax, ay, yaw) "
+         "and measurement_indices holds the measurement row that updated each track in this step or -1.",
+         py::arg("measurements"),
+         py::arg("classifications"),
+         py::arg("timestamp"),
+         py::arg("distance_type"),
+         py::arg("distance_threshold"),
+         py::arg("probability_threshold") = 0.5)
+    .def("step_count", &rv::tracking::MultipleObjectTracker::getStepCount, "Returns the number of track steps run so far.")
     .def("timestamp", &rv::tracking::MultipleObjectTracker::getTimestamp, "Read current timestamp.")
     .def("get_tracks", &rv::tracking::MultipleObjectTracker::getTracks, "Returns a list of all active tracks")
     .def("get_reliable_tracks",
@@ -342,6 +456,13 @@ py::class_<rv::tracking::Classification>(tracking, "Classification", "Classifica
           py::arg("distance_type") = rv::tracking::DistanceType::MultiClassEuclidean,
           py::arg("threshold") = 1.0);
 
+     tracking.def("set_matching_threads", &rv::tracking::setMatchingThreads,
+          "Set the number of threads used to compute the cost matrix in match(). Defaults to 1, 0 uses all hardware threads.",
+          py::arg("threads"));
+
+     tracking.def("matching_threads", &rv::tracking::getMatchingThreads,
+          "Returns the number of threads used to compute the cost matrix in match().");
+
      tracking.def("angle_difference",
         &rv::angleDifference,
         "Calculates the difference between two angles, wraps the angles to any multiple of 2*pi.");
@@ -166,6 +166,47 @@ class TestTracking(unittest.TestCase):
     self.assertAlmostEqual(tracked_object.vx, vx, places=2)
     self.assertAlmostEqual(tracked_object.vy, vy, places=2)
 
+  def test_track_arrays_matches_object_api(self):
+    """
+    Tests the array based track step against the TrackedObject based one
+    """
+    tracker_config = tracking.TrackManagerConfig()
+    tracker_config.max_number_of_unreliable_frames = 3
+    tracker_config.motion_models = [tracking.MotionModel.CV]
+    list_tracker = tracking.MultipleObjectTracker(tracker_config)
+    array_tracker = tracking.MultipleObjectTracker(tracker_config)
+    initial_timestamp = datetime.now()
+    step = 0.1
+    starts = [(0., 0.), (10., 5.)]
+    vx = 1.0
+
+    for t in np.arange(step, 2., step):
+      timestamp = initial_timestamp + timedelta(seconds = t)
+      objects = [create_object_at_location(x=x0 + vx * t, y=y0, classification=np.array([0.9, 0.1]))
+                 for x0, y0 in starts]
+      list_tracker.track(objects, timestamp, tracking.DistanceType.Euclidean, 1.0)
+
+      measurements = np.array([(x0 + vx * t, y0, 0., 1., 1., 1., 0.) for x0, y0 in starts])
+      classifications = np.tile([0.9, 0.1], (len(starts), 1))
+      ids, states, indices = array_tracker.track_arrays(measurements, classifications, timestamp,
+                                                        tracking.DistanceType.Euclidean, 1.0)
+
+    tracked_objects = sorted(list_tracker.get_reliable_tracks(), key=lambda obj: obj.id)
+    self.assertEqual(len(tracked_objects), len(starts))
+    self.assertEqual(sorted(ids.tolist()), [obj.id for obj in tracked_objects])
+    self.assertEqual(states.shape, (len(starts), 8))
+    for track_id, state, index in zip(ids, states, indices):
+      tracked_object = next(obj for obj in tracked_objects if obj.id == track_id)
+      self.assertAlmostEqual(state[0], tracked_object.x, places=6)
+      self.assertAlmostEqual(state[3], tracked_object.vx, places=6)
+      self.assertAlmostEqual(measurements[index][1], state[1], places=2)
+
+    # Tracks not measured in a step have no measurement index
+    timestamp = initial_timestamp + timedelta(seconds = 2.)
+    ids, states, indices = array_tracker.track_arrays(np.empty((0, 7)), np.empty((0, 2)), timestamp,
+                                                      tracking.DistanceType.Euclidean, 1.0)
+    self.assertEqual(indices.tolist(), [-1] * len(ids))
+
 class TestMultiModelKalmanEstimator(unittest.TestCase):
   def test_constant_velocity_single_object_with_noise(self):
     classification_data = tracking.ClassificationData(['Car', 'Bike', 'Pedestrian'])
@@ -332,6 +373,37 @@ class TestMatchFunction(unittest.TestCase):
     self.assertTrue(len(unassigned_tracks) == 1)
     self.assertTrue(len(unanssigend_objects) == 2)
 
+  def test_match_is_independent_of_threads(self):
+    classification_data = tracking.ClassificationData(['Car', 'Bike', 'Pedestrian'])
+    classification = classification_data.classification('Car', 0.9)
+
+    tracks = []
+    measurements = []
+    for idx in range(200):
+      x, y = (idx % 20) * 3.0, (idx // 20) * 3.0
+      tracks.append(create_object_at_location(x=x, y=y, classification=classification))
+      # every other measurement is too far from any track to be matched
+      offset = 0.2 if idx % 2 == 0 else 1.5
+      measurements.append(create_object_at_location(x=x + offset, y=y - offset, classification=classification))
+
+    self.assertEqual(tracking.matching_threads(), 1)
+    results = []
+    for threads in [1, 4]:
+      tracking.set_matching_threads(threads)
+      self.assertEqual(tracking.matching_threads(), threads)
+      for distance_type in [tracking.DistanceType.Euclidean, tracking.DistanceType.MultiClassEuclidean]:
+        results.append(tracking.match(tracks, measurements, distance_type=distance_type, threshold=1.0))
+    tracking.set_matching_threads(1)
+
+    assignments, unassigned_tracks, unassigned_objects = results[0]
+    self.assertEqual(sorted(assignments), [(idx, idx) for idx in range(0, 200, 2)])
+    self.assertEqual(len(unassigned_tracks), 100)
+    self.assertEqual(len(unassigned_objects), 100)
+    for result in results[1:]:
+      self.assertEqual(sorted(result[0]), sorted(assignments))
+      self.assertEqual(sorted(result[1]), sorted(unassigned_tracks))
+      self.assertEqual(sorted(result[2]), sorted(unassigned_objects))
+
 class TestClassification(unittest.TestCase):
   def test_classification_functions(self):
     classification_data = tracking.ClassificationData(['Car', 'Bike', 'Pedestrian'])
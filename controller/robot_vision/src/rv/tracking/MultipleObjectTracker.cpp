@@ -61,6 +61,8 @@ void MultipleObjectTracker::track(std::vector<tracking::TrackedObject> objects,
 void MultipleObjectTracker::track(std::vector<tracking::TrackedObject> objects, const std::chrono::system_clock::time_point &timestamp,
                                   const DistanceType & distanceType, double distanceThreshold, double scoreThreshold)
 {
+  mStepCount++;
+
   if (objects.empty())
   {
     mTrackManager.predict(timestamp);
@@ -15,8 +15,14 @@
 //
 // ----------------- END LICENSE BLOCK -----------------------------------
 
-#include <functional>
+#include <algorithm>
+#include <atomic>
+#include <cmath>
+#include <cstdint>
+#include <memory>
 #include <numeric>
+#include <thread>
+#include <unordered_map>
 #include <opencv2/core.hpp>
 
 #include "rv/tracking/ObjectMatching.hpp"
@@ -31,6 +37,140 @@ namespace tracking {
 
 constexpr double kDefaultClassBoundValue = 1000.;
 
+// Below this many track/measurement pairs the cost matrix is filled on the calling thread
+constexpr size_t kMinPairsPerThread = 4096;
+
+namespace {
+
+// Number of threads used to fill the cost matrix, 0 uses all hardware threads.
+// Defaults to the calling thread only, since several trackers may match at the same time.
+std::atomic<int> matchingThreads{1};
+
+/**
+ * @brief Uniform grid over measurement positions with cells of the gating distance
+ *
+ * Only measurements in the 3x3 cells around a track can be closer than the
+ * gating distance, so only those are scored.
+ */
+class MeasurementGrid
+{
+public:
+  MeasurementGrid(const std::vector<TrackedObject> &measurements, double cellSize)
+    : mCellSize(cellSize)
+  {
+    for (size_t j = 0; j < measurements.size(); ++j)
+    {
+      mCells[key(cellOf(measurements[j].x), cellOf(measurements[j].y))].push_back(j);
+    }
+  }
+
+  void candidates(const TrackedObject &track, std::vector<size_t> &result) const
+  {
+    result.clear();
+    int64_t cx = cellOf(track.x);
+    int64_t cy = cellOf(track.y);
+    for (int64_t dx = -1; dx <= 1; ++dx)
+    {
+      for (int64_t dy = -1; dy <= 1; ++dy)
+      {
+        auto it = mCells.find(key(cx + dx, cy + dy));
+        if (it != mCells.end())
+        {
+          result.insert(result.end(), it->second.begin(), it->second.end());
+        }
+      }
+    }
+  }
+
+private:
+  int64_t cellOf(double value) const
+  {
+    return static_cast<int64_t>(std::floor(value / mCellSize));
+  }
+
+  static uint64_t key(int64_t cx, int64_t cy)
+  {
+    return (static_cast<uint64_t>(cx) << 32) ^ (static_cast<uint64_t>(cy) & 0xffffffffu);
+  }
+
+  double mCellSize;
+  std::unordered_map<uint64_t, std::vector<size_t>> mCells;
+};
+
+/**
+ * @brief Fill the cost matrix rows in parallel, scoring only gated candidates if a grid is given
+ */
+template <typename DistanceFunction>
+void fillCostMatrix(const std::vector<TrackedObject> &tracks,
+                    const std::vector<TrackedObject> &measurements,
+                    const MeasurementGrid *grid, double boundValue,
+                    DistanceFunction distanceFunction,
+                    apollo::perception::common::SecureMat<double> &costMatrix)
+{
+  auto fillRows = [&](size_t begin, size_t end) {
+    std::vector<size_t> candidates;
+    for (size_t i = begin; i < end; ++i)
+    {
+      if (grid == nullptr)
+      {
+        for (size_t j = 0; j < measurements.size(); ++j)
+        {
+          costMatrix(i, j) = distanceFunction(measurements[j], tracks[i]);
+        }
+        continue;
+      }
+
+      for (size_t j = 0; j < measurements.size(); ++j)
+      {
+        costMatrix(i, j) = boundValue;
+      }
+      grid->candidates(tracks[i], candidates);
+      for (auto const &j : candidates)
+      {
+        costMatrix(i, j) = distanceFunction(measurements[j], tracks[i]);
+      }
+    }
+  };
+
+  size_t threads = static_cast<size_t>(getMatchingThreads());
+  threads = std::min({threads, tracks.size(), tracks.size() * measurements.size() / kMinPairsPerThread});
+  if (threads <= 1)
+  {
+    fillRows(0, tracks.size());
+    return;
+  }
+
+  std::vector<std::thread> workers;
+  workers.reserve(threads - 1);
+  size_t rowsPerThread = (tracks.size() + threads - 1) / threads;
+  for (size_t begin = rowsPerThread; begin < tracks.size(); begin += rowsPerThread)
+  {
+    workers.emplace_back(fillRows, begin, std::min(begin + rowsPerThread, tracks.size()));
+  }
+  fillRows(0, std::min(rowsPerThread, tracks.size()));
+  for (auto &worker : workers)
+  {
+    worker.join();
+  }
+}
+
+} // namespace
+
+void setMatchingThreads(int threads)
+{
+  matchingThreads = std::max(0, threads);
+}
+
+int getMatchingThreads()
+{
+  int threads = matchingThreads;
+  if (threads <= 0)
+  {
+    threads = std::max(1u, std::thread::hardware_concurrency());
+  }
+  return threads;
+}
+
 double calculateMulticlassScaledDistance(const TrackedObject &measurement, const TrackedObject &track)
 {
   auto conflict = rv::tracking::classification::distance(measurement.classification, track.classification);
@@ -90,43 +230,40 @@ void match(const std::vector<TrackedObject> &tracks,
   }
 
   apollo::perception::lidar::BipartiteGraphMatcherOptions matcherOptions;
-  std::function<double(const TrackedObject &, const TrackedObject &)> distanceFunction;
+  matcherOptions.cost_thresh = threshold;
+  matcherOptions.bound_value = kDefaultClassBoundValue;
+
+  apollo::perception::common::SecureMat<double> *costMatrix = matcher.cost_matrix();
+  costMatrix->Resize(tracks.size(), measurements.size());
+
+  // Euclidean based costs are never below the planar distance, so pairs further apart
+  // than the threshold can be skipped. Mahalanobis based costs cannot be gated this way.
+  bool gated = threshold > 0. && threshold < matcherOptions.bound_value
+    && (distanceType == DistanceType::Euclidean || distanceType == DistanceType::MultiClassEuclidean);
+  std::unique_ptr<MeasurementGrid> grid;
+  if (gated)
+  {
+    grid.reset(new MeasurementGrid(measurements, threshold));
+  }
+
   switch (distanceType)
   {
     case DistanceType::MCEMahalanobis:
-      distanceFunction = std::bind(&calculateCompundDistance, std::placeholders::_1, std::placeholders::_2);
-      matcherOptions.cost_thresh = threshold;
-      matcherOptions.bound_value = kDefaultClassBoundValue;
+      fillCostMatrix(tracks, measurements, grid.get(), matcherOptions.bound_value, &calculateCompundDistance, *costMatrix);
       break;
     case DistanceType::Mahalanobis:
-      distanceFunction = std::bind(&calculateMahalanobisDistance, std::placeholders::_1, std::placeholders::_2);
-      matcherOptions.cost_thresh = threshold;
-      matcherOptions.bound_value = kDefaultClassBoundValue;
+      fillCostMatrix(tracks, measurements, grid.get(), matcherOptions.bound_value, &calculateMahalanobisDistance, *costMatrix);
       break;
     case DistanceType::MultiClassEuclidean:
-      distanceFunction = std::bind(&calculateMulticlassScaledDistance, std::placeholders::_1, std::placeholders::_2);
-      matcherOptions.cost_thresh = threshold;
-      matcherOptions.bound_value = kDefaultClassBoundValue;
+      fillCostMatrix(tracks, measurements, grid.get(), matcherOptions.bound_value, &calculateMulticlassScaledDistance, *costMatrix);
       break;
     case DistanceType::Euclidean:
     default:
-      distanceFunction = std::bind(&calculateEuclideanDistance, std::placeholders::_1, std::placeholders::_2);
-      matcherOptions.cost_thresh = threshold;
-      matcherOptions.bound_value = kDefaultClassBoundValue;
+      fillCostMatrix(tracks, measurements, grid.get(), matcherOptions.bound_value, &calculateEuclideanDistance, *costMatrix);
       break;
   }
 
-  apollo::perception::common::SecureMat<double> *costMatrix = matcher.cost_matrix();
-  costMatrix->Resize(tracks.size(), measurements.size());
-
-  for (size_t i = 0; i < tracks.size(); ++i)
-  {
-    for (size_t j = 0; j < measurements.size(); ++j)
-    {
-      (*costMatrix)(i, j) = distanceFunction(measurements[j], tracks[i]);
-    }
-  }
-
+  // The matcher splits the gated cost matrix into connected components and solves each one separately
   matcher.Match(matcherOptions, &assignments, &unassignedTracks, &unassignedMeasurements);
 }
 
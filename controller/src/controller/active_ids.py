@@ -0,0 +1,100 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import threading
+
+class ActiveIDs:
+  """
+  Database IDs assigned to the active tracker IDs of a UUIDManager.
+
+  The forward map holds an immutable (database_id, similarity) tuple for each
+  tracker ID and the reverse map the tracker IDs each database ID is assigned
+  to, so both lookups are constant time. Writers hold the lock and update both
+  maps together. Reading one tracker ID or database ID does not take the lock,
+  a dict lookup returns either the previous or the new entry, never a partly
+  updated one.
+  """
+
+  def __init__(self):
+    self.forward = {}
+    self.reverse = {}
+    self.lock = threading.RLock()
+    return
+
+  def __len__(self):
+    return len(self.forward)
+
+  def __contains__(self, track_id):
+    return track_id in self.forward
+
+  def get(self, track_id, default=None):
+    """
+    @param  track_id  Tracker ID
+    @return (database_id, similarity) tuple of the track, or default
+    """
+    return self.forward.get(track_id, default)
+
+  def isAssigned(self, database_id):
+    """
+    @param  database_id  ID from the database
+    @return True if any active track has the database ID
+    """
+    return database_id in self.reverse
+
+  def add(self, track_id):
+    """Adds a track without a database ID unless it is already active"""
+    with self.lock:
+      if track_id not in self.forward:
+        self.forward[track_id] = (None, None)
+    return
+
+  def assign(self, track_id, database_id, similarity=None):
+    """
+    Sets the database ID and similarity of a track
+
+    @param  track_id     Tracker ID
+    @param  database_id  ID from the database, or None
+    @param  similarity   Similarity score of the match, None if the ID is not a match
+    """
+    with self.lock:
+      previous = self.forward.get(track_id, None)
+      if previous is not None and previous[0] is not None:
+        self._unindex(previous[0], track_id)
+      self.forward[track_id] = (database_id, similarity)
+      if database_id is not None:
+        self.reverse.setdefault(database_id, set()).add(track_id)
+    return
+
+  def prune(self, active_track_ids):
+    """
+    Removes the tracks that are no longer active in one pass over the tracks
+
+    @param  active_track_ids  The ids of the tracks currently tracked by the tracker
+    @return List of (track_id, (database_id, similarity)) of the removed tracks
+    """
+    active_tracks = active_track_ids if isinstance(active_track_ids, (set, frozenset)) \
+      else set(active_track_ids)
+    removed = []
+    with self.lock:
+      for track_id in [k for k in self.forward if k not in active_tracks]:
+        entry = self.forward.pop(track_id)
+        if entry[0] is not None:
+          self._unindex(entry[0], track_id)
+        removed.append((track_id, entry))
+    return removed
+
+  def _unindex(self, database_id, track_id):
+    track_ids = self.reverse.get(database_id, None)
+    if track_ids is not None:
+      track_ids.discard(track_id)
+      if not track_ids:
+        del self.reverse[database_id]
+    return
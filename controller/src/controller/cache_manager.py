@@ -9,6 +9,9 @@
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
 
+import threading
+from contextlib import nullcontext
+
 from controller.scene import Scene
 from scene_common import log
 from scene_common.rest_client import RESTClient
@@ -16,57 +19,200 @@ from scene_common.timestamp import get_epoch_time
 
 REFRESH_TIME = 60
 
+class SceneChanges:
+  """Scenes fetched from the REST server that are not in the cache yet"""
+
+  def __init__(self, versions):
+    self.versions = versions
+    self.scenes = {}
+    self.child_scenes = {}
+    return
+
+  def merge(self, newer):
+    """Adds the scenes of a later fetch, which also replaces the list of scenes"""
+    self.versions = newer.versions
+    self.scenes.update(newer.scenes)
+    self.child_scenes.update(newer.child_scenes)
+    return self
+
 class CacheManager:
+  """
+  Caches the scenes of the REST server.
+
+  Every scene has a version which changes whenever the scene or anything in it
+  is saved, so a refresh only fetches the scenes that changed. Invalidating the
+  cache fetches them in a background thread. Fetched scenes are applied by the
+  next lookup, so a scene is never modified while it is processing data, and
+  the lookup maps are replaced instead of being modified.
+  """
+
   def __init__(self, rest_url, rest_auth, root_cert, tracker_config_data):
     self.cached_child_transforms_by_uid = {}
+    self.cached_scenes_by_uid = {}
+    self._cached_scenes_by_cameraID = {}
+    self._cached_scenes_by_sensorID = {}
+    self._cached_child_scenes_by_uid = {}
+    self._cache_refreshed = None
     self.camera_parameters = {}
     self.tracker_config_data = tracker_config_data
     self.rest = RESTClient(rest_url, rootcert=root_cert, auth=rest_auth)
+
+    # Only used while holding fetch_lock
+    self._fetched_versions = {}
+    self._fetched_since = None
+    self.fetch_lock = threading.Lock()
+
+    self.condition = threading.Condition()
+    self.changes = None
+    self.refresh_requested = False
+    self.running = False
+    self.thread = None
+    # Context in which cached scenes may be modified
+    self.update_guard = nullcontext
+    return
+
+  def start(self):
+    """Starts the thread that fetches changed scenes after invalidate() and every REFRESH_TIME"""
+    self.running = True
+    self.thread = threading.Thread(target=self._run, daemon=True, name="scene-cache")
+    self.thread.start()
+    return
+
+  def stop(self):
+    with self.condition:
+      self.running = False
+      self.condition.notify_all()
+    if self.thread is not None:
+      self.thread.join()
+      self.thread = None
+    return
+
+  def _run(self):
+    while True:
+      with self.condition:
+        if self.running and not self.refresh_requested:
+          self.condition.wait(REFRESH_TIME)
+        if not self.running:
+          break
+        self.refresh_requested = False
+      try:
+        self.fetchChanges()
+      except Exception as e:
+        log.error("Failed to refresh scenes", e)
     return
 
   def getAssets(self):
     return self.rest.getAssets({})
 
   def getChildScenes(self, scene_uid):
-    return self.rest.getChildScene({'parent': scene_uid})
+    """Child scenes of a scene, only fetched again after the scene changed"""
+    child_scenes = self._cached_child_scenes_by_uid.get(scene_uid, None)
+    if child_scenes is None:
+      child_scenes = self.rest.getChildScene({'parent': scene_uid})
+      if 'results' in child_scenes:
+        self._cached_child_scenes_by_uid[scene_uid] = child_scenes
+    return child_scenes
 
   def refreshScenes(self):
-    if not hasattr(self, 'cached_scenes_by_uid') or self.cached_scenes_by_uid is None:
-      self.cached_scenes_by_uid = {}
-    self._cached_scenes_by_cameraID = {}
-    self._cached_scenes_by_sensorID = {}
+    """Fetches the scenes that changed and applies them to the cache"""
+    self.fetchChanges()
+    self.applyChanges()
+    return
+
+  def fetchChanges(self):
+    """
+    Fetches the scenes whose version changed since the previous fetch and
+    queues them to be applied by applyChanges().
+    @return True if the scenes were fetched
+    """
+    with self.fetch_lock:
+      result = self.rest.getSceneUpdates(self._fetched_since)
+      if 'versions' not in result:
+        log.error("Failed to get scene updates, error code: ", result.statusCode)
+        return False
+
+      found = {scene_data['uid']: scene_data for scene_data in result['results']}
+      changes = SceneChanges(result['versions'])
+      fetched = {}
+      for uid, version in result['versions'].items():
+        if self._fetched_versions.get(uid) != version:
+          scene_data = found.get(uid, None)
+          if scene_data is None:
+            # Saved by a transaction that was not committed at the previous fetch
+            scene_data = self.rest.getScene(uid)
+            if 'uid' not in scene_data:
+              log.error("Failed to get scene", uid, scene_data.errors)
+              continue
+          self._fetchScene(scene_data, changes)
+        fetched[uid] = version
+
+      self._fetched_versions = fetched
+      self._fetched_since = result['timestamp']
 
-    result = self.rest.getScenes(None)
-    if 'results' not in result:
-      log.error("Failed to get results, error code: ", result.statusCode)
+    with self.condition:
+      self.changes = changes if self.changes is None else self.changes.merge(changes)
+    return True
+
+  def _fetchScene(self, scene_data, changes):
+    uid = scene_data['uid']
+    self._refreshCameras(scene_data)
+    if len(self.tracker_config_data):
+      scene_data["tracker_config"] = [self.tracker_config_data["max_unreliable_time"],
+                                    self.tracker_config_data["non_measurement_time_dynamic"],
+                                    self.tracker_config_data["non_measurement_time_static"]]
+
+    # New scenes load their map here rather than in the thread applying the changes
+    scene = None
+    if uid not in self.cached_scenes_by_uid:
+      scene = Scene.deserialize(scene_data)
+    changes.scenes[uid] = (scene_data, scene)
+
+    if scene_data.get('children'):
+      child_scenes = self.rest.getChildScene({'parent': uid})
+      if 'results' in child_scenes:
+        changes.child_scenes[uid] = child_scenes
+    else:
+      changes.child_scenes[uid] = {'results': []}
+    return
+
+  def applyChanges(self):
+    """Applies the fetched scenes and swaps in the new lookup maps"""
+    with self.condition:
+      changes = self.changes
+      self.changes = None
+    if changes is None:
       return
 
-    found = result['results']
-    old = set(self.cached_scenes_by_uid.keys())
-    new = set(x['uid'] for x in found)
-    deleted = old - new
-    for uid in deleted:
-      self.cached_scenes_by_uid.pop(uid, None)
-
-    for scene_data in found:
-      self._refreshCameras(scene_data)
-      if len(self.tracker_config_data):
-        scene_data["tracker_config"] = [self.tracker_config_data["max_unreliable_time"],
-                                      self.tracker_config_data["non_measurement_time_dynamic"],
-                                      self.tracker_config_data["non_measurement_time_static"]]
-
-      uid = scene_data['uid']
-      if uid not in self.cached_scenes_by_uid:
-        scene = Scene.deserialize(scene_data)
-      else:
-        scene = self.cached_scenes_by_uid[uid]
-        scene.updateScene(scene_data)
+    scenes = {uid: scene for uid, scene in self.cached_scenes_by_uid.items()
+              if uid in changes.versions}
+    child_scenes = {uid: child for uid, child in self._cached_child_scenes_by_uid.items()
+                    if uid in changes.versions and uid not in changes.scenes}
+    with self.update_guard():
+      for uid, (scene_data, scene) in changes.scenes.items():
+        if uid not in changes.versions:
+          continue
+        if uid in scenes:
+          scenes[uid].updateScene(scene_data)
+        elif scene is not None:
+          scenes[uid] = scene
+        else:
+          scenes[uid] = Scene.deserialize(scene_data)
+    for uid, child in changes.child_scenes.items():
+      if uid in scenes:
+        child_scenes[uid] = child
 
+    scenes_by_cameraID = {}
+    scenes_by_sensorID = {}
+    for scene in scenes.values():
       for cameraID in scene.cameras.keys():
-        self._cached_scenes_by_cameraID[cameraID] = scene
+        scenes_by_cameraID[cameraID] = scene
       for sensorID in scene.sensors.keys():
-        self._cached_scenes_by_sensorID[sensorID] = scene
-      self.cached_scenes_by_uid[scene.uid] = scene
+        scenes_by_sensorID[sensorID] = scene
+
+    self.cached_scenes_by_uid = scenes
+    self._cached_scenes_by_cameraID = scenes_by_cameraID
+    self._cached_scenes_by_sensorID = scenes_by_sensorID
+    self._cached_child_scenes_by_uid = child_scenes
     self._cache_refreshed = get_epoch_time()
     return
 
@@ -101,7 +247,10 @@ class CacheManager:
     intrinsics_changed = self.cameraParametersChanged(jdata, 'intrinsics')
     distortion_changed = self.cameraParametersChanged(jdata, 'distortion')
     if intrinsics_changed or distortion_changed:
-      self.refreshScenes()
+      # Saving the camera bumps the version of its scene, which is then fetched again
+      camera = self.rest.getCamera(jdata['id'])
+      if 'uid' in camera:
+        self._refreshCameras({'cameras': [camera]})
     return
 
   def updateCamera(self, cam):
@@ -122,12 +271,12 @@ class CacheManager:
     return False
 
   def checkRefresh(self):
-    now = get_epoch_time()
-    if not hasattr(self, 'cached_scenes_by_uid') \
-       or self.cached_scenes_by_uid is None \
-       or not hasattr(self, '_cache_refreshed'):
-       #or now - self._cache_refreshed > REFRESH_TIME:
+    if self._cache_refreshed is None \
+       or (self.thread is None and self.refresh_requested):
+      self.refresh_requested = False
       self.refreshScenes()
+    else:
+      self.applyChanges()
     return
 
   def allScenes(self):
@@ -151,7 +300,8 @@ class CacheManager:
     return self.cached_child_transforms_by_uid.get(childID, None)
 
   def invalidate(self):
-    self.cached_scenes_by_uid = None
-    if not hasattr(self, 'cached_child_transforms_by_uid') or self.cached_child_transforms_by_uid is None:
-      self.cached_child_transforms_by_uid = {}
+    """Fetches the scenes that changed, in the background once start() was called"""
+    with self.condition:
+      self.refresh_requested = True
+      self.condition.notify_all()
     return
@@ -13,18 +13,68 @@ import numpy as np
 
 from controller.scene import TripwireEvent
 from scene_common.earth_lla import convertECEFToLLA
-from scene_common.geometry import DEFAULTZ, Point, Size
+from scene_common.geometry import DEFAULTZ, Point
 from scene_common.timestamp import get_iso_time
 
 
-def buildDetectionsDict(objects, scene):
+class DetectionsCache:
+  """
+  Per frame cache of published object dictionaries and their encoded form.
+
+  The same object is published on the scene topic, every region topic that
+  contains it and in events. The cache builds its dictionary and encoded
+  fragment once per frame, keyed on the object gid and the frame timestamp.
+  Cached dictionaries are shared and must not be modified.
+  """
+
+  def __init__(self, scene, when):
+    """
+    @param  scene  Scene the objects belong to
+    @param  when   Timestamp of the frame being published
+    """
+    self.scene = scene
+    self.when = when
+    self.dicts = {}
+    self.fragments = {}
+    return
+
+  def objectDict(self, obj, update_visibility=False):
+    aobj = obj.object if isinstance(obj, TripwireEvent) else obj
+    key = (aobj.gid, self.when, update_visibility)
+    obj_dict = self.dicts.get(key)
+    if obj_dict is None:
+      obj_dict = prepareObjDict(self.scene, aobj, update_visibility)
+      self.dicts[key] = obj_dict
+    if isinstance(obj, TripwireEvent):
+      obj_dict = dict(obj_dict, direction=obj.direction)
+    return obj_dict
+
+  def fragment(self, obj, codec, update_visibility=False):
+    """
+    Returns the object dictionary encoded with the codec.
+    """
+    if isinstance(obj, TripwireEvent):
+      return codec.encodeFragment(self.objectDict(obj, update_visibility))
+    key = (obj.gid, self.when, update_visibility, codec.name)
+    fragment = self.fragments.get(key)
+    if fragment is None:
+      fragment = codec.encodeFragment(self.objectDict(obj, update_visibility))
+      self.fragments[key] = fragment
+    return fragment
+
+def buildDetectionsDict(objects, scene, cache=None):
   result_dict = {}
   for obj in objects:
-    obj_dict = prepareObjDict(scene, obj, False)
+    if cache is not None:
+      obj_dict = cache.objectDict(obj)
+    else:
+      obj_dict = prepareObjDict(scene, obj, False)
     result_dict[obj_dict['id']] = obj_dict
   return result_dict
 
-def buildDetectionsList(objects, scene, update_visibility=False):
+def buildDetectionsList(objects, scene, update_visibility=False, cache=None):
+  if cache is not None:
+    return [cache.objectDict(obj, update_visibility) for obj in objects]
   result_list = []
   for obj in objects:
     obj_dict = prepareObjDict(scene, obj, update_visibility)
@@ -43,7 +93,7 @@ def prepareObjDict(scene, obj, update_visibility):
   if not velocity.is3D:
     velocity = Point(velocity.x, velocity.y, DEFAULTZ)
 
-  obj_dict = aobj.info
+  obj_dict = dict(aobj.info)
   obj_dict.update({
     'id': aobj.gid, # gid is the global ID - computed by SceneScape server.
     'type': otype,
@@ -72,7 +122,9 @@ def prepareObjDict(scene, obj, update_visibility):
       computeCameraBounds(scene, aobj, obj_dict)
 
   if len(aobj.chain_data.regions):
-    obj_dict['regions'] = aobj.chain_data.regions
+    # Entry times are kept as epoch time and published as ISO 8601
+    obj_dict['regions'] = {key: dict(region, entered=get_iso_time(region['entered']))
+                           for key, region in aobj.chain_data.regions.items()}
   if len(aobj.chain_data.sensors):
     obj_dict['sensors'] = aobj.chain_data.sensors
   if hasattr(aobj, 'confidence'):
@@ -88,26 +140,79 @@ def prepareObjDict(scene, obj, update_visibility):
   return obj_dict
 
 def computeCameraBounds(scene, aobj, obj_dict):
-  camera_bounds = {}
-  for cameraID in obj_dict['visibility']:
-    bounds = None
-    if aobj and hasattr(aobj.vectors[0].camera, 'cameraID') \
-          and cameraID == aobj.vectors[0].camera.cameraID:
-      bounds = getattr(aobj, 'boundingBoxPixels', None)
-    elif scene:
-      camera = scene.cameraWithID(cameraID)
-      if camera is not None and 'bb_meters' in obj_dict:
-        obj_translation = None
-        obj_size = None
-        if aobj:
-          obj_translation = aobj.sceneLoc
-          obj_size = aobj.bbMeters.size
-        else:
-          obj_translation = Point(obj_dict['translation'])
-          obj_size = Size(obj_dict['bb_meters']['width'], obj_dict['bb_meters']['height'])
-        bounds = camera.pose.projectEstimatedBoundsToCameraPixels(obj_translation,
-                                                                  obj_size)
+  computeCameraBoundsForObjects(scene, [(aobj, obj_dict)])
+  return
+
+def computeCameraBoundsForObjects(scene, objects):
+  """
+  Sets 'camera_bounds' of each object dictionary to its pixel bounds in every
+  camera it is visible in. The bounds of all objects seen by a camera are
+  estimated with a single batched projection per camera.
+  @param  scene    Scene the objects belong to
+  @param  objects  List of (aobj, obj_dict) pairs, aobj may be None
+  """
+  computeCameraBoundsFromSources(scene, [(cameraBoundsSource(aobj, obj_dict), obj_dict)
+                                         for aobj, obj_dict in objects])
+  return
+
+def cameraBoundsSource(aobj, obj_dict):
+  """
+  Copies what the camera bounds of an object are computed from, so that they
+  can be computed later without reading the object while it is being tracked.
+  @param  aobj      Tracked object or None
+  @param  obj_dict  Published dictionary of the object
+  @return (camera_id, pixel_bounds, translation, size) where camera_id and
+          pixel_bounds belong to the camera that detected the object
+  """
+  camera_id = pixel_bounds = None
+  if aobj and hasattr(aobj.vectors[0].camera, 'cameraID'):
+    camera_id = aobj.vectors[0].camera.cameraID
+    bounds = getattr(aobj, 'boundingBoxPixels', None)
     if bounds:
-      camera_bounds[cameraID] = bounds.asDict
-  obj_dict['camera_bounds'] = camera_bounds
+      pixel_bounds = bounds.asDict
+  translation = size = None
+  if 'bb_meters' in obj_dict:
+    if aobj:
+      translation = aobj.sceneLoc.asCartesianVector
+      size = (aobj.bbMeters.size.width, aobj.bbMeters.size.height)
+    else:
+      translation = obj_dict['translation']
+      size = (obj_dict['bb_meters']['width'], obj_dict['bb_meters']['height'])
+    translation = list(translation) + [DEFAULTZ] * (3 - len(translation))
+  return camera_id, pixel_bounds, translation, size
+
+def computeCameraBoundsFromSources(scene, objects):
+  """
+  Sets 'camera_bounds' of each object dictionary from the values copied by cameraBoundsSource()
+  @param  scene    Scene or cameras the objects are projected to
+  @param  objects  List of (source, obj_dict) pairs
+  """
+  projections = {}
+  for (camera_id, pixel_bounds, translation, size), obj_dict in objects:
+    camera_bounds = {}
+    for cameraID in obj_dict['visibility']:
+      if cameraID == camera_id:
+        if pixel_bounds:
+          camera_bounds[cameraID] = pixel_bounds
+      elif scene:
+        camera = scene.cameraWithID(cameraID)
+        if camera is not None and translation is not None:
+          # Keep the camera order of the visibility list, bounds are filled in below
+          camera_bounds[cameraID] = None
+          request = projections.setdefault(cameraID, (camera, [], [], []))
+          request[1].append(camera_bounds)
+          request[2].append(translation)
+          request[3].append(size)
+    obj_dict['camera_bounds'] = camera_bounds
+
+  for cameraID, (camera, bounds_dicts, translations, sizes) in projections.items():
+    bounds = camera.pose.projectEstimatedBoundsToCameraPixelsBatch(translations, sizes)
+    for camera_bounds, (x, y, width, height) in zip(bounds_dicts, bounds.tolist()):
+      camera_bounds[cameraID] = {'x': x, 'y': y, 'width': width, 'height': height}
+
+  for _, obj_dict in objects:
+    camera_bounds = obj_dict['camera_bounds']
+    if None in camera_bounds.values():
+      obj_dict['camera_bounds'] = {key: value for key, value in camera_bounds.items()
+                                   if value is not None}
   return
@@ -0,0 +1,108 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import random
+import threading
+
+import numpy as np
+
+DEFAULT_FEATURE_CAPACITY = 32
+RESERVOIR = "reservoir"
+RING = "ring"
+SAMPLING_POLICIES = (RESERVOIR, RING)
+
+class FeatureBuffer:
+  """
+  Fixed capacity store of the Re-ID vectors of one track.
+
+  Vectors are copied into one preallocated float32 matrix, allocated when the
+  first vector gives the dimensions. Once full, the RESERVOIR policy keeps a
+  uniform random sample of every vector seen during the track, while the RING
+  policy keeps the newest vectors. The mean of every vector seen can be kept
+  as well.
+  """
+
+  def __init__(self, capacity=DEFAULT_FEATURE_CAPACITY, sampling=RESERVOIR, keep_mean=False):
+    """
+    @param  capacity   Maximum number of vectors stored
+    @param  sampling   RESERVOIR or RING
+    @param  keep_mean  Keep the running mean of all vectors seen
+    """
+    if sampling not in SAMPLING_POLICIES:
+      raise ValueError(f"Unknown sampling '{sampling}', expected one of {SAMPLING_POLICIES}")
+    self.capacity = max(1, capacity)
+    self.sampling = sampling
+    self.keep_mean = keep_mean
+    self.vectors = None
+    self.mean = None
+    self.count = 0
+    self.seen = 0
+    self.lock = threading.Lock()
+    return
+
+  def __len__(self):
+    return self.count
+
+  @property
+  def nbytes(self):
+    """Memory used by the stored vectors and the mean"""
+    total = 0
+    if self.vectors is not None:
+      total += self.vectors.nbytes
+    if self.mean is not None:
+      total += self.mean.nbytes
+    return total
+
+  def add(self, vector):
+    """
+    @param  vector  Re-ID vector of any shape, flattened to one row
+    @return False if the vector has different dimensions than the stored ones
+    """
+    vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+    with self.lock:
+      if self.vectors is None:
+        self.vectors = np.empty((self.capacity, len(vector)), dtype=np.float32)
+        if self.keep_mean:
+          self.mean = np.zeros(len(vector), dtype=np.float32)
+      elif len(vector) != self.vectors.shape[1]:
+        return False
+
+      self.seen += 1
+      if self.count < self.capacity:
+        row = self.count
+        self.count += 1
+      elif self.sampling == RING:
+        row = (self.seen - 1) % self.capacity
+      else:
+        row = random.randrange(self.seen)
+      if row < self.capacity:
+        self.vectors[row] = vector
+      if self.mean is not None:
+        self.mean += (vector - self.mean) / self.seen
+    return True
+
+  def snapshot(self):
+    """
+    @return Copy of the stored vectors, one per row
+    """
+    with self.lock:
+      if self.vectors is None:
+        return np.empty((0, 0), dtype=np.float32)
+      return self.vectors[:self.count].copy()
+
+  def meanVector(self):
+    """
+    @return Copy of the mean of all vectors seen, or None
+    """
+    with self.lock:
+      if self.mean is None:
+        return None
+      return self.mean.copy()
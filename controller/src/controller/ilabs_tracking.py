@@ -59,6 +59,17 @@ class IntelLabsTracking(Tracking):
     self.tracker.update_tracker_params(self.ref_camera_frame_rate)
     return
 
+  @classmethod
+  def configureMatching(cls, threads):
+    """
+    Sets the number of threads used to build the track to detection cost matrix.
+    The threads are started by each tracker, on top of the scheduler workers.
+    @param  threads  Number of threads, 1 by default, 0 uses all hardware threads
+    """
+    rv.tracking.set_matching_threads(threads)
+    log.info("Tracker matching threads: {}".format(rv.tracking.matching_threads()))
+    return
+
   def check_valid_time_parameters(self, max_unreliable_time, non_measurement_time_dynamic, non_measurement_time_static):
     param_list = [max_unreliable_time, non_measurement_time_dynamic, non_measurement_time_static]
     result = all(value is not None for value in param_list)
@@ -68,73 +79,72 @@ class IntelLabsTracking(Tracking):
     return False
 
 
-  def rv_classification(self, confidence=None):
-    confidence = 1.0 if confidence is None else confidence
-    return np.array([confidence, 1.0 - confidence])
-
-  def to_rv_object(self, sscape_object):
-    """Convert sscape detected object to robot vision tracking input object format"""
-    sscape_object.uuid = str(uuid.uuid4())
-    rv_object = rv.tracking.TrackedObject()
-    pt = sscape_object.sceneLoc
-    rv_object.x = pt.x
-    rv_object.y = pt.y
-    rv_object.z = pt.z
-    # length is mapped to x, width is mapped to y and height is to z if intel labs tracker
-    size = sscape_object.size if sscape_object.size else [DEFAULT_EDGE_LENGTH] * 3
-    rv_object.length = size[0]
-    rv_object.width = size[1]
-    rv_object.height = size[2]
-    rv_object.yaw = sscape_object.rotation[1] if sscape_object.rotation else 0.
-    rv_object.classification = self.rv_classification(sscape_object.confidence)
-    info = sscape_object.info.copy()
-    info['framecount'] = sscape_object.frameCount
-    rv_object.attributes = {
-      'info': sscape_object.uuid,
-    }
-    return rv_object
+  def rv_measurements(self, objects):
+    """Convert sscape detected objects to the robot vision measurement and classification arrays"""
+    measurements = np.empty((len(objects), 7))
+    confidences = np.ones(len(objects))
+    for idx, sscape_object in enumerate(objects):
+      pt = sscape_object.sceneLoc
+      # length is mapped to x, width is mapped to y and height is to z if intel labs tracker
+      size = sscape_object.size if sscape_object.size else [DEFAULT_EDGE_LENGTH] * 3
+      yaw = sscape_object.rotation[1] if sscape_object.rotation else 0.
+      measurements[idx] = (pt.x, pt.y, pt.z, size[0], size[1], size[2], yaw)
+      if sscape_object.confidence is not None:
+        confidences[idx] = sscape_object.confidence
+    classifications = np.column_stack((confidences, 1.0 - confidences))
+    return measurements, classifications
 
   def update_tracks(self, objects, timestamp):
-    rv_objects = [self.to_rv_object(sscape_object) for sscape_object in objects]
+    """Run the tracker and return ids, states and measurement indices of the reliable tracks"""
+    measurements, classifications = self.rv_measurements(objects)
     tracking_radius = DEFAULT_TRACKING_RADIUS
     if len(objects):
       tracking_radius = sum([x.tracking_radius for x in objects]) / len(objects)
 
-    self.tracker.track(rv_objects, timestamp, distance_type=rv.tracking.DistanceType.Euclidean, distance_threshold=tracking_radius)
-    return
-
-  def from_tracked_object(self, tracked_object, objects):
-    """Get associated sscape object from reliable tracked object"""
-    uuid = tracked_object.attributes['info']
-    sscape_object = None
-    for obj in objects:
-      if uuid == obj.uuid:
-        sscape_object = obj
-        break
-    if not sscape_object:
-      for obj in self._objects:
-        if uuid == obj.uuid:
-          return obj
-
-    sscape_object.location[0].point = Point(tracked_object.x, tracked_object.y,
-                                            tracked_object.z)
-    sscape_object.velocity = Point((tracked_object.vx, tracked_object.vy, 0.0))
-
-    sscape_object.rv_id = tracked_object.id
-    found = False
-    for obj in self._objects:
-      if hasattr(obj, 'rv_id') and sscape_object.rv_id == obj.rv_id:
-        found = True
-        sscape_object.setPrevious(obj)
-        sscape_object.inferRotationFromVelocity()
-        break
-    if not found:
-      sscape_object.setGID(uuid)
+    return self.tracker.track_arrays(measurements, classifications, timestamp,
+                                     distance_type=rv.tracking.DistanceType.Euclidean,
+                                     distance_threshold=tracking_radius)
+
+  def from_tracked_object(self, track_id, state, sscape_object, previous_by_rv_id):
+    """Get associated sscape object from reliable tracked object
+
+    @param  track_id           Id of the reliable track
+    @param  state              Track state as x, y, z, vx, vy, ax, ay, yaw
+    @param  sscape_object      Object detected in this step that updated the track, or None
+    @param  previous_by_rv_id  Objects from the previous step, keyed by rv_id
+    @return The sscape object for the track, or None if there is none
+    """
+    previous = previous_by_rv_id.get(track_id, None)
+    if sscape_object is None:
+      # Track was not measured in this step, keep the object from the previous step
+      return previous
+
+    sscape_object.location[0].point = Point(state[0], state[1], state[2])
+    sscape_object.velocity = Point((state[3], state[4], 0.0))
+
+    sscape_object.rv_id = track_id
+    if previous is not None:
+      sscape_object.setPrevious(previous)
+      sscape_object.inferRotationFromVelocity()
+    else:
+      sscape_object.setGID(str(uuid.uuid4()), self.location_history)
 
     self.uuid_manager.assignID(sscape_object)
 
     return sscape_object
 
+  def tracksFromDetections(self, track_ids, states, measurement_indices, objects):
+    """Get the sscape objects for all reliable tracks"""
+    # Built from a reversed list so the first object with a given rv_id wins
+    previous_by_rv_id = {obj.rv_id: obj for obj in reversed(self._objects) if hasattr(obj, 'rv_id')}
+    tracks = []
+    for track_id, state, index in zip(track_ids.tolist(), states.tolist(), measurement_indices.tolist()):
+      sscape_object = objects[index] if index >= 0 else None
+      sscape_object = self.from_tracked_object(track_id, state, sscape_object, previous_by_rv_id)
+      if sscape_object is not None:
+        tracks.append(sscape_object)
+    return tracks
+
   def mergeAlreadyTrackedObjects(self, tracks):
     """Merge already tracked objects with current objects"""
     now = get_epoch_time()
@@ -143,14 +153,12 @@ class IntelLabsTracking(Tracking):
     new_tracks = {}
     non_existing_tracks = {}
 
+    existing_by_oid = {obj.oid: obj for obj in reversed(self.already_tracked_objects)}
     for new_obj in tracks:
-      found = False
-      for existing_obj in self.already_tracked_objects:
-        if new_obj.oid == existing_obj.oid:
-          found = True
-          existing_tracks[new_obj.oid] = (new_obj, existing_obj)
-          break
-      if not found:
+      existing_obj = existing_by_oid.get(new_obj.oid, None)
+      if existing_obj is not None:
+        existing_tracks[new_obj.oid] = (new_obj, existing_obj)
+      else:
         new_tracks[new_obj.oid] = new_obj
     for existing_obj in self.already_tracked_objects:
       if existing_obj.oid not in existing_tracks:
@@ -163,7 +171,7 @@ class IntelLabsTracking(Tracking):
       result.append(new)
 
     for obj in new_tracks.values():
-      obj.setGID(obj.oid)
+      obj.setGID(obj.oid, self.location_history)
       obj.last_seen = now
       result.append(obj)
 
@@ -175,11 +183,9 @@ class IntelLabsTracking(Tracking):
   def trackCategory(self, objects, when, already_tracked_objects):
     """Create reliable tracks for objects detected and tracks detected"""
     when = datetime.fromtimestamp(when)
-    self.update_tracks(objects, when)
-    tracked_objects = self.tracker.get_reliable_tracks()
-    self.uuid_manager.pruneInactiveTracks(tracked_objects)
-    tracks_from_detections = [self.from_tracked_object(tracked_object, objects)
-                     for tracked_object in tracked_objects]
+    track_ids, states, measurement_indices = self.update_tracks(objects, when)
+    self.uuid_manager.pruneInactiveTracks(track_ids.tolist())
+    tracks_from_detections = self.tracksFromDetections(track_ids, states, measurement_indices, objects)
 
     # Already tracked objects include moving objects from tracks consumed directly
     self.already_tracked_objects = self.mergeAlreadyTrackedObjects(already_tracked_objects)
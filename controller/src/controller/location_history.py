@@ -0,0 +1,184 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import threading
+
+import numpy as np
+
+from scene_common.geometry import DEFAULTZ, Point, Rectangle
+
+DEFAULT_SLOTS = 64
+# Fields of a location: x, y, z of the point, timestamp, then x, y, z, width, height, depth
+# of the bounds, where the bounds x is NaN without bounds and the bounds z is NaN for 2D bounds
+LOCATION_FIELDS = 10
+
+class LocationHistory:
+  """
+  Location and published location history of the tracks of one tracker.
+
+  Every track owns a slot in preallocated NumPy ring buffers holding one row
+  with the point, timestamp and bounds of each of its last depth locations,
+  and the points of its last depth published locations. Locations are
+  numbered in the order they are pushed, so each object of a track only needs
+  the sequence number and length of its own history to index into the slot.
+  Slots are reused once released and the buffers double when every slot is
+  taken. The tracker pushes locations while other threads read them, so rows
+  are only read and written while holding the lock.
+  """
+
+  def __init__(self, depth, slots=DEFAULT_SLOTS):
+    """
+    @param  depth  Number of locations kept per track
+    @param  slots  Number of tracks the buffers are allocated for
+    """
+    self.depth = depth
+    slots = max(1, slots)
+    self.locations = np.zeros((slots, depth, LOCATION_FIELDS))
+    self.published = np.zeros((slots, depth, 3))
+    # Number of locations pushed to each slot, kept in lists as they change every frame
+    self.counts = [0] * slots
+    self.published_counts = [0] * slots
+    self.free = list(range(slots - 1, -1, -1))
+    # Reentrant so that callers can hold it while checking the slot of a track
+    self.lock = threading.RLock()
+    return
+
+  @property
+  def slots(self):
+    return len(self.counts)
+
+  @property
+  def nbytes(self):
+    return self.locations.nbytes + self.published.nbytes
+
+  def allocate(self):
+    """
+    @return Empty slot for a new track
+    """
+    with self.lock:
+      if not self.free:
+        self._grow()
+      slot = self.free.pop()
+      self.counts[slot] = 0
+      self.published_counts[slot] = 0
+    return slot
+
+  def release(self, slot):
+    """Returns the slot of a track that was pruned"""
+    with self.lock:
+      self.free.append(slot)
+    return
+
+  def _grow(self):
+    slots = self.slots
+    for name in ('locations', 'published'):
+      array = getattr(self, name)
+      resized = np.zeros((slots * 2,) + array.shape[1:], dtype=array.dtype)
+      resized[:slots] = array
+      setattr(self, name, resized)
+    self.counts.extend([0] * slots)
+    self.published_counts.extend([0] * slots)
+    self.free.extend(range(slots * 2 - 1, slots - 1, -1))
+    return
+
+  def _visible(self, slot, seq):
+    return max(0, seq - max(0, self.counts[slot] - self.depth))
+
+  def push(self, slot, point, when, bounds, after=0, length=0):
+    """
+    Adds the location of an object to the history of its track. If the
+    history the location follows is not the newest one of the slot, it is
+    copied first so that the new sequence number continues it.
+
+    @param  slot    Slot of the track
+    @param  point   3D Point of the location
+    @param  when    Timestamp of the location
+    @param  bounds  Rectangle of the location or None
+    @param  after   Sequence number of the history the location follows
+    @param  length  Number of locations in the history the location follows
+    @return (sequence number, length) of the history ending with the location
+    """
+    if bounds is None:
+      entry = (point.x, point.y, point.z, when, np.nan, np.nan, np.nan, 0, 0, 0)
+    elif bounds.origin.is3D:
+      entry = (point.x, point.y, point.z, when,
+               bounds.x, bounds.y, bounds.z, bounds.width, bounds.height, bounds.depth)
+    else:
+      entry = (point.x, point.y, point.z, when,
+               bounds.x, bounds.y, np.nan, bounds.width, bounds.height, 0)
+
+    with self.lock:
+      count = self.counts[slot]
+      length = min(length, self._visible(slot, after))
+      if length and after != count:
+        rows = [(after - length + idx) % self.depth for idx in range(length)]
+        previous = self.locations[slot, rows]
+        for idx in range(length):
+          self.locations[slot, count % self.depth] = previous[idx]
+          count += 1
+      self.locations[slot, count % self.depth] = entry
+      count += 1
+      self.counts[slot] = count
+    return count, min(length + 1, self.depth)
+
+  def history(self, slot, seq, length):
+    """
+    Copies the locations of a history that are still held by the ring buffer.
+    @param  slot    Slot of the track
+    @param  seq     Sequence number of the newest location of the history
+    @param  length  Number of locations in the history
+    @return List of (point, when, bounds) of the locations, newest first
+    """
+    with self.lock:
+      length = min(length, self._visible(slot, seq))
+      rows = self.locations[slot, [(seq - 1 - idx) % self.depth for idx in range(length)]]
+    return [self._entry(row) for row in rows.tolist()]
+
+  def _entry(self, row):
+    x, y, z, when, bx, by, bz, width, height, depth = row
+    bounds = None
+    if bx == bx:
+      if bz == bz:
+        bounds = Rectangle(origin=Point(bx, by, bz), size=(width, height, depth))
+      else:
+        bounds = Rectangle(origin=Point(bx, by), size=(width, height))
+    return Point(x, y, z), when, bounds
+
+  def addPublished(self, slot, point):
+    """Adds a published location of a track"""
+    with self.lock:
+      row = self.published_counts[slot] % self.depth
+      self.published[slot, row] = (point.x, point.y, point.z if point.is3D else DEFAULTZ)
+      self.published_counts[slot] += 1
+    return
+
+  def publishedPoints(self, slot):
+    """
+    @return Published locations of a track as 3D Points, newest first
+    """
+    with self.lock:
+      count = self.published_counts[slot]
+      rows = [(count - 1 - idx) % self.depth for idx in range(min(count, self.depth))]
+      points = self.published[slot, rows].tolist()
+    return [Point(*point) for point in points]
+
+  def publishedSegment(self, slot):
+    """
+    @return (x1, y1, x2, y2) from the newest to the previous published location
+            of a track, or None if it was published less than twice
+    """
+    with self.lock:
+      count = self.published_counts[slot]
+      if count < 2:
+        return None
+      newest = self.published[slot, (count - 1) % self.depth].tolist()
+      previous = self.published[slot, (count - 2) % self.depth].tolist()
+    return newest[0], newest[1], previous[0], previous[1]
@@ -9,21 +9,19 @@
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
 
-import base64
 import datetime
-import struct
 import warnings
-from dataclasses import dataclass
+from collections.abc import Sequence
 from threading import Lock
-from typing import Dict, List
 
 import cv2
 import numpy as np
-import open3d as o3d
 from scipy.spatial.transform import Rotation
 
+from controller.location_history import LocationHistory
 from scene_common.geometry import DEFAULTZ, Line, Point, Rectangle
 from scene_common.options import TYPE_1, TYPE_2
+from scene_common.reid_codec import decodeReIDVector, encodeReIDVector
 from scene_common.transform import normalize, rotationToTarget
 
 warnings.simplefilter('ignore', np.RankWarning)
@@ -34,13 +32,72 @@ DEFAULT_TRACKING_RADIUS = 2.0
 LOCATION_LIMIT = 20
 SPEED_THRESHOLD = 0.1
 
-@dataclass
 class ChainData:
-  regions: Dict
-  publishedLocations: List[Point]
-  sensors: Dict
+  """
+  Data shared by every object of a track, with its slot in a LocationHistory.
+  The slot is checked while holding the history lock, so that once the track
+  is released its objects read no history instead of the next track's.
+  """
+  __slots__ = ('regions', 'sensors', 'history', 'slot')
+
+  def __init__(self, regions=None, sensors=None, history=None):
+    self.regions = {} if regions is None else regions
+    self.sensors = {} if sensors is None else sensors
+    self.history = LocationHistory(LOCATION_LIMIT, 1) if history is None else history
+    self.slot = self.history.allocate()
+    return
+
+  def release(self):
+    """Returns the slot of a pruned track to the history"""
+    with self.history.lock:
+      if self.slot is not None:
+        self.history.release(self.slot)
+        self.slot = None
+    return
+
+  def pushLocation(self, location, after, length):
+    """
+    Adds the location of an object to the history of the track
+    @return (sequence number, length) of the history ending with the location
+    """
+    with self.history.lock:
+      if self.slot is None:
+        return 0, 0
+      return self.history.push(self.slot, location.point, location.when, location.bounds,
+                               after, length)
+
+  def locations(self, seq, length):
+    """Locations of a history of the track, newest first"""
+    with self.history.lock:
+      if self.slot is None:
+        return []
+      history = self.history.history(self.slot, seq, length)
+    return [Chronoloc(*location) for location in history]
+
+  @property
+  def publishedLocations(self):
+    """Published locations of the track, newest first"""
+    with self.history.lock:
+      if self.slot is None:
+        return []
+      return self.history.publishedPoints(self.slot)
+
+  def addPublishedLocation(self, point):
+    with self.history.lock:
+      if self.slot is not None:
+        self.history.addPublished(self.slot, point)
+    return
+
+  def publishedSegment(self):
+    """(x1, y1, x2, y2) from the newest to the previous published location, or None"""
+    with self.history.lock:
+      if self.slot is None:
+        return None
+      return self.history.publishedSegment(self.slot)
 
 class Chronoloc:
+  __slots__ = ('point', 'when', 'bounds')
+
   def __init__(self, point: Point, when: datetime, bounds: Rectangle):
     if not point.is3D:
       point = Point(point.x, point.y, DEFAULTZ)
@@ -49,6 +106,47 @@ class Chronoloc:
     self.bounds = bounds
     return
 
+class Locations(Sequence):
+  """
+  Locations of an object, newest first: its own location followed by the
+  history of its track, or by the older locations it was given directly.
+  The history is copied from the LocationHistory of the track the first time
+  an older location is needed, so every read sees the same locations while
+  the tracker keeps pushing new ones.
+  """
+  __slots__ = ('current', 'older', 'chain_data', 'seq', 'length')
+
+  def __init__(self, current, older, chain_data, seq, length):
+    self.current = current
+    self.older = older
+    self.chain_data = chain_data
+    self.seq = seq
+    self.length = length
+    return
+
+  def _older(self):
+    if self.length:
+      self.older = self.chain_data.locations(self.seq, min(self.length, LOCATION_LIMIT - 1))
+      self.length = 0
+    return self.older
+
+  def __len__(self):
+    return 1 + len(self._older())
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      return [self[idx] for idx in range(*index.indices(len(self)))]
+    if index == 0:
+      return self.current
+    older = self._older()
+    if index < 0:
+      index += 1 + len(older)
+      if index == 0:
+        return self.current
+    if index < 0 or index > len(older):
+      raise IndexError("location index out of range")
+    return older[index - 1]
+
 class Vector:
   def __init__(self, camera, point, when):
     if not point.is3D:
@@ -77,15 +175,21 @@ class MovingObject:
   gid_counter = 0
   gid_lock = Lock()
 
+  __slots__ = ('chain_data', 'size', 'tracking_radius', 'shift_type', 'project_to_map',
+               'map_raycaster', 'rotation_from_velocity', 'first_seen', 'last_seen', 'camera',
+               'info', 'category', 'boundingBox', 'boundingBoxPixels', 'confidence', 'oid',
+               'gid', 'frameCount', 'velocity', 'rotation', 'intersected', 'reidVector',
+               '_location', '_older_locations', 'history_seq', 'history_length',
+               'orig_point', 'vectors', 'bbMeters', 'bbShadow', 'baseAngle', 'adjusted',
+               'rv_id', 'similarity', 'visibility', 'asset_scale')
+
   def __init__(self, info, when, camera):
     self.chain_data = None
     self.size = None
     self.tracking_radius = DEFAULT_TRACKING_RADIUS
     self.shift_type = TYPE_1
     self.project_to_map = False
-    self.map_triangle_mesh = None
-    self.map_translation = None
-    self.map_rotation = None
+    self.map_raycaster = None
     self.rotation_from_velocity = False
 
     self.first_seen = when
@@ -110,7 +214,10 @@ class MovingObject:
     self.gid = None
     self.frameCount = 1
     self.velocity = None
-    self.location = None
+    self._location = None
+    self._older_locations = ()
+    self.history_seq = 0
+    self.history_length = 0
     self.rotation = None
     self.intersected = False
     self.reidVector = None
@@ -120,17 +227,36 @@ class MovingObject:
     return
 
   def _decodeReIDVector(self, reid):
-    try:
-      vector = base64.b64decode(reid)
-      self.reidVector = np.array(struct.unpack("256f", vector)).reshape(1, -1)
+    if isinstance(reid, list):
+      self.reidVector = reid
+    elif isinstance(reid, str):
+      self.reidVector = decodeReIDVector(reid)
       self.info.pop('reid')
-    except TypeError:
-      if type(reid) == list:
-        self.reidVector = reid
     return
 
-  def setGID(self, gid):
-    self.chain_data = ChainData(regions={}, publishedLocations=[], sensors={})
+  @property
+  def location(self):
+    """Locations of the object newest first, or None before it is mapped to the world"""
+    if self._location is None:
+      return None
+    return Locations(self._location, self._older_locations, self.chain_data,
+                     self.history_seq, self.history_length)
+
+  @location.setter
+  def location(self, locations):
+    self._location = locations[0] if locations else None
+    self._older_locations = tuple(locations[1:]) if locations else ()
+    return
+
+  def setGID(self, gid, history=None):
+    """
+    Starts a new track with this object
+    @param gid      Global ID of the track
+    @param history  LocationHistory of the tracker, None for a history of its own
+    """
+    self.chain_data = ChainData(history=history)
+    self.history_seq = 0
+    self.history_length = 0
     self.gid = gid
     self.first_seen = self.when
     return
@@ -139,16 +265,14 @@ class MovingObject:
     # log.debug("MATCHED", self.__class__.__name__,
     #     "id=%i/%i:%i" % (otherObj.gid, otherObj.oid, self.oid),
     #     otherObj.sceneLoc, self.sceneLoc)
-    self.location = [self.location[0]] + otherObj.location[:LOCATION_LIMIT - 1]
     self.chain_data = otherObj.chain_data
+    self.history_seq, self.history_length = self.chain_data.pushLocation(
+      otherObj._location, otherObj.history_seq, otherObj.history_length)
 
     # FIXME - should these fields be part of chain_data?
     self.gid = otherObj.gid
     self.first_seen = otherObj.first_seen
     self.frameCount = otherObj.frameCount + 1
-
-    del self.chain_data.publishedLocations[LOCATION_LIMIT:]
-
     return
 
   def inferRotationFromVelocity(self):
@@ -183,30 +307,118 @@ class MovingObject:
     if info is not None and 'size' in info:
       self.size = info['size']
     if info is not None and 'translation' in info:
-      self.orig_point = Point(info['translation'])
-      if camera and hasattr(camera, 'pose'):
-        if 'rotation' in info:
-          if self.project_to_map:
-            info['translation'], info['rotation'] = camera.pose.projectToMap(info['translation'],
-                                                                        info['rotation'],
-                                                                        self.map_triangle_mesh.clone(),
-                                                                        o3d.core.Tensor(self.map_translation, dtype=o3d.core.Dtype.Float32),
-                                                                        o3d.geometry.get_rotation_matrix_from_xyz(self.map_rotation))
-          rotation_as_matrix = Rotation.from_quat(np.array(info['rotation'])).as_matrix()
-          info['rotation'] = list(Rotation.from_matrix(np.matmul(
-                                      camera.pose.pose_mat[:3,:3],
-                                      rotation_as_matrix)).as_quat())
-          self.rotation = info['rotation']
-        self.orig_point = camera.pose.cameraPointToWorldPoint(Point(info['translation']))
-    else:
-      if camera and hasattr(camera, 'pose'):
-        self.orig_point = camera.pose.cameraPointToWorldPoint(self.camLoc)
-        if not self.camLoc.is3D:
-          line1 = Line(camera.pose.translation, self.orig_point)
-          line2 = Line(self.orig_point, Point(np.mean([self.size[0], self.size[1]]) / 2, line1.angle, 0, polar=True), relative=True)
-          self.orig_point = line2.end
-    self.location = [Chronoloc(self.orig_point, when, self.boundingBox)]
-    self.vectors = [Vector(camera, self.orig_point, when)]
+      if self._projectsToMap(info, camera):
+        translations, rotations = camera.pose.projectToMapBatch([info['translation']],
+                                                                [info['rotation']],
+                                                                self.map_raycaster)
+        info['translation'], info['rotation'] = translations[0], rotations[0]
+      self._mapPoseToWorld(info, when, camera)
+      return
+
+    if camera and hasattr(camera, 'pose'):
+      self.orig_point = camera.pose.cameraPointToWorldPoint(self.camLoc)
+      if not self.camLoc.is3D:
+        line1 = Line(camera.pose.translation, self.orig_point)
+        line2 = Line(self.orig_point, Point(np.mean([self.size[0], self.size[1]]) / 2, line1.angle, 0, polar=True), relative=True)
+        self.orig_point = line2.end
+    self._setLocation(self.orig_point, when, camera)
+    return
+
+  def _projectsToMap(self, info, camera):
+    return self.project_to_map and self.map_raycaster is not None \
+      and camera and hasattr(camera, 'pose') and 'rotation' in info
+
+  def _mapPoseToWorld(self, info, when, camera):
+    """Maps a detected translation and rotation in camera coordinates to the world"""
+    self.orig_point = Point(info['translation'])
+    if camera and hasattr(camera, 'pose'):
+      if 'rotation' in info:
+        rotation_as_matrix = Rotation.from_quat(np.array(info['rotation'])).as_matrix()
+        info['rotation'] = list(Rotation.from_matrix(np.matmul(
+                                    camera.pose.pose_mat[:3,:3],
+                                    rotation_as_matrix)).as_quat())
+        self.rotation = info['rotation']
+      self.orig_point = camera.pose.cameraPointToWorldPoint(Point(info['translation']))
+    self._setLocation(self.orig_point, when, camera)
+    return
+
+  def _setLocation(self, point, when, camera):
+    self.orig_point = point
+    self.location = [Chronoloc(point, when, self.boundingBox)]
+    self.vectors = [Vector(camera, point, when)]
+    return
+
+  def _awaitsMapping(self):
+    """Object is not mapped yet and uses the default mapping to the world"""
+    return type(self).mapObjectDetectionToWorld is MovingObject.mapObjectDetectionToWorld \
+      and self._location is None
+
+  def _mapsBoundsToGround(self):
+    """Object location comes from intersecting its 2D bounds with the ground plane"""
+    return self._awaitsMapping() and 'translation' not in self.info \
+      and self.boundingBox is not None and not self.boundingBox.origin.is3D
+
+  @staticmethod
+  def mapDetectionsToWorld(objects, camera):
+    """Maps all objects detected by a camera to the world coordinate system.
+    Bounding boxes are intersected with the ground plane in a single
+    vectorized step and objects projected to the map cast their rays in a
+    single call. Objects that cannot be mapped this way are still mapped on
+    first access to sceneLoc.
+    @param objects Objects created from one camera message
+    @param camera  Camera that detected the objects
+    """
+    if not hasattr(camera, 'pose'):
+      return
+
+    projected = {}
+    for obj in objects:
+      if obj._awaitsMapping() and 'translation' in obj.info \
+         and obj._projectsToMap(obj.info, camera):
+        projected.setdefault(obj.map_raycaster, []).append(obj)
+    for raycaster, group in projected.items():
+      translations, rotations = camera.pose.projectToMapBatch(
+        [obj.info['translation'] for obj in group], [obj.info['rotation'] for obj in group],
+        raycaster)
+      for obj, translation, rotation in zip(group, translations, rotations):
+        obj._projectBounds()
+        if 'size' in obj.info:
+          obj.size = obj.info['size']
+        obj.info['translation'], obj.info['rotation'] = translation, rotation
+        obj._mapPoseToWorld(obj.info, obj.first_seen, camera)
+
+    objects = [obj for obj in objects if obj._mapsBoundsToGround()]
+    if not objects:
+      return
+
+    boxes = np.array([[obj.boundingBox.x, obj.boundingBox.y,
+                       obj.boundingBox.width, obj.boundingBox.height] for obj in objects])
+    corners, sizes, base_angles = camera.pose.projectBoundsBatch(boxes)
+    for obj, corner, size, base_angle in zip(objects, corners.tolist(), sizes.tolist(),
+                                             base_angles.tolist()):
+      bl, br, far_l, far_r = [Point(*pt) for pt in corner]
+      obj._setProjectedBounds(Rectangle(origin=Point(bl.x, 0), size=tuple(size)),
+                              (far_l, far_r, br, bl), base_angle)
+      if 'size' in obj.info:
+        obj.size = obj.info['size']
+
+    # Same point as camLoc for every shift type
+    shift_type_2 = np.array([obj.shift_type == TYPE_2 for obj in objects])
+    heights = boxes[:, 3]
+    bottom = boxes[:, 1] + heights
+    bottom[shift_type_2] -= heights[shift_type_2] / 2 * (base_angles[shift_type_2] / 90)
+    points = camera.pose.cameraPointsToWorldPoints(
+      np.stack([boxes[:, 0] + boxes[:, 2] / 2, bottom], 1))
+
+    # Move the point away from the camera by half the object footprint
+    delta = points - camera.pose.translation.asNumpyCartesian
+    angles = np.arctan2(delta[:, 1], delta[:, 0])
+    radii = np.array([np.mean([obj.size[0], obj.size[1]]) / 2 for obj in objects])
+    points[:, 0] += radii * np.cos(angles)
+    points[:, 1] += radii * np.sin(angles)
+
+    for obj, point in zip(objects, points.tolist()):
+      obj._setLocation(Point(*point), obj.first_seen, camera)
     return
 
   @property
@@ -214,22 +426,25 @@ class MovingObject:
     """Object location in world coordinate system"""
     if self.intersected:
       return self.adjusted[1]
-    if not hasattr(self, 'location') or not self.location:
+    if self._location is None:
       self._projectBounds()
       self.mapObjectDetectionToWorld(self.info, self.first_seen, self.camera)
-    return self.location[0].point
+    return self._location.point
 
   def _projectBounds(self):
     if hasattr(self.camera, "pose") and self.boundingBox:
-      self.bbMeters, self.bbShadow, self.baseAngle = \
-        self.camera.pose.projectBounds(self.boundingBox)
-      if self.size is None:
-        self.size = [self.bbMeters.width, self.bbMeters.width, self.bbMeters.height]
+      self._setProjectedBounds(*self.camera.pose.projectBounds(self.boundingBox))
+    return
+
+  def _setProjectedBounds(self, bounds, shadow, base_angle):
+    self.bbMeters, self.bbShadow, self.baseAngle = bounds, shadow, base_angle
+    if self.size is None:
+      self.size = [self.bbMeters.width, self.bbMeters.width, self.bbMeters.height]
     return
 
   @property
   def when(self):
-    return self.location[0].when
+    return self._location.when
 
   def __repr__(self):
     return "%s: %s/%s %s %s vectors: %s" % \
@@ -248,7 +463,7 @@ class MovingObject:
     @returns  class                     The dynamically created subclass.
     """
 
-    classDict = {'baseClass': cls}
+    classDict = {'baseClass': cls, '__slots__': ()}
     classDict.update('')
     if methods:
       classDict.update(methods)
@@ -305,10 +520,7 @@ class MovingObject:
       'scene_loc': self.sceneLoc.asNumpyCartesian.tolist(),
     }
     if 'reid' in dd and isinstance(dd['reid'], np.ndarray):
-      vector = dd['reid'].flatten().tolist()
-      vector = struct.pack("256f", *vector)
-      vector = base64.b64encode(vector).decode('utf-8')
-      dd['reid'] = vector
+      dd['reid'] = encodeReIDVector(dd['reid'])
     if self.intersected:
       dd['adjusted'] = {'gid': self.adjusted[0],
                         'point': (self.adjusted[1].x, self.adjusted[1].y, self.adjusted[1].z)}
@@ -321,8 +533,7 @@ class MovingObject:
     self.frameCount = info['frame_count']
     self.reidVector = info['reid']
     if self.reidVector is not None:
-      vector = base64.b64decode(self.reidVector)
-      self.reidVector = np.array(struct.unpack("256f", vector)).reshape(1, -1)
+      self.reidVector = decodeReIDVector(self.reidVector)
     self.first_seen = info['first_seen']
     self.location = [Chronoloc(Point(v['point']), v['timestamp'], Rectangle(v['bounding_box']))
                      for v in info['location']]
@@ -337,6 +548,8 @@ class MovingObject:
     return
 
 class ATagObject(MovingObject):
+  __slots__ = ('tag_id',)
+
   def __init__(self, info, when, sensor):
     super().__init__(info, when, sensor)
 
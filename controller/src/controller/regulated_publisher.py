@@ -0,0 +1,218 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import threading
+
+from controller.detections_builder import (cameraBoundsSource,
+                                           computeCameraBoundsFromSources)
+from scene_common import log
+from scene_common.mqtt import PubSub
+from scene_common.timestamp import get_epoch_time
+
+class CameraSnapshot:
+  """Cameras of a scene as they were when its objects were last updated"""
+
+  def __init__(self, cameras):
+    self.cameras = cameras
+    return
+
+  def cameraWithID(self, anID):
+    return self.cameras.get(anID, None)
+
+class RegulatedScene:
+  """Latest tracker state of a scene and what was last published for it"""
+
+  def __init__(self, scene):
+    self.scene = scene
+    self.cameras = CameraSnapshot({})
+    self.objects = {}
+    self.rate = {}
+    self.header = {}
+    self.updated = False
+    self.last = None
+    self.published = {}
+    return
+
+class RegulatedPublisher:
+  """
+  Publishes the regulated topic of every scene at the scene regulated_rate.
+
+  Camera messages only update a per scene snapshot of the tracked objects,
+  indexed by gid. A timer thread publishes each scene that received new data
+  once its regulated interval has passed. Camera bounds are only projected
+  again for objects that were updated since the previous emission. They are
+  computed from the cameras and object fields copied by update() on the scene
+  thread, so the timer thread never reads the live scene or tracked objects.
+  """
+
+  def __init__(self, pubsub, update_visibility):
+    """
+    @param  pubsub             PubSub used to publish the regulated topic
+    @param  update_visibility  Compute camera bounds of the published objects
+    """
+    self.pubsub = pubsub
+    self.update_visibility = update_visibility
+    self.scenes = {}
+    self.condition = threading.Condition()
+    self.thread = None
+    self.running = False
+    self.generation = 0
+    return
+
+  def update(self, scene, objects, otype, jdata, camera_id, cache, scene_rate):
+    """
+    Replaces the snapshot of the objects of one category in a scene.
+    @param  scene       Scene the objects belong to
+    @param  objects     Tracked objects of the category
+    @param  otype       Object category
+    @param  jdata       Message being published, provides the timestamp, id and name
+    @param  camera_id   Camera that sent the message or None
+    @param  cache       DetectionsCache of the frame
+    @param  scene_rate  Rate the scene is updated at
+    """
+    snapshot = {}
+    for obj in objects:
+      obj_dict = cache.objectDict(obj)
+      source = None
+      if self.update_visibility and 'visibility' in obj_dict:
+        source = cameraBoundsSource(obj, obj_dict)
+      snapshot[obj.gid] = (source, obj_dict)
+    # Cameras are replaced rather than modified when they change, a shallow copy is enough
+    cameras = CameraSnapshot(dict(scene.cameras)) if self.update_visibility else None
+
+    with self.condition:
+      state = self.scenes.get(scene.uid)
+      if state is None:
+        state = self.scenes[scene.uid] = RegulatedScene(scene)
+      state.scene = scene
+      if cameras is not None:
+        state.cameras = cameras
+      state.objects[otype] = snapshot
+      if camera_id is not None:
+        state.rate[camera_id] = jdata.get('rate', None)
+      state.header = {
+        'timestamp': jdata['timestamp'],
+        'id': jdata['id'],
+        'name': jdata['name'],
+        'scene_rate': round(scene_rate, 1),
+      }
+      if not state.updated:
+        # Only a scene that was not already waiting changes when the timer is due
+        state.updated = True
+        self.generation += 1
+        self.condition.notify_all()
+    return
+
+  def removeStale(self, scenes):
+    """Forgets scenes and cameras that no longer exist"""
+    scenes = {scene.uid: scene for scene in scenes}
+    with self.condition:
+      for uid in list(self.scenes):
+        if uid not in scenes:
+          self.scenes.pop(uid)
+          continue
+        state = self.scenes[uid]
+        for camera_id in list(state.rate):
+          if camera_id not in scenes[uid].cameras:
+            state.rate.pop(camera_id)
+    return
+
+  def publishDue(self, now):
+    """
+    Publishes every scene whose regulated interval has passed.
+    @param  now  Current time
+    @return Time the next scene is due, or None if no scene is waiting
+    """
+    due = []
+    next_due = None
+    with self.condition:
+      for state in self.scenes.values():
+        rate = state.scene.regulated_rate
+        if not state.updated or not rate or rate <= 0:
+          continue
+        when = now if state.last is None else state.last + 1 / rate
+        if when <= now:
+          state.last = now if state.last is None or now - when > 1 / rate else when
+          state.updated = False
+          due.append((state, state.cameras, self._snapshot(state)))
+        elif next_due is None or when < next_due:
+          next_due = when
+
+    for state, cameras, (objects, jdata) in due:
+      jdata['objects'] = self._buildObjects(state, cameras, objects)
+      topic = PubSub.formatTopic(PubSub.DATA_REGULATED, scene_id=state.scene.uid)
+      self.pubsub.publishData(topic, jdata)
+    return next_due
+
+  def _snapshot(self, state):
+    objects = {}
+    for snapshot in state.objects.values():
+      objects.update(snapshot)
+    jdata = dict(state.header)
+    jdata['rate'] = dict(state.rate)
+    return objects, jdata
+
+  def _buildObjects(self, state, cameras, objects):
+    if not self.update_visibility:
+      return [obj_dict for _, obj_dict in objects.values()]
+
+    published = {}
+    result = []
+    changed = []
+    for gid, (source, obj_dict) in objects.items():
+      previous = state.published.get(gid)
+      if previous is not None and previous[0] is obj_dict:
+        regulated = previous[1]
+      else:
+        # Cached object dictionaries are shared with the other topics
+        regulated = dict(obj_dict)
+        if source is not None:
+          changed.append((source, regulated))
+      published[gid] = (obj_dict, regulated)
+      result.append(regulated)
+    if changed:
+      computeCameraBoundsFromSources(cameras, changed)
+    state.published = published
+    return result
+
+  def start(self):
+    """Starts the timer thread that publishes the scenes when they are due"""
+    self.running = True
+    self.thread = threading.Thread(target=self._run, daemon=True, name="regulated-publisher")
+    self.thread.start()
+    return
+
+  def stop(self):
+    with self.condition:
+      self.running = False
+      self.condition.notify_all()
+    if self.thread is not None:
+      self.thread.join()
+      self.thread = None
+    return
+
+  def _run(self):
+    while True:
+      with self.condition:
+        generation = self.generation
+      try:
+        next_due = self.publishDue(get_epoch_time())
+      except Exception as e:
+        log.error("Failed to publish regulated detections", e)
+        next_due = None
+      with self.condition:
+        if not self.running:
+          break
+        if generation == self.generation:
+          timeout = None if next_due is None else next_due - get_epoch_time()
+          if timeout is None or timeout > 0:
+            self.condition.wait(timeout)
+    return
@@ -71,3 +71,19 @@ class ReIDDatabase(ABC):
     @return  iterable     Entries with the closest similarity scores
     """
     return
+
+  def processBatch(self, entries, queries, set_name, k_neighbors):
+    """
+    Adds several entries and then searches for several sets of Re-ID vectors.
+    Databases that can send them in one request should override this.
+
+    @param   entries      List of (uuid, rvid, object_type, reid_vectors) to add
+    @param   queries      List of (object_type, reid_vectors) to search for
+    @param   set_name     Name of the set to use
+    @param   k_neighbors  Number of similar entries to return for each vector
+    @return  list         Result of findSimilarityScores() for each query
+    """
+    for uuid, rvid, object_type, reid_vectors in entries:
+      self.addEntry(uuid, rvid, object_type, reid_vectors, set_name)
+    return [self.findSimilarityScores(object_type, reid_vectors, set_name, k_neighbors)
+            for object_type, reid_vectors in queries]
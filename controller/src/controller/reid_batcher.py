@@ -0,0 +1,122 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import concurrent.futures
+import threading
+import time
+
+from controller.vdms_adapter import K_NEIGHBORS, SCHEMA_NAME
+from scene_common import log
+
+DEFAULT_BATCH_DELAY = 0.05
+DEFAULT_BATCH_SIZE = 32
+
+class ReIDBatcher:
+  """
+  Collects the similarity queries and new entries of a Re-ID database and
+  sends them together.
+
+  The first request starts a batch window of max_delay seconds, which is cut
+  short once max_batch requests are pending. Each batch goes to the database
+  in a single processBatch() call, on one of as many sender threads as the
+  database has connections, and every query gets its own result back.
+  """
+
+  def __init__(self, database, max_delay=DEFAULT_BATCH_DELAY, max_batch=DEFAULT_BATCH_SIZE):
+    """
+    @param  database   ReIDDatabase the requests are sent to
+    @param  max_delay  Seconds a request may wait for others to join its batch
+    @param  max_batch  Number of pending requests sent without waiting any longer
+    """
+    self.database = database
+    self.max_delay = max_delay
+    self.max_batch = max(1, max_batch)
+    self.entries = []
+    self.queries = []
+    self.first_pending = None
+    self.sending = 0
+    self.condition = threading.Condition()
+    self.thread = None
+    self.senders = concurrent.futures.ThreadPoolExecutor(
+      max_workers=getattr(database, 'connections', 1), thread_name_prefix="reid-batch")
+    return
+
+  def findSimilarityScores(self, object_type, reid_vectors):
+    """
+    Queues a similarity query for the next batch.
+    @return Future resolving to the result of the database findSimilarityScores()
+    """
+    future = concurrent.futures.Future()
+    self._queue(self.queries, (object_type, reid_vectors, future))
+    return future
+
+  def addEntry(self, uuid, rvid, object_type, reid_vectors):
+    """Queues new entries for the next batch"""
+    self._queue(self.entries, (uuid, rvid, object_type, reid_vectors))
+    return
+
+  def flush(self):
+    """Sends the pending requests without waiting and blocks until all batches are sent"""
+    with self.condition:
+      self.first_pending = 0 if self._pending() else None
+      self.condition.notify_all()
+      while self._pending() or self.sending:
+        self.condition.wait()
+    return
+
+  def _pending(self):
+    return len(self.entries) + len(self.queries)
+
+  def _queue(self, requests, request):
+    with self.condition:
+      requests.append(request)
+      if self.first_pending is None:
+        self.first_pending = time.monotonic()
+      if self.thread is None:
+        self.thread = threading.Thread(target=self._run, daemon=True, name="reid-batcher")
+        self.thread.start()
+      self.condition.notify_all()
+    return
+
+  def _run(self):
+    while True:
+      with self.condition:
+        while True:
+          if self.first_pending is not None:
+            remaining = self.first_pending + self.max_delay - time.monotonic()
+            if remaining <= 0 or self._pending() >= self.max_batch:
+              break
+            self.condition.wait(remaining)
+          else:
+            self.condition.wait()
+        entries, self.entries = self.entries, []
+        queries, self.queries = self.queries, []
+        self.first_pending = None
+        self.sending += 1
+      self.senders.submit(self._send, entries, queries)
+    return
+
+  def _send(self, entries, queries):
+    try:
+      results = self.database.processBatch(entries, [query[:2] for query in queries],
+                                           SCHEMA_NAME, K_NEIGHBORS)
+      for (_, _, future), result in zip(queries, results):
+        future.set_result(result)
+    except Exception as e:
+      log.error("Failed to send Re-ID batch", e)
+      for _, _, future in queries:
+        if not future.done():
+          future.set_exception(e)
+    finally:
+      with self.condition:
+        self.sending -= 1
+        self.condition.notify_all()
+    return
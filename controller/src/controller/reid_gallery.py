@@ -0,0 +1,333 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import os
+import threading
+
+import numpy as np
+
+from controller.reid import ReIDDatabase
+from scene_common import log
+from scene_common.timestamp import get_epoch_time
+
+K_NEIGHBORS = 1
+SCHEMA_NAME = "reid_vector"
+SIMILARITY_METRIC = "L2"
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_MAX_AGE = None
+SNAPSHOT_INTERVAL = 60
+INITIAL_CAPACITY = 1024
+
+class ReIDGallery:
+  """
+  Re-ID vectors of one object category kept in a float32 matrix.
+
+  Rows are allocated on demand up to max_entries. When the gallery is full,
+  new vectors replace the least recently used ones, where a vector is used
+  when it is added or returned as a neighbor. Vectors not used for max_age
+  seconds are dropped. Without dimensions, the vector length is taken from
+  the first vectors stored.
+  """
+
+  def __init__(self, dimensions=None, max_entries=DEFAULT_MAX_ENTRIES, max_age=DEFAULT_MAX_AGE):
+    self.dimensions = dimensions
+    self.max_entries = max(1, max_entries)
+    self.max_age = max_age
+    capacity = min(INITIAL_CAPACITY, self.max_entries)
+    self.vectors = np.empty((capacity, dimensions or 0), dtype=np.float32)
+    self.norms = np.empty(capacity, dtype=np.float32)
+    self.last_used = np.empty(capacity, dtype=np.float64)
+    self.uuids = np.empty(capacity, dtype=object)
+    self.rvids = np.empty(capacity, dtype=object)
+    self.size = 0
+    return
+
+  def _resize(self, capacity):
+    for name in ('vectors', 'norms', 'last_used', 'uuids', 'rvids'):
+      array = getattr(self, name)
+      resized = np.empty((capacity,) + array.shape[1:], dtype=array.dtype)
+      resized[:self.size] = array[:self.size]
+      setattr(self, name, resized)
+    return
+
+  def _matchDimensions(self, dimensions):
+    """Sets the vector length on first use, returns False for vectors of another length"""
+    if self.dimensions is None:
+      self.dimensions = dimensions
+      self.vectors = np.empty((len(self.norms), dimensions), dtype=np.float32)
+    return dimensions == self.dimensions
+
+  def _slotsFor(self, count):
+    """Returns the rows to store count new vectors in, evicting old ones if needed"""
+    free = self.max_entries - self.size
+    if count > len(self.vectors) - self.size and len(self.vectors) < self.max_entries:
+      capacity = len(self.vectors)
+      while capacity - self.size < count and capacity < self.max_entries:
+        capacity *= 2
+      self._resize(min(capacity, self.max_entries))
+
+    appended = min(count, free)
+    slots = np.arange(self.size, self.size + appended)
+    self.size += appended
+    if appended < count:
+      evicted = np.argpartition(self.last_used[:self.size - appended],
+                                count - appended - 1)[:count - appended]
+      slots = np.concatenate([slots, evicted])
+    return slots
+
+  def add(self, uuid, rvid, vectors, now):
+    """
+    @param  uuid     Unique ID of the object
+    @param  rvid     ID of the object from the motion tracker
+    @param  vectors  Matrix of Re-ID vectors, one per row
+    @param  now      Current time in seconds since the epoch
+    """
+    if not self._matchDimensions(vectors.shape[1]):
+      log.warn(f"Ignoring Re-ID vectors of length {vectors.shape[1]},"
+               f" the gallery holds vectors of length {self.dimensions}")
+      return
+    vectors = vectors[-self.max_entries:]
+    self.expire(now)
+    slots = self._slotsFor(len(vectors))
+    self.vectors[slots] = vectors
+    self.norms[slots] = np.einsum('ij,ij->i', vectors, vectors)
+    self.last_used[slots] = now
+    self.uuids[slots] = uuid
+    self.rvids[slots] = rvid
+    return
+
+  def expire(self, now):
+    """Drops the vectors not used for max_age seconds"""
+    if self.max_age is None or not self.size:
+      return
+    keep = np.flatnonzero(self.last_used[:self.size] >= now - self.max_age)
+    if len(keep) < self.size:
+      for array in (self.vectors, self.norms, self.last_used, self.uuids, self.rvids):
+        array[:len(keep)] = array[keep]
+      self.size = len(keep)
+    return
+
+  def search(self, vectors, k_neighbors, now):
+    """
+    Finds the nearest neighbors of all query vectors with one matrix product.
+    @param  vectors      Matrix of query vectors, one per row
+    @param  k_neighbors  Number of neighbors to return for each query vector
+    @param  now          Current time in seconds since the epoch
+    @return List with the neighbors of each query vector, nearest first, as
+            dicts with the uuid, rvid and squared L2 _distance
+    """
+    self.expire(now)
+    if not self.size:
+      return []
+    if vectors.shape[1] != self.dimensions:
+      log.warn(f"Cannot search Re-ID vectors of length {vectors.shape[1]},"
+               f" the gallery holds vectors of length {self.dimensions}")
+      return []
+    k_neighbors = min(k_neighbors, self.size)
+    # Squared L2 distance |q|^2 - 2 q.v + |v|^2, the same as the VDMS L2 metric
+    distances = self.vectors[:self.size] @ vectors.T
+    distances *= -2
+    distances += self.norms[:self.size, np.newaxis]
+    distances += np.einsum('ij,ij->i', vectors, vectors)
+    np.maximum(distances, 0, out=distances)
+
+    if k_neighbors < self.size:
+      nearest = np.argpartition(distances, k_neighbors - 1, axis=0)[:k_neighbors]
+    else:
+      nearest = np.broadcast_to(np.arange(self.size)[:, np.newaxis], distances.shape)
+    nearest_distances = np.take_along_axis(distances, nearest, axis=0)
+    order = np.argsort(nearest_distances, axis=0)
+    nearest = np.take_along_axis(nearest, order, axis=0)
+    nearest_distances = np.take_along_axis(nearest_distances, order, axis=0)
+    self.last_used[np.unique(nearest)] = now
+
+    return [[{'uuid': self.uuids[row], 'rvid': self.rvids[row], '_distance': float(distance)}
+             for row, distance in zip(nearest[:, idx], nearest_distances[:, idx])]
+            for idx in range(len(vectors))]
+
+  def state(self):
+    return {
+      'vectors': self.vectors[:self.size],
+      'last_used': self.last_used[:self.size],
+      'uuids': self.uuids[:self.size].astype(str),
+      'rvids': self.rvids[:self.size].astype(str),
+    }
+
+  def restore(self, state):
+    if not self._matchDimensions(state['vectors'].shape[1]):
+      raise ValueError(f"snapshot vectors of length {state['vectors'].shape[1]}"
+                       f" do not match the length {self.dimensions}")
+    count = min(len(state['vectors']), self.max_entries)
+    if count > len(self.vectors):
+      self._resize(count)
+    newest = np.argsort(state['last_used'])[len(state['last_used']) - count:]
+    self.size = count
+    self.vectors[:count] = state['vectors'][newest]
+    self.norms[:count] = np.einsum('ij,ij->i', self.vectors[:count], self.vectors[:count])
+    self.last_used[:count] = state['last_used'][newest]
+    self.uuids[:count] = state['uuids'][newest]
+    self.rvids[:count] = state['rvids'][newest]
+    return
+
+class ReIDGallerySet:
+  """Galleries of every object category of a descriptor set, optionally saved to a file"""
+
+  def __init__(self, dimensions, max_entries, max_age, snapshot_file):
+    self.dimensions = dimensions
+    self.max_entries = max_entries
+    self.max_age = max_age
+    self.snapshot_file = snapshot_file
+    self.galleries = {}
+    self.lock = threading.Lock()
+    self.last_snapshot = None
+    self.changed = False
+    self.load()
+    return
+
+  def gallery(self, object_type):
+    gallery = self.galleries.get(object_type, None)
+    if gallery is None:
+      gallery = self.galleries[object_type] = ReIDGallery(self.dimensions, self.max_entries,
+                                                          self.max_age)
+    return gallery
+
+  def load(self):
+    if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+      return
+    try:
+      with np.load(self.snapshot_file) as snapshot:
+        for object_type in {key.rsplit('/', 1)[0] for key in snapshot.files}:
+          self.gallery(object_type).restore({
+            name: snapshot[f"{object_type}/{name}"]
+            for name in ('vectors', 'last_used', 'uuids', 'rvids')
+          })
+      log.info("Loaded Re-ID gallery", self.snapshot_file)
+    except (OSError, KeyError, ValueError) as e:
+      log.warn(f"Failed to load Re-ID gallery {self.snapshot_file}: {e}")
+    return
+
+  def save(self):
+    """Writes the galleries to the snapshot file, replacing it atomically"""
+    arrays = {}
+    with self.lock:
+      for object_type, gallery in self.galleries.items():
+        for name, array in gallery.state().items():
+          arrays[f"{object_type}/{name}"] = array.copy()
+      self.changed = False
+    temp_file = f"{self.snapshot_file}.tmp"
+    try:
+      with open(temp_file, 'wb') as snapshot:
+        np.savez(snapshot, **arrays)
+      os.replace(temp_file, self.snapshot_file)
+    except OSError as e:
+      log.warn(f"Failed to save Re-ID gallery {self.snapshot_file}: {e}")
+    return
+
+  def saveIfDue(self, now, interval=SNAPSHOT_INTERVAL):
+    if not self.snapshot_file or not self.changed:
+      return
+    if self.last_snapshot is not None and now - self.last_snapshot < interval:
+      return
+    self.last_snapshot = now
+    self.save()
+    return
+
+gallery_sets = {}
+gallery_sets_lock = threading.Lock()
+
+class InMemoryDatabase(ReIDDatabase):
+  """
+  Re-ID database kept in the controller process, needing no external service.
+
+  All instances with the same set name share their galleries, so objects are
+  matched across scenes as with a shared VDMS set. Queries compute the
+  distances of all query vectors to the gallery of the category with one
+  matrix product. Galleries are bounded and, when a snapshot file is given,
+  saved to it every SNAPSHOT_INTERVAL seconds and restored on connect.
+  """
+
+  def __init__(self, set_name=SCHEMA_NAME, similarity_metric=SIMILARITY_METRIC,
+               dimensions=None, max_entries=DEFAULT_MAX_ENTRIES,
+               max_age=DEFAULT_MAX_AGE, snapshot_file=None):
+    """
+    @param  dimensions     Length of the Re-ID vectors, None takes it from the first
+                           vectors stored for each category
+    @param  max_entries    Maximum number of vectors kept per category
+    @param  max_age        Seconds after which unused vectors are dropped, None keeps them
+    @param  snapshot_file  File the galleries are saved to, None keeps them in memory only
+    """
+    self.set_name = set_name
+    self.similarity_metric = similarity_metric
+    self.dimensions = dimensions
+    self.max_entries = max_entries
+    self.max_age = max_age
+    self.snapshot_file = snapshot_file
+    self.gallery_set = None
+    return
+
+  def connect(self, hostname=None):
+    if not self.findSchema(self.set_name):
+      self.addSchema(self.set_name, self.similarity_metric, self.dimensions)
+    self.gallery_set = gallery_sets[self.set_name]
+    return
+
+  def addSchema(self, set_name, similarity_metric, dimensions):
+    if similarity_metric != SIMILARITY_METRIC:
+      log.warn(f"In-memory Re-ID database only supports the {SIMILARITY_METRIC} metric,"
+               f" ignoring {similarity_metric}")
+    with gallery_sets_lock:
+      if set_name not in gallery_sets:
+        gallery_sets[set_name] = ReIDGallerySet(dimensions, self.max_entries, self.max_age,
+                                                self.snapshot_file)
+    return
+
+  def _gallerySet(self, set_name):
+    if set_name == self.set_name and self.gallery_set is not None:
+      return self.gallery_set
+    return gallery_sets.get(set_name, None)
+
+  def _asMatrix(self, reid_vectors):
+    vectors = np.asarray(reid_vectors, dtype=np.float32)
+    if not vectors.size:
+      return None
+    return vectors.reshape(-1, vectors.shape[-1])
+
+  def addEntry(self, uuid, rvid, object_type, reid_vectors, set_name=SCHEMA_NAME):
+    gallery_set = self._gallerySet(set_name)
+    if gallery_set is None:
+      log.warn(f"Re-ID descriptor set {set_name} does not exist")
+      return
+    vectors = self._asMatrix(reid_vectors)
+    if vectors is None:
+      return
+    now = get_epoch_time()
+    with gallery_set.lock:
+      gallery_set.gallery(object_type).add(str(uuid), str(rvid), vectors, now)
+      gallery_set.changed = True
+    gallery_set.saveIfDue(now)
+    return
+
+  def findSchema(self, set_name):
+    return set_name in gallery_sets
+
+  def findSimilarityScores(self, object_type, reid_vectors, set_name=SCHEMA_NAME,
+                           k_neighbors=K_NEIGHBORS):
+    gallery_set = self._gallerySet(set_name)
+    if gallery_set is None or reid_vectors is None:
+      return None
+    vectors = self._asMatrix(reid_vectors)
+    if vectors is None:
+      return []
+    with gallery_set.lock:
+      gallery = gallery_set.galleries.get(object_type, None)
+      if gallery is None:
+        return []
+      return gallery.search(vectors, k_neighbors, get_epoch_time())
@@ -9,21 +9,23 @@
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
 
-import cv2
 import itertools
 import numpy as np
 
+from controller import stage_metrics
 from controller.ilabs_tracking import IntelLabsTracking
+from controller.moving_object import MovingObject
+from controller.stage_metrics import UPDATE_EVENTS
 from controller.tracking import (MAX_UNRELIABLE_TIME,
                                  NON_MEASUREMENT_TIME_DYNAMIC,
                                  NON_MEASUREMENT_TIME_STATIC)
 from scene_common import log
 from scene_common.camera import Camera
 from scene_common.earth_lla import convertLLAToECEF
-from scene_common.geometry import Line, Point, Region, Tripwire
+from scene_common.geometry import Line, Point, Region, RegionIndex, Tripwire
 from scene_common.scene_model import SceneModel
 from scene_common.timestamp import get_epoch_time, get_iso_time
-from scene_common.transform import CameraPose
+from scene_common.transform import CameraPose, MapRaycaster
 
 DEBOUNCE_DELAY = 0.5
 
@@ -50,9 +52,14 @@ class Scene(SceneModel):
     self.max_unreliable_time = max_unreliable_time
     self.non_measurement_time_dynamic = non_measurement_time_dynamic
     self.non_measurement_time_static = non_measurement_time_static
+    self.uid = None
     self.tracker = None
     self.trackerType = None
     self.setTracker(self.DEFAULT_TRACKER)
+    self.region_index = RegionIndex()
+    self.sensor_index = RegionIndex()
+    self.tripwire_index = RegionIndex()
+    self.map_raycaster = None
 
     # FIXME - only for backwards compatibility
     self.scale = scale
@@ -106,14 +113,26 @@ class Scene(SceneModel):
       self.setTracker(self.trackerType)
     return
 
+  def mapRaycaster(self):
+    """Ray casting scene of the map, rebuilt when the map or its placement changes"""
+    if self.map_triangle_mesh is None:
+      return None
+    if self.map_raycaster is None or not self.map_raycaster.isFor(
+        self.map_triangle_mesh, self.mesh_translation, self.mesh_rotation):
+      self.map_raycaster = MapRaycaster.fromSceneMap(self.map_triangle_mesh,
+                                                     self.mesh_translation, self.mesh_rotation)
+    return self.map_raycaster
+
   def _createMovingObjectsForDetection(self, detectionType, detections, when, camera):
     objects = []
+    map_raycaster = None
     for info in detections:
       mobj = self.tracker.createObject(detectionType, info, when, camera)
-      mobj.map_triangle_mesh = self.map_triangle_mesh
-      mobj.map_translation = self.mesh_translation
-      mobj.map_rotation = self.mesh_rotation
+      if mobj.project_to_map:
+        map_raycaster = map_raycaster or self.mapRaycaster()
+        mobj.map_raycaster = map_raycaster
       objects.append(mobj)
+    MovingObject.mapDetectionsToWorld(objects, camera)
     return objects
 
 
@@ -139,20 +158,20 @@ class Scene(SceneModel):
       log.info("DISCARDING: camera has no pose")
       return True
     for detection_type, detections in jdata['objects'].items():
+      pixel_boxes = []
       if "intrinsics" not in jdata:
         # if no intrinsics are provided, then bounding boxes are in pixels and not normalized
-        for obj in detections:
-          if 'bounding_box' not in obj and 'bounding_box_px' in obj:
-            x = obj['bounding_box_px']['x']
-            y = obj['bounding_box_px']['y']
-            w = obj['bounding_box_px']['width']
-            h = obj['bounding_box_px']['height']
-            agnosticx, agnosticy, agnosticw, agnostich = self.computePixelsToMeterPlane(x, y, w, h,
-                                  camera.pose.intrinsics.intrinsics, camera.pose.intrinsics.distortion)
-            obj['bounding_box'] = {'x': agnosticx, 'y': agnosticy, 'width': agnosticw, 'height': agnostich}
+        pixel_boxes = [obj for obj in detections
+                       if 'bounding_box' not in obj and 'bounding_box_px' in obj]
+      if pixel_boxes:
+        boxes = camera.pose.intrinsics.infer3DCoordsFrom2DDetections(
+          [[obj['bounding_box_px'][key] for key in ('x', 'y', 'width', 'height')]
+           for obj in pixel_boxes])
+        for obj, (x, y, w, h) in zip(pixel_boxes, boxes.tolist()):
+          obj['bounding_box'] = {'x': x, 'y': y, 'width': w, 'height': h}
 
       objects = self._createMovingObjectsForDetection(detection_type, detections, when, camera)
-      self.finishProcessing(detection_type, when, objects)
+      self.finishProcessing(detection_type, when, objects, source=camera)
     return True
 
   def processSceneData(self, jdata, child, cameraPose,
@@ -187,17 +206,22 @@ class Scene(SceneModel):
       else:
         child_objects.append(mobj)
 
-    self.finishProcessing(detectionType, when, objects, child_objects)
+    self.finishProcessing(detectionType, when, objects, child_objects, source=child)
     return True
 
-  def finishProcessing(self, detectionType, when, objects, already_tracked_objects=[]):
+  def finishProcessing(self, detectionType, when, objects, already_tracked_objects=[],
+                       source=None):
     self.updateVisible(objects)
     self.tracker.trackObjects(objects, already_tracked_objects, when, [detectionType],
                               self.ref_camera_frame_rate,
                               self.max_unreliable_time,
                               self.non_measurement_time_dynamic,
-                              self.non_measurement_time_static)
+                              self.non_measurement_time_static,
+                              metrics_key=self.uid,
+                              sources=() if source is None else (source,))
+    start = stage_metrics.recorder.start()
     self.updateEvents(detectionType, when)
+    stage_metrics.recorder.record(self.uid, UPDATE_EVENTS, start)
     return
 
   def updateSensorObjects(self, name, sensor, objects=None):
@@ -244,31 +268,33 @@ class Scene(SceneModel):
 
   def updateEvents(self, detectionType, now):
     self.events = {}
-    now_str = get_iso_time(now)
     for obj in self.tracker.currentObjects(detectionType):
-      obj.chain_data.publishedLocations.insert(0, obj.sceneLoc)
+      obj.chain_data.addPublishedLocation(obj.sceneLoc)
 
-    self.updateRegionEvents(detectionType, self.regions, now, now_str)
-    self.updateRegionEvents(detectionType, self.sensors, now, now_str)
+    self.updateRegionEvents(detectionType, self.regions, now)
+    self.updateRegionEvents(detectionType, self.sensors, now)
 
     self.updateTripwireEvents(detectionType, now)
     return
 
   def updateTripwireEvents(self, detectionType, now):
+    crossings = {}
+    for obj in self.tracker.currentObjects(detectionType):
+      if obj.frameCount <= 3:
+        continue
+      segment = obj.chain_data.publishedSegment()
+      if segment is not None:
+        line = Line(Point(segment[0], segment[1]), Point(segment[2], segment[3]))
+        for key in self.tripwire_index.candidates(self.tripwires, line.x1, line.y1,
+                                                  line.x2, line.y2):
+          d = self.tripwires[key].lineCrosses(line)
+          if d != 0:
+            crossings.setdefault(key, []).append(TripwireEvent(obj, -d))
+
     for key in self.tripwires:
       tripwire = self.tripwires[key]
       tripwireObjects = tripwire.objects.get(detectionType, [])
-      objects = []
-      curObjects = self.tracker.currentObjects(detectionType)
-      for obj in curObjects:
-        age = now - obj.when
-        if obj.frameCount > 3 \
-           and len(obj.chain_data.publishedLocations) > 1:
-          d = tripwire.lineCrosses(Line(obj.chain_data.publishedLocations[0].as2Dxy,
-                                        obj.chain_data.publishedLocations[1].as2Dxy))
-          if d != 0:
-            event = TripwireEvent(obj, -d)
-            objects.append(event)
+      objects = crossings.get(key, [])
 
       if len(tripwireObjects) != len(objects) \
          and now - tripwire.when > DEBOUNCE_DELAY:
@@ -280,17 +306,23 @@ class Scene(SceneModel):
         self.events['objects'].append((key, tripwire))
     return
 
-  def updateRegionEvents(self, detectionType, regions, now, now_str):
+  def _regionIndexFor(self, regions):
+    if regions is self.sensors:
+      return self.sensor_index
+    if regions is self.tripwires:
+      return self.tripwire_index
+    return self.region_index
+
+  def updateRegionEvents(self, detectionType, regions, now):
     updated = set()
+    curObjects = [obj for obj in self.tracker.currentObjects(detectionType)
+                  if obj.frameCount > 3]
+    membership = self._regionIndexFor(regions).membership(regions,
+                                                          [obj.sceneLoc for obj in curObjects])
     for key in regions:
       region = regions[key]
       regionObjects = region.objects.get(detectionType, [])
-      objects = []
-      curObjects = self.tracker.currentObjects(detectionType)
-      for obj in curObjects:
-        if obj.frameCount > 3 \
-           and region.isPointWithin(obj.sceneLoc):
-          objects.append(obj)
+      objects = [curObjects[idx] for idx in membership.get(key, [])]
 
       cur = set(x.gid for x in objects)
       prev = set(x.gid for x in regionObjects)
@@ -299,7 +331,7 @@ class Scene(SceneModel):
       newObjects = [x for x in objects if x.gid in new]
       for obj in newObjects:
         if key not in obj.chain_data.regions:
-          obj.chain_data.regions[key] = {'entered': now_str}
+          obj.chain_data.regions[key] = {'entered': now}
           updated.add(key)
 
       # For sensors add the current sensor value to any new objects
@@ -309,7 +341,7 @@ class Scene(SceneModel):
         self.updateSensorObjects(key, region, newObjects)
 
       if (len(new) or len(old)) and now - region.when > DEBOUNCE_DELAY:
-        log.debug("REGION EVENT", key, now_str, regionObjects, len(objects))
+        log.debug("REGION EVENT", key, now, regionObjects, len(objects))
         entered = []
         for obj in objects:
           if obj.gid in new and key in obj.chain_data.regions:
@@ -322,8 +354,7 @@ class Scene(SceneModel):
         for obj in regionObjects:
           if obj.gid in old:
             if key in obj.chain_data.regions:
-              entered = get_epoch_time(obj.chain_data.regions[key]['entered'])
-              dwell = now - entered
+              dwell = now - obj.chain_data.regions[key]['entered']
               exited.append((obj, dwell))
             obj.chain_data.regions.pop(key, None)
         if not hasattr(region, 'exited'):
@@ -345,16 +376,19 @@ class Scene(SceneModel):
 
   def updateVisible(self, curObjects):
     """! Update the visibility of objects from cameras in the scene."""
-    for obj in curObjects:
-      vis = []
+    if not curObjects:
+      return
+    locations = np.array([(obj.sceneLoc.x, obj.sceneLoc.y) for obj in curObjects])
+    vis = [[] for _ in curObjects]
 
-      for sname in self.cameras:
-        camera = self.cameras[sname]
-        if hasattr(camera, 'pose') and hasattr(camera.pose, 'regionOfView') \
-           and camera.pose.regionOfView.isPointWithin(obj.sceneLoc):
-          vis.append(camera.cameraID)
+    for sname in self.cameras:
+      camera = self.cameras[sname]
+      if hasattr(camera, 'pose') and hasattr(camera.pose, 'regionOfView'):
+        for idx in np.flatnonzero(camera.pose.regionOfView.pointsWithin(locations)):
+          vis[idx].append(camera.cameraID)
 
-      obj.visibility = vis
+    for obj, obj_vis in zip(curObjects, vis):
+      obj.visibility = obj_vis
     return
 
   @classmethod
@@ -420,6 +454,7 @@ class Scene(SceneModel):
     deleted = old - new
     for region_uuid in deleted:
       existingRegions.pop(region_uuid)
+    self._regionIndexFor(existingRegions).update(existingRegions)
     return
 
   def updateTripwires(self, newTripwires):
@@ -434,28 +469,6 @@ class Scene(SceneModel):
     deleted = old - new
     for tripwireID in deleted:
       self.tripwires.pop(tripwireID)
+    self.tripwire_index.update(self.tripwires)
     return
 
-  def computePixelsToMeterPlane(self, x,y,width,height, cameraintrinsicsmatrix, distortionmatrix):
-    """
-    ! Convert pixel coordinates to undistorted normalized image coordinates using camera intrinsics and distortion matrices.
-      Compute the undistorted coordinates for the given pixel point and its opposite corner.
-
-    @param   x                        X-coordinate of the top-left corner of the pixel region (in pixels).
-    @param   y                        Y-coordinate of the top-left corner of the pixel region (in pixels).
-    @param   width                    Width of the pixel region (in pixels).
-    @param   height                   Height of the pixel region (in pixels).
-    @param   cameraintrinsicsmatrix   Camera intrinsics matrix as a numpy array.
-    @param   distortionmatrix         Distortion coefficients matrix as a numpy array.
-
-    @return  Tuple containing:
-         - X-coordinate of the undistorted point (in normalized image coordinates).
-         - Y-coordinate of the undistorted point (in normalized image coordinates).
-         - Width of the undistorted region (in normalized image coordinates).
-         - Height of the undistorted region (in normalized image coordinates).
-    """
-    pxpoint = np.array([x,y], dtype='float64').reshape(-1, 1, 2)
-    pt = cv2.undistortPoints(pxpoint, cameraintrinsicsmatrix, distortionmatrix)
-    oppositepxpoint = np.array([x + width, y + height], dtype='float64').reshape(-1, 1, 2)
-    opppt = cv2.undistortPoints(oppositepxpoint, cameraintrinsicsmatrix, distortionmatrix)
-    return pt[0][0][0], pt[0][0][1], opppt[0][0][0] - pt[0][0][0], opppt[0][0][1] - pt[0][0][1]
@@ -11,36 +11,57 @@
 
 import json
 import os
+import threading
 from collections import defaultdict
+from contextlib import nullcontext
 
-import ntplib
-
+from controller import stage_metrics
 from controller.cache_manager import CacheManager
 from controller.child_scene_controller import ChildSceneController
-from controller.detections_builder import (buildDetectionsDict,
-                                           buildDetectionsList,
-                                           computeCameraBounds)
+from controller.detections_builder import (DetectionsCache,
+                                           buildDetectionsDict,
+                                           buildDetectionsList)
+from controller.ilabs_tracking import IntelLabsTracking
+from controller.regulated_publisher import RegulatedPublisher
 from controller.scene import Scene
-from scene_common import log
+from controller.scene_dispatcher import (DEFAULT_SCENE_QUEUE_DEPTH,
+                                         DEFAULT_SCENE_WORKERS, DROP_OLDEST,
+                                         SceneDispatcher)
+from controller.shard import ShardMembership
+from controller.stage_metrics import (DECODE, DROP_LAG, PROCESS_CAMERA_DATA,
+                                      PROCESS_SCENE_DATA, PUBLISH, SERIALIZE,
+                                      VALIDATE)
+from controller.tracking import Tracking
+from controller.uuid_manager import UUIDManager
+from scene_common import codec, log
 from scene_common.geometry import Point, Region, Tripwire
 from scene_common.mqtt import PubSub
 from scene_common.schema import SchemaValidation
-from scene_common.timestamp import adjust_time, get_epoch_time, get_iso_time
+from scene_common.timestamp import ClockSync, get_epoch_time, get_iso_time
 from scene_common.transform import applyChildTransform
 
 AVG_FRAMES = 100
+METRICS_INTERVAL = 10
+# Tracker config keys of each Re-ID database and the constructor options they set
+REID_DATABASE_OPTIONS = {
+  "VDMS": (("reid_connections", "connections"),),
+  "memory": (("reid_gallery_size", "max_entries"), ("reid_max_age", "max_age"),
+             ("reid_snapshot_file", "snapshot_file")),
+}
 
 class SceneController:
 
   def __init__(self, rewrite_bad_time, rewrite_all_time, max_lag, mqtt_broker,
                mqtt_auth, rest_url, rest_auth, client_cert, root_cert, ntp_server,
-               tracker_config_file, schema_file, visibility_topic):
+               tracker_config_file, schema_file, visibility_topic, msgpack_topics=None,
+               shard_id=None, scene_workers=DEFAULT_SCENE_WORKERS,
+               scene_queue_depth=DEFAULT_SCENE_QUEUE_DEPTH, scene_drop_policy=DROP_OLDEST,
+               stage_metrics_enabled=False, metrics_port=None):
     self.cert = client_cert
     self.root_cert = root_cert
     self.rewrite_bad_time = rewrite_bad_time
     self.rewrite_all_time = rewrite_all_time
     self.max_lag = max_lag
-    self.regulate_cache = {}
     self.broker = mqtt_broker
     self.mqtt_auth = mqtt_auth
     self.tracker_config_data = {}
@@ -48,21 +69,41 @@ class SceneController:
     if tracker_config_file is not None:
       self.extractTrackerConfigData(tracker_config_file)
 
-    self.last_time_sync = None
-    self.ntp_server = ntp_server
-    self.ntp_client = ntplib.NTPClient()
-    self.time_offset = 0
+    # Scene workers share the metrics timer and the rate average
+    self.rate_lock = threading.Lock()
+    self.last_metrics_publish = None
+    if metrics_port is not None:
+      stage_metrics.recorder.serve(metrics_port)
+    elif stage_metrics_enabled:
+      stage_metrics.recorder.enable()
+
+    self.clock = ClockSync(ntp_server)
+    self.clock.start()
 
     self.schema_val = SchemaValidation(schema_file)
 
+    # Without workers messages are processed by the MQTT network thread
+    self.dispatcher = None
+    if scene_workers > 0:
+      self.dispatcher = SceneDispatcher(scene_workers, scene_queue_depth, scene_drop_policy)
+
     self.pubsub = PubSub(mqtt_auth, client_cert, root_cert, mqtt_broker, keepalive=60)
     self.pubsub.onConnect = self.onConnect
+    for topic_filter in msgpack_topics or []:
+      self.pubsub.setTopicCodec(topic_filter, codec.MsgpackCodec.name)
+    self.shard = None
+    if shard_id is not None:
+      self.shard = ShardMembership(self.pubsub, shard_id, self.updateScenes)
     self.pubsub.connect()
 
     self.cache_manager = CacheManager(rest_url, rest_auth, root_cert, self.tracker_config_data)
+    self.cache_manager.update_guard = self.pauseScenes
+    self.cache_manager.start()
 
     self.visibility_topic = visibility_topic
     log.info(f"Publishing camera visibility info on ${self.visibility_topic} topic.")
+    self.regulated_publisher = RegulatedPublisher(self.pubsub, self.visibility_topic == 'regulated')
+    self.regulated_publisher.start()
     return
 
   def extractTrackerConfigData(self, tracker_config_file):
@@ -74,109 +115,131 @@ class SceneController:
       self.tracker_config_data["max_unreliable_time"] = tracker_config["max_unreliable_frames"]/tracker_config["baseline_frame_rate"]
       self.tracker_config_data["non_measurement_time_dynamic"] = tracker_config["non_measurement_frames_dynamic"]/tracker_config["baseline_frame_rate"]
       self.tracker_config_data["non_measurement_time_static"] = tracker_config["non_measurement_frames_static"]/tracker_config["baseline_frame_rate"]
+      scheduler_config = {}
+      if "worker_threads" in tracker_config:
+        scheduler_config["max_workers"] = tracker_config["worker_threads"]
+      if "max_queue_depth" in tracker_config:
+        scheduler_config["max_queue_depth"] = tracker_config["max_queue_depth"]
+      if scheduler_config:
+        Tracking.configureScheduler(**scheduler_config)
+      Tracking.coalesce_batches = tracker_config.get("coalesce_batches", False)
+      if "matching_threads" in tracker_config:
+        IntelLabsTracking.configureMatching(tracker_config["matching_threads"])
+      if "reid_database" in tracker_config:
+        database = tracker_config["reid_database"]
+        database_options = {}
+        for name, options in REID_DATABASE_OPTIONS.items():
+          for key, option in options:
+            if key not in tracker_config:
+              continue
+            if name == database:
+              database_options[option] = tracker_config[key]
+            else:
+              log.warn(f"Ignoring {key}, it only applies to the {name} Re-ID database")
+        UUIDManager.configureDatabase(database, **database_options)
+      feature_options = {}
+      for key, option in (("reid_feature_capacity", "capacity"),
+                          ("reid_feature_sampling", "sampling"),
+                          ("reid_query_mean", "query_mean")):
+        if key in tracker_config:
+          feature_options[option] = tracker_config[key]
+      if feature_options:
+        UUIDManager.configureFeatures(**feature_options)
     return
 
   def loopForever(self):
-    return self.pubsub.loopForever()
+    try:
+      return self.pubsub.loopForever()
+    finally:
+      self.stop()
+
+  def stop(self):
+    """Leaves the controller shard and disconnects from the broker"""
+    self.regulated_publisher.stop()
+    self.pubsub.loopStart()
+    if self.shard is not None:
+      self.shard.leave()
+    self.pubsub.disconnect()
+    self.pubsub.loopStop()
+    return
 
-  def publishDetections(self, scene, objects, ts, otype, jdata, camera_id):
+  def publishDetections(self, scene, objects, ts, otype, jdata, camera_id, cache=None):
     if not hasattr(scene, 'lastPubCount'):
       scene.lastPubCount = {}
 
     if not hasattr(scene, 'last_published_detection'):
       scene.last_published_detection = defaultdict(lambda: None)
 
-    self.publishSceneDetections(scene, objects, otype, jdata)
-    self.publishRegulatedDetections(scene, objects, otype, jdata, camera_id)
-    self.publishRegionDetections(scene, objects, otype, jdata)
+    if cache is None:
+      cache = DetectionsCache(scene, ts)
+
+    self.publishSceneDetections(scene, objects, otype, jdata, cache)
+    self.publishRegulatedDetections(scene, objects, otype, jdata, camera_id, cache)
+    self.publishRegionDetections(scene, objects, otype, jdata, cache)
+    return
+
+  def publishObjects(self, topic, jdata, objects, cache, update_visibility=False):
+    """Publishes jdata with its object list assembled from the encoded objects in the frame cache"""
+    start = stage_metrics.recorder.start()
+    topic_codec = self.pubsub.codecForTopic(topic)
+    fragments = [cache.fragment(obj, topic_codec, update_visibility) for obj in objects]
+    payload = topic_codec.encodeWithFragments(jdata, 'objects', fragments)
+    start = stage_metrics.recorder.record(cache.scene.uid, SERIALIZE, start)
+    self.pubsub.publish(topic, payload)
+    stage_metrics.recorder.record(cache.scene.uid, PUBLISH, start)
     return
 
   def shouldPublish(self, last, now, max_delay):
     return last is None or now - last >= max_delay
 
-  def publishSceneDetections(self, scene, objects, otype, jdata):
-    jdata['objects'] = buildDetectionsList(objects, scene, self.visibility_topic == 'unregulated')
+  def publishSceneDetections(self, scene, objects, otype, jdata, cache):
+    update_visibility = self.visibility_topic == 'unregulated'
+    jdata['objects'] = buildDetectionsList(objects, scene, update_visibility, cache)
     olen = len(jdata['objects'])
     cid = scene.name + "/" + otype
     if olen > 0 or cid not in scene.lastPubCount or scene.lastPubCount[cid] > 0:
       if 'debug_hmo_start_time' in jdata:
         jdata['debug_hmo_processing_time'] = get_epoch_time() - jdata['debug_hmo_start_time']
-      jstr = json.dumps(jdata)
       new_topic = PubSub.formatTopic(PubSub.DATA_SCENE, scene_id=scene.uid,
                                      thing_type=otype)
-      self.pubsub.publish(new_topic, jstr)
-      self.publishExternalDetections(scene, otype, jstr)
+      self.publishObjects(new_topic, jdata, objects, cache, update_visibility)
+      self.publishExternalDetections(scene, objects, otype, jdata, cache, update_visibility)
       scene.lastPubCount[cid] = olen
     return
 
-  def publishExternalDetections(self, scene, otype, jstr):
+  def publishExternalDetections(self, scene, objects, otype, jdata, cache, update_visibility):
     now = get_epoch_time()
     if self.shouldPublish(scene.last_published_detection[otype], now, 1/scene.external_update_rate):
       scene.last_published_detection[otype] = get_epoch_time()
       scene_hierarchy_topic = PubSub.formatTopic(PubSub.DATA_EXTERNAL, scene_id=scene.uid,
                                                  thing_type=otype)
-      self.pubsub.publish(scene_hierarchy_topic, jstr)
+      self.publishObjects(scene_hierarchy_topic, jdata, objects, cache, update_visibility)
     return
 
-  def publishRegulatedDetections(self, scene_obj, msg_objects, otype, jdata, camera_id):
+  def publishRegulatedDetections(self, scene_obj, msg_objects, otype, jdata, camera_id, cache):
     update_rate = self.calculateRate()
-    scene_uid = scene_obj.uid
-
-    if scene_uid not in self.regulate_cache:
-      self.regulate_cache[scene_uid] = {
-        'objects': {},
-        'rate': {},
-        'last': None
-      }
-    scene = self.regulate_cache[scene_uid]
-    scene['objects'][otype] = jdata['objects']
-    if camera_id is not None:
-      scene['rate'][camera_id] = jdata.get('rate', None)
-
-    now = get_epoch_time()
-    if self.shouldPublish(scene['last'], now, 1/scene_obj.regulated_rate):
-      # If we're doing Regulated visibility, then we need to compute for all
-      # the objects in the cache
-      objects = []
-      for key in scene['objects']:
-        for obj in scene['objects'][key]:
-          if self.visibility_topic == 'regulated':
-            aobj = next((x for x in msg_objects if x.gid == obj['id']), None)
-            computeCameraBounds(scene_obj, aobj, obj)
-          objects.append(obj)
-      new_jdata = {
-        'timestamp': jdata['timestamp'],
-        'objects': objects,
-        'id': jdata['id'],
-        'name': jdata['name'],
-        'scene_rate': round(1 / update_rate, 1),
-        'rate': scene['rate'],
-      }
-      jstr = json.dumps(new_jdata)
-      topic = PubSub.formatTopic(PubSub.DATA_REGULATED, scene_id=scene_uid)
-      self.pubsub.publish(topic, jstr)
-      scene['last'] = now
-
+    self.regulated_publisher.update(scene_obj, msg_objects, otype, jdata, camera_id,
+                                    cache, 1 / update_rate)
     return
 
-  def publishRegionDetections(self, scene, objects, otype, jdata):
+  def publishRegionDetections(self, scene, objects, otype, jdata, cache):
     for rname in scene.regions:
       robjects = []
       for obj in objects:
         if rname in obj.chain_data.regions:
           robjects.append(obj)
-      jdata['objects'] = buildDetectionsList(robjects, scene)
-      olen = len(jdata['objects'])
+      olen = len(robjects)
       rid = scene.name + "/" + rname + "/" + otype
       if olen > 0 or rid not in scene.lastPubCount or scene.lastPubCount[rid] > 0:
-        jstr = json.dumps(jdata)
         new_topic = PubSub.formatTopic(PubSub.DATA_REGION, scene_id=scene.uid,
                                        region_id=rname, thing_type=otype)
-        self.pubsub.publish(new_topic, jstr)
+        self.publishObjects(new_topic, jdata, robjects, cache)
         scene.lastPubCount[rid] = olen
     return
 
-  def publishEvents(self, scene, ts_str):
+  def publishEvents(self, scene, ts_str, cache=None):
+    if cache is None:
+      cache = DetectionsCache(scene, get_epoch_time(ts_str))
     for event_type in scene.events:
       for _, region in scene.events[event_type]:
         etype = None
@@ -198,9 +261,9 @@ class SceneController:
           etype + '_id': region.uuid,
           etype + '_name': region.name,
         }
-        detections_dict, num_objects = self._buildAllRegionObjsList(scene, region, event_data)
+        detections_dict, num_objects = self._buildAllRegionObjsList(scene, region, event_data, cache)
         self._buildEnteredObjsList(region, event_data, detections_dict)
-        self._buildExitedObjsList(scene, region, event_data)
+        self._buildExitedObjsList(scene, region, event_data, cache)
 
         log.debug("EVENT DATA", event_data)
         if hasattr(region, 'value'):
@@ -210,13 +273,13 @@ class SceneController:
           event_topic = PubSub.formatTopic(PubSub.EVENT,
                                            region_type=etype, event_type=event_type,
                                            scene_id=scene.uid, region_id=region.uuid)
-          self.pubsub.publish(event_topic, json.dumps(event_data))
+          self.pubsub.publishData(event_topic, event_data)
 
     self._clearSensorValuesOnExit(scene)
 
     return
 
-  def _buildAllRegionObjsList(self, scene, region, event_data):
+  def _buildAllRegionObjsList(self, scene, region, event_data, cache):
     counts = {}
     num_objects = 0
     all_objects = []
@@ -225,7 +288,7 @@ class SceneController:
       num_objects += counts[otype]
       all_objects += objects
     event_data['counts'] = counts
-    detections_dict = buildDetectionsDict(all_objects, scene)
+    detections_dict = buildDetectionsDict(all_objects, scene, cache)
     event_data['objects'] = list(detections_dict.values())
     return detections_dict, num_objects
 
@@ -237,7 +300,7 @@ class SceneController:
         entered_obj = detections_dict[item.gid]
         event_data['entered'].extend([entered_obj])
 
-  def _buildExitedObjsList(self, scene, region, event_data):
+  def _buildExitedObjsList(self, scene, region, event_data, cache):
     exited = getattr(region, 'exited', {})
     event_data['exited'] = []
     exited_dict = {}
@@ -246,7 +309,7 @@ class SceneController:
       for exited_obj, dwell in exited_list:
         exited_dict[exited_obj.gid] = dwell
         exited_objs.extend([exited_obj])
-      exited_objs = buildDetectionsList(exited_objs, scene)
+      exited_objs = buildDetectionsList(exited_objs, scene, cache=cache)
       exited_data = [{'object': exited_obj, 'dwell': exited_dict[exited_obj['id']]} for exited_obj in exited_objs]
       event_data['exited'].extend(exited_data)
     return
@@ -276,8 +339,7 @@ class SceneController:
          "id": "02:42:ac:11:00:05.1",
          "status": "green" }
     """
-    message = message.payload.decode('utf-8')
-    jdata = json.loads(message)
+    jdata = PubSub.decode(message.payload)
 
     if not self.schema_val.validateMessage("singleton", jdata, check_format=True):
       return
@@ -287,6 +349,11 @@ class SceneController:
     if scene is None:
       return
 
+    self.dispatch(scene, self.processSensorMessage, jdata)
+    return
+
+  def processSensorMessage(self, scene, jdata):
+    sensor_id = jdata['id']
     if self.rewrite_all_time:
       ts = get_epoch_time()
       jdata['timestamp'] = get_iso_time(ts)
@@ -306,15 +373,33 @@ class SceneController:
 
   def handleMovingObjectMessage(self, client, userdata, message):
     topic = PubSub.parseTopic(message.topic)
-    jdata = json.loads(message.payload.decode('utf-8'))
-    if 'camera_id' in topic and not self.schema_val.validateMessage("detector", jdata):
-      return
+    if topic['_topic_id'] == PubSub.DATA_EXTERNAL:
+      sender = self._childSceneSender(topic['scene_id'])
+      if sender is None:
+        return
+      scene = self.cache_manager.sceneWithID(sender.parent)
+      if scene is None:
+        log.error("UNKNOWN PARENT", topic['scene_id'])
+        return
+    else:
+      sender = scene = self.cache_manager.sceneWithCameraID(topic['camera_id'])
+      if sender is None:
+        log.error("UNKNOWN SENDER", topic['camera_id'])
+        return
 
-    now = get_epoch_time()
-    self.time_offset, self.last_time_sync = adjust_time(now, self.ntp_server, self.ntp_client,
-                                                     self.last_time_sync, self.time_offset,
-                                                     ntplib.NTPException)
-    now += self.time_offset
+    self.dispatch(scene, self.processMovingObjectMessage, message, topic, sender)
+    return
+
+  def processMovingObjectMessage(self, scene, message, topic, sender):
+    start = stage_metrics.recorder.start()
+    jdata = PubSub.decode(message.payload)
+    start = stage_metrics.recorder.record(scene.uid, DECODE, start)
+    if 'camera_id' in topic:
+      if not self.schema_val.validateMessage("detector", jdata):
+        return
+      stage_metrics.recorder.record(scene.uid, VALIDATE, start)
+
+    now = self.clock.now()
     if 'updatecamera' in jdata:
       return
 
@@ -331,23 +416,23 @@ class SceneController:
     if lag > self.max_lag:
       if not self.rewrite_bad_time:
         log.warn("{} FELL BEHIND by {}. SKIPPING {}".format(message.topic, lag, jdata['id']))
+        stage_metrics.recorder.countDrop(scene.uid, DROP_LAG)
         return
       msg_when = now
 
     camera_id = None
+    start = stage_metrics.recorder.start()
     if topic['_topic_id'] == PubSub.DATA_EXTERNAL:
       detection_types = [topic['thing_type']]
       sender_id = topic['scene_id']
-      success, scene = self._handleChildSceneObject(sender_id, jdata, detection_types[0], msg_when)
+      success = scene.processSceneData(jdata, sender, sender.cameraPose,
+                                       detection_types[0], when=msg_when)
+      stage_metrics.recorder.record(scene.uid, PROCESS_SCENE_DATA, start)
     else:
       detection_types = jdata['objects'].keys()
       camera_id = sender_id = topic['camera_id']
-      sender = self.cache_manager.sceneWithCameraID(sender_id)
-      if sender is None:
-        log.error("UNKNOWN SENDER", sender_id)
-        return
-      scene = sender
       success = scene.processCameraData(jdata, when=msg_when)
+      stage_metrics.recorder.record(scene.uid, PROCESS_CAMERA_DATA, start)
 
     if not success:
       log.error("Camera fail", sender_id, scene.name)
@@ -356,31 +441,66 @@ class SceneController:
 
     jdata['id'] = scene.uid
     jdata['name'] = scene.name
+    cache = DetectionsCache(scene, msg_when)
     for detection_type in detection_types:
       jdata['unique_detection_count'] = scene.tracker.getUniqueIDCount(detection_type)
       self.publishDetections(scene, scene.tracker.currentObjects(detection_type),
-                            msg_when, detection_type, jdata, camera_id)
-      self.publishEvents(scene, jdata['timestamp'])
+                            msg_when, detection_type, jdata, camera_id, cache)
+      self.publishEvents(scene, jdata['timestamp'], cache)
+    self.publishMetrics(now)
     return
 
-  def _handleChildSceneObject(self, sender_id, jdata, detection_type, msg_when):
+  def publishMetrics(self, now):
+    """Publish tracker batch counters and stage latencies for every scene at most every METRICS_INTERVAL seconds"""
+    with self.rate_lock:
+      if self.last_metrics_publish is not None \
+            and now - self.last_metrics_publish < METRICS_INTERVAL:
+        return
+      self.last_metrics_publish = now
+    metrics = {
+      'timestamp': get_iso_time(now),
+      'scenes': {},
+    }
+    if self.shard is not None:
+      metrics['instance'] = self.shard.instance_id
+    for scene in self.scenes:
+      metrics['scenes'][scene.uid] = {
+        'name': scene.name,
+        'tracker': scene.tracker.batchCounts(),
+      }
+      if self.dispatcher is not None:
+        metrics['scenes'][scene.uid]['dispatch'] = self.dispatcher.stats(scene.uid)
+      if stage_metrics.recorder.enabled:
+        metrics['scenes'][scene.uid].update(stage_metrics.recorder.summary(scene.uid))
+    self.pubsub.publishData(PubSub.formatTopic(PubSub.SYS_CONTROLLER_METRICS), metrics)
+    return
+
+  def _childSceneSender(self, sender_id):
     sender = self.cache_manager.sceneWithID(sender_id)
     if sender is None:
-      remote_sender = self.cache_manager.sceneWithRemoteChildID(sender_id)
-      if remote_sender is None:
+      sender = self.cache_manager.sceneWithRemoteChildID(sender_id)
+      if sender is None:
         log.error("UNKNOWN SENDER")
-        return
-      else:
-        sender = remote_sender
+        return None
 
     if not hasattr(sender, 'parent') or sender.parent is None:
       log.error("UNKNOWN PARENT", sender_id)
-      return False, sender
+      return None
+    return sender
+
+  def dispatch(self, scene, function, *args):
+    """Processes a message of the scene in order with its other messages"""
+    if self.dispatcher is None:
+      function(scene, *args)
+    elif not self.dispatcher.submit(scene.uid, function, scene, *args):
+      log.debug("Scene busy, dropped message", scene.name)
+    return
 
-    scene = self.cache_manager.sceneWithID(sender.parent)
-    success = scene.processSceneData(jdata, sender, sender.cameraPose,
-                                     detection_type, when=msg_when)
-    return success, scene
+  def pauseScenes(self):
+    """Context in which no message is being processed, so scenes can be modified"""
+    if self.dispatcher is None:
+      return nullcontext()
+    return self.dispatcher.paused()
 
   def updateCameras(self):
     for scene in self.scenes:
@@ -391,35 +511,38 @@ class SceneController:
     return
 
   def updateRegulateCache(self):
-    for scene in list(self.regulate_cache.keys()):
-      if scene not in self.scenes:
-        self.regulate_cache.pop(scene)
-      else:
-        for cam in scene['rate']:
-          if cam not in scene.cameras:
-            scene['rate'].pop(cam)
+    self.regulated_publisher.removeStale(self.scenes)
+    if self.dispatcher is not None:
+      self.dispatcher.removeStale(scene.uid for scene in self.scenes)
+    stage_metrics.recorder.removeStale(scene.uid for scene in self.scenes)
+    return
+
+  def updateScenes(self):
+    self.updateSubscriptions()
+    self.updateObjectClasses()
+    self.updateCameras()
+    self.updateRegulateCache()
     return
 
   def handleDatabaseMessage(self, client, userdata, message):
     command = str(message.payload.decode("utf-8"))
     if command == "update":
-      self.updateSubscriptions()
-      self.updateObjectClasses()
-      self.updateCameras()
-      self.updateRegulateCache()
+      self.updateScenes()
     return
 
   def calculateRate(self):
     now = get_epoch_time()
-    if not hasattr(self, "regulate_rate"):
+    with self.rate_lock:
+      if not hasattr(self, "regulate_rate"):
+        self.regulate_last = now
+        self.regulate_rate = 1
+      delta = now - self.regulate_last
+      self.regulate_rate *= AVG_FRAMES
+      self.regulate_rate += delta
+      self.regulate_rate /= AVG_FRAMES + 1
       self.regulate_last = now
-      self.regulate_rate = 1
-    delta = now - self.regulate_last
-    self.regulate_rate *= AVG_FRAMES
-    self.regulate_rate += delta
-    self.regulate_rate /= AVG_FRAMES + 1
-    self.regulate_last = now
-    return self.regulate_rate
+      rate = self.regulate_rate
+    return rate
 
   # MQTT callbacks
   def onConnect(self, client, userdata, flags, rc):
@@ -427,6 +550,8 @@ class SceneController:
     if rc != 0:
       exit(1)
     self.subscribed = set()
+    if self.shard is not None:
+      self.shard.join()
     self.updateSubscriptions()
     self.updateObjectClasses()
     topic = PubSub.formatTopic(PubSub.CMD_DATABASE)
@@ -438,8 +563,9 @@ class SceneController:
   def updateObjectClasses(self):
     results = self.cache_manager.getAssets()
     if results and 'results' in results:
-      for scene in self.scenes:
-        scene.tracker.updateObjectClasses(results['results'])
+      with self.pauseScenes():
+        for scene in self.scenes:
+          scene.tracker.updateObjectClasses(results['results'])
     return
 
   def republishEvents(self, client, userdata, message):
@@ -448,7 +574,7 @@ class SceneController:
     enables parent to visualize them.
     """
     topic = PubSub.parseTopic(message.topic)
-    msg = json.loads(message.payload.decode('utf-8'))
+    msg = PubSub.decode(message.payload)
 
     sender_id = topic['scene_id']
     sender = self.cache_manager.sceneWithID(sender_id)
@@ -476,7 +602,7 @@ class SceneController:
       msg['metadata']['from_child_scene'] = sender.name
     else:
       msg['metadata']['from_child_scene'] = sender.name + " > " + msg['metadata']['from_child_scene']
-    self.pubsub.publish(event_topic, json.dumps(msg))
+    self.pubsub.publishData(event_topic, msg)
     return
 
   def transformObjectsinEvent(self, event, sender):
@@ -494,7 +620,7 @@ class SceneController:
 
   def updateSubscriptions(self):
     log.debug("UPDATE SUBSCRIPTIONS")
-    self.cache_manager.invalidate()
+    self.cache_manager.refreshScenes()
     if not hasattr(self, 'subscribed'):
       self.subscribed = set()
     need_subscribe = set()
@@ -503,7 +629,9 @@ class SceneController:
       self.subscribed_children = dict()
     need_subscribe_child = dict()
 
-    self.scenes = self.cache_manager.allScenes()
+    # Scenes of other instances are cached too, they may be children of this instance's scenes
+    self.scenes = [scene for scene in self.cache_manager.allScenes()
+                   if self.shard is None or self.shard.owns(scene.uid)]
     for scene in self.scenes:
       for camera in scene.cameras:
         need_subscribe.add((PubSub.formatTopic(PubSub.DATA_CAMERA, camera_id=camera),
@@ -0,0 +1,195 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import collections
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from scene_common import log
+
+DEFAULT_SCENE_WORKERS = min(8, os.cpu_count() or 1)
+DEFAULT_SCENE_QUEUE_DEPTH = 16
+DROP_OLDEST = "oldest"
+DROP_NEWEST = "newest"
+DROP_POLICIES = (DROP_OLDEST, DROP_NEWEST)
+STATS_SMOOTHING = 0.1
+
+class SceneQueue:
+  """Messages waiting for a scene and statistics of the processed ones"""
+
+  def __init__(self):
+    self.items = collections.deque()
+    self.running = False
+    self.processed = 0
+    self.dropped = 0
+    self.wait_time = None
+    self.processing_time = None
+    return
+
+  @property
+  def depth(self):
+    return len(self.items) + self.running
+
+def _average(average, value):
+  if average is None:
+    return value
+  return average + STATS_SMOOTHING * (value - average)
+
+class SceneDispatcher:
+  """
+  Bounded pool of worker threads processing the messages of all scenes.
+
+  Each scene has its own bounded queue. Messages of a scene are processed in
+  the order they arrived and never concurrently, so the scene state needs no
+  locking and the messages of each camera stay in order. Scenes with waiting
+  messages are served round robin, so a slow scene only delays itself.
+  """
+
+  def __init__(self, max_workers=DEFAULT_SCENE_WORKERS,
+               max_queue_depth=DEFAULT_SCENE_QUEUE_DEPTH, drop_policy=DROP_OLDEST):
+    """
+    @param  max_workers      Number of worker threads shared by all scenes
+    @param  max_queue_depth  Messages allowed per scene, including the one
+                             being processed
+    @param  drop_policy      DROP_OLDEST to drop the oldest waiting message of a
+                             full queue, DROP_NEWEST to drop the new message
+    """
+    if drop_policy not in DROP_POLICIES:
+      raise ValueError(f"Unknown drop policy '{drop_policy}', expected one of {DROP_POLICIES}")
+    self.max_workers = max(1, max_workers)
+    self.max_queue_depth = max(1, max_queue_depth)
+    self.drop_policy = drop_policy
+    self.queues = {}
+    self.ready = collections.deque()
+    self.workers = []
+    self.busy = 0
+    self.pause_count = 0
+    self.condition = threading.Condition()
+    return
+
+  def submit(self, key, function, *args):
+    """
+    Queues function(*args) to run after the other messages of the scene.
+    @param  key       Scene uid
+    @param  function  Function processing the message
+    @return True if the message was queued, False if it was dropped
+    """
+    with self.condition:
+      queue = self.queues.get(key, None)
+      if queue is None:
+        queue = self.queues[key] = SceneQueue()
+      # A queue with waiting messages is already ready, even after dropping one of them
+      was_idle = not queue.running and not queue.items
+      if queue.depth >= self.max_queue_depth:
+        queue.dropped += 1
+        if self.drop_policy == DROP_NEWEST or not queue.items:
+          return False
+        queue.items.popleft()
+      queue.items.append((function, args, time.monotonic()))
+      if was_idle:
+        self.ready.append(key)
+        self.condition.notify_all()
+      self._startWorkers()
+    return True
+
+  @contextmanager
+  def paused(self):
+    """
+    Waits for the messages being processed and holds back the others, so that
+    scenes can be modified. Must not be used from a worker thread.
+    """
+    with self.condition:
+      self.pause_count += 1
+      while self.busy:
+        self.condition.wait()
+    try:
+      yield
+    finally:
+      with self.condition:
+        self.pause_count -= 1
+        self.condition.notify_all()
+    return
+
+  def waitForComplete(self):
+    """Blocks until every queued message has been processed"""
+    with self.condition:
+      while self.busy or self.ready:
+        self.condition.wait()
+    return
+
+  def removeStale(self, keys):
+    """Forgets the idle queues of scenes that are no longer processed here"""
+    keys = set(keys)
+    with self.condition:
+      for key in list(self.queues):
+        if key not in keys and not self.queues[key].depth:
+          self.queues.pop(key)
+    return
+
+  def stats(self, key):
+    """
+    @param  key  Scene uid
+    @return Queue depth, message counts and average times in seconds, or None
+    """
+    with self.condition:
+      queue = self.queues.get(key, None)
+      if queue is None:
+        return None
+      return {
+        'depth': queue.depth,
+        'processed': queue.processed,
+        'dropped': queue.dropped,
+        'wait_time': queue.wait_time,
+        'processing_time': queue.processing_time,
+      }
+
+  def _startWorkers(self):
+    needed = min(self.max_workers, len(self.ready) + self.busy)
+    while len(self.workers) < needed:
+      worker = threading.Thread(target=self._run, daemon=True,
+                                name=f"scene-worker-{len(self.workers)}")
+      self.workers.append(worker)
+      worker.start()
+    return
+
+  def _run(self):
+    while True:
+      with self.condition:
+        while not self.ready or self.pause_count:
+          self.condition.wait()
+        key = self.ready.popleft()
+        queue = self.queues.get(key, None)
+        if queue is None or queue.running or not queue.items:
+          continue
+        function, args, queued = queue.items.popleft()
+        queue.running = True
+        self.busy += 1
+
+      start = time.monotonic()
+      try:
+        function(*args)
+      except Exception as e:
+        log.error("Failed to process scene message", e)
+      end = time.monotonic()
+
+      with self.condition:
+        queue.running = False
+        self.busy -= 1
+        queue.processed += 1
+        queue.wait_time = _average(queue.wait_time, start - queued)
+        queue.processing_time = _average(queue.processing_time, end - start)
+        if queue.items:
+          # Go to the back of the line so other scenes get their turn
+          self.ready.append(key)
+        self.condition.notify_all()
+    return
@@ -0,0 +1,132 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import bisect
+import hashlib
+
+from scene_common import log
+from scene_common.mqtt import PubSub
+from scene_common.timestamp import get_epoch_time, get_iso_time
+
+VIRTUAL_NODES = 64
+LEAVE_TIMEOUT = 2
+
+def _hash(key):
+  return int.from_bytes(hashlib.sha1(key.encode('utf-8')).digest()[:8], 'big')
+
+class HashRing:
+  """
+  Consistent hash ring assigning keys to members.
+
+  Every member is placed on the ring VIRTUAL_NODES times and a key belongs to
+  the member following it on the ring, so when a member joins or leaves only
+  the keys of that member move.
+  """
+
+  def __init__(self, members=(), virtual_nodes=VIRTUAL_NODES):
+    self.virtual_nodes = virtual_nodes
+    self.setMembers(members)
+    return
+
+  def setMembers(self, members):
+    self.members = frozenset(members)
+    ring = sorted((_hash(f"{member}#{idx}"), member)
+                  for member in self.members for idx in range(self.virtual_nodes))
+    self.points = [point for point, _ in ring]
+    self.owners = [member for _, member in ring]
+    return
+
+  def owner(self, key):
+    """
+    @param  key  Key to look up
+    @return Member the key belongs to, or None if the ring is empty
+    """
+    if not self.points:
+      return None
+    idx = bisect.bisect(self.points, _hash(key)) % len(self.points)
+    return self.owners[idx]
+
+class ShardMembership:
+  """
+  Splits the scenes between the controller instances connected to the broker.
+
+  Every instance publishes a retained presence message on its own
+  SYS_CONTROLLER_SHARD topic and leaves an empty retained will message on it,
+  so the broker removes the instance when its connection is lost. Instances
+  follow each other on the same topics and assign every scene to the owner of
+  its uid on a HashRing of all instances.
+  """
+
+  def __init__(self, pubsub, instance_id, on_change):
+    """
+    @param  pubsub       PubSub of the controller, not connected yet
+    @param  instance_id  ID unique to this controller instance
+    @param  on_change    Called when the set of instances changes
+    """
+    self.pubsub = pubsub
+    self.instance_id = instance_id
+    self.on_change = on_change
+    self.topic = PubSub.formatTopic(PubSub.SYS_CONTROLLER_SHARD, instance_id=instance_id)
+    self.ring = HashRing([instance_id])
+    self.leaving = False
+    self.pubsub.setWill(self.topic, b"", qos=1, retain=True)
+    return
+
+  def join(self):
+    """Announces this instance and follows the others, called on every connect"""
+    self.leaving = False
+    self.pubsub.addCallback(PubSub.formatTopic(PubSub.SYS_CONTROLLER_SHARD, instance_id="+"),
+                            self.handleShardMessage, qos=1)
+    self._announce()
+    return
+
+  def leave(self, timeout=LEAVE_TIMEOUT):
+    """
+    Removes the presence message, so the other instances take over the scenes
+    of this one without waiting for the broker to notice the lost connection.
+    The network loop has to run while waiting for the broker to acknowledge it.
+    @param  timeout  Seconds to wait for the message to be published
+    """
+    # The broker echoes the empty message back, which must not announce this instance again
+    self.leaving = True
+    info = self.pubsub.publish(self.topic, b"", qos=1, retain=True)
+    try:
+      info.wait_for_publish(timeout)
+    except (RuntimeError, ValueError) as e:
+      log.warn("Failed to leave the controller shard", e)
+    return
+
+  def _announce(self):
+    self.pubsub.publishData(self.topic, {'id': self.instance_id,
+                                         'timestamp': get_iso_time(get_epoch_time())},
+                            qos=1, retain=True)
+    return
+
+  def handleShardMessage(self, client, userdata, message):
+    instance_id = PubSub.parseTopic(message.topic)['instance_id']
+    members = set(self.ring.members)
+    if message.payload:
+      members.add(instance_id)
+    elif instance_id == self.instance_id:
+      # Will of a previous connection of this instance
+      if not self.leaving:
+        self._announce()
+    else:
+      members.discard(instance_id)
+
+    if members != self.ring.members:
+      self.ring.setMembers(members)
+      log.info("Controller instances", sorted(members))
+      self.on_change()
+    return
+
+  def owns(self, scene_uid):
+    return self.ring.owner(scene_uid) == self.instance_id
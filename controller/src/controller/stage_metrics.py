@@ -0,0 +1,217 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scene_common import log
+
+DECODE = "decode"
+VALIDATE = "validate"
+PROCESS_CAMERA_DATA = "process_camera_data"
+PROCESS_SCENE_DATA = "process_scene_data"
+TRACKER_QUEUE_WAIT = "tracker_queue_wait"
+TRACK_CATEGORY = "track_category"
+UPDATE_EVENTS = "update_events"
+SERIALIZE = "serialize"
+PUBLISH = "publish"
+
+DROP_LAG = "lag"
+DROP_TRACKER_BUSY = "tracker_busy"
+
+# Upper bounds in seconds, the last bucket is +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5)
+
+class Histogram:
+  """Latency distribution over fixed buckets"""
+
+  def __init__(self, buckets=LATENCY_BUCKETS):
+    self.buckets = buckets
+    self.counts = [0] * (len(buckets) + 1)
+    self.count = 0
+    self.sum = 0.0
+    return
+
+  def observe(self, value):
+    self.counts[bisect.bisect_left(self.buckets, value)] += 1
+    self.count += 1
+    self.sum += value
+    return
+
+  def quantile(self, fraction):
+    """
+    @param  fraction  Quantile to estimate, between 0 and 1
+    @return Upper bound of the bucket holding the quantile, or None
+    """
+    if not self.count:
+      return None
+    rank = fraction * self.count
+    total = 0
+    for bound, count in zip(self.buckets, self.counts):
+      total += count
+      if total >= rank:
+        return bound
+    return float('inf')
+
+class StageMetrics:
+  """
+  Latency histograms per scene and processing stage, and counts of dropped
+  messages per scene and reason.
+
+  Recording is disabled until enable() is called. Instrumented code measures a
+  stage between start() and record(), which both return None when disabled,
+  so a disabled recorder costs one attribute check per stage.
+  """
+
+  def __init__(self):
+    self.enabled = False
+    self.lock = threading.Lock()
+    self.histograms = {}
+    self.drops = {}
+    self.server = None
+    return
+
+  def enable(self):
+    self.enabled = True
+    return
+
+  def start(self):
+    """
+    @return Start time of a stage, or None when recording is disabled
+    """
+    if not self.enabled:
+      return None
+    return time.perf_counter()
+
+  def record(self, scene_key, stage, start):
+    """
+    Records the time since start as the latency of the stage.
+    @param  scene_key  Scene uid
+    @param  stage      Stage name such as DECODE
+    @param  start      Value returned by start() or a previous record()
+    @return Current time, to be used as the start of the next stage, or None
+    """
+    if start is None:
+      return None
+    now = time.perf_counter()
+    self.observe(scene_key, stage, now - start)
+    return now
+
+  def observe(self, scene_key, stage, seconds):
+    key = (scene_key, stage)
+    with self.lock:
+      histogram = self.histograms.get(key, None)
+      if histogram is None:
+        histogram = self.histograms[key] = Histogram()
+      histogram.observe(seconds)
+    return
+
+  def countDrop(self, scene_key, reason):
+    if not self.enabled:
+      return
+    key = (scene_key, reason)
+    with self.lock:
+      self.drops[key] = self.drops.get(key, 0) + 1
+    return
+
+  def summary(self, scene_key):
+    """
+    @param  scene_key  Scene uid
+    @return Message count, mean and 95th percentile in seconds of every
+            stage, and the drop counts of the scene
+    """
+    stages = {}
+    drops = {}
+    with self.lock:
+      for (key, stage), histogram in self.histograms.items():
+        if key == scene_key:
+          stages[stage] = {'count': histogram.count,
+                           'mean': histogram.sum / histogram.count,
+                           'p95': histogram.quantile(0.95)}
+      for (key, reason), count in self.drops.items():
+        if key == scene_key:
+          drops[reason] = count
+    return {'stages': stages, 'dropped': drops}
+
+  def removeStale(self, scene_keys):
+    """Forgets the metrics of scenes that are no longer processed here"""
+    scene_keys = set(scene_keys)
+    with self.lock:
+      for metrics in (self.histograms, self.drops):
+        for key in [key for key in metrics if key[0] not in scene_keys]:
+          metrics.pop(key)
+    return
+
+  def exposition(self):
+    """Returns the metrics in the Prometheus text exposition format"""
+    with self.lock:
+      histograms = [(key, list(histogram.counts), histogram.count, histogram.sum)
+                    for key, histogram in sorted(self.histograms.items())]
+      drops = sorted(self.drops.items())
+
+    lines = ["# HELP scenescape_controller_stage_seconds Time spent in each processing stage",
+             "# TYPE scenescape_controller_stage_seconds histogram"]
+    for (scene_key, stage), counts, count, total in histograms:
+      labels = f'scene="{scene_key}",stage="{stage}"'
+      cumulative = 0
+      for bound, bucket_count in zip(LATENCY_BUCKETS + ("+Inf",), counts):
+        cumulative += bucket_count
+        lines.append(f'scenescape_controller_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+      lines.append(f'scenescape_controller_stage_seconds_sum{{{labels}}} {total}')
+      lines.append(f'scenescape_controller_stage_seconds_count{{{labels}}} {count}')
+
+    lines += ["# HELP scenescape_controller_dropped_messages_total Messages dropped before tracking",
+              "# TYPE scenescape_controller_dropped_messages_total counter"]
+    for (scene_key, reason), count in drops:
+      lines.append(f'scenescape_controller_dropped_messages_total{{scene="{scene_key}",reason="{reason}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+  def serve(self, port, address=""):
+    """Enables recording and serves the metrics over HTTP on /metrics"""
+    self.enable()
+    metrics = self
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+      def do_GET(self):
+        if self.path.split('?')[0] != "/metrics":
+          self.send_error(404)
+          return
+        body = metrics.exposition().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return
+
+      def log_message(self, format, *args):
+        return
+
+    self.server = ThreadingHTTPServer((address, port), MetricsHandler)
+    self.server.daemon_threads = True
+    thread = threading.Thread(target=self.server.serve_forever, daemon=True,
+                              name="metrics-server")
+    thread.start()
+    log.info("Serving controller metrics on port", self.server.server_address[1])
+    return
+
+  def stop(self):
+    if self.server is not None:
+      self.server.shutdown()
+      self.server.server_close()
+      self.server = None
+    return
+
+# Shared by the controller, the scenes and their trackers
+recorder = StageMetrics()
@@ -9,12 +9,16 @@
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
 
-from queue import Queue
-from threading import Thread
+import threading
 
+from controller import stage_metrics
+from controller.location_history import LocationHistory
 from controller.moving_object import (DEFAULT_EDGE_LENGTH,
-                                      DEFAULT_TRACKING_RADIUS, ATagObject,
-                                      MovingObject)
+                                      DEFAULT_TRACKING_RADIUS, LOCATION_LIMIT,
+                                      ATagObject, MovingObject)
+from controller.stage_metrics import (DROP_TRACKER_BUSY, TRACK_CATEGORY,
+                                      TRACKER_QUEUE_WAIT)
+from controller.tracking_scheduler import TrackingScheduler
 from controller.uuid_manager import UUIDManager
 from scene_common import log
 from scene_common.options import TYPE_1
@@ -28,16 +32,38 @@ MAX_UNRELIABLE_TIME = 0.3333
 NON_MEASUREMENT_TIME_DYNAMIC = 0.2666
 NON_MEASUREMENT_TIME_STATIC = 0.5333
 
-class Tracking(Thread):
+class Tracking:
+  scheduler = None
+  scheduler_lock = threading.Lock()
+  # Merge batches arriving while a tracker is busy instead of dropping them
+  coalesce_batches = False
+
   def __init__(self):
-    super().__init__()
     self.trackers = {}
     self._objects = self.curObjects = []
     self.already_tracked_objects = []
-    self.queue = Queue()
     self.uuid_manager = UUIDManager()
+    self.location_history = LocationHistory(LOCATION_LIMIT)
+    self.processed_batches = 0
+    self.merged_batches = 0
+    self.dropped_batches = 0
+    self.metrics_key = None
+    return
+
+  @classmethod
+  def configureScheduler(cls, **kwargs):
+    """Replace the scheduler shared by all trackers. Call before any tracking starts."""
+    with cls.scheduler_lock:
+      Tracking.scheduler = TrackingScheduler(**kwargs)
     return
 
+  @classmethod
+  def getScheduler(cls):
+    with cls.scheduler_lock:
+      if Tracking.scheduler is None:
+        Tracking.scheduler = TrackingScheduler()
+      return Tracking.scheduler
+
   def getUniqueIDCount(self, category):
     tracker = self.trackers.get(category, None)
     if tracker:
@@ -49,22 +75,61 @@ class Tracking(Thread):
                    ref_camera_frame_rate, \
                    max_unreliable_time, \
                    non_measurement_time_dynamic, \
-                   non_measurement_time_static):
+                   non_measurement_time_static, \
+                   metrics_key=None, sources=()):
+    """
+    Submits the objects of each category to the tracker of the category
+    @param  sources  Cameras or child scenes the objects come from, including ones without objects
+    """
     self.createTrackers(categories, max_unreliable_time, non_measurement_time_dynamic, non_measurement_time_static)
 
     if not categories:
       categories = self.trackers.keys()
+    scheduler = self.getScheduler()
+    queued = stage_metrics.recorder.start()
+    sources = frozenset(id(source) for source in sources)
     for category in categories:
       self.updateRefCameraFrameRate(ref_camera_frame_rate, category)
-      queue = self.trackers[category].queue
-      if not queue.empty():
-        # Tracker specific to this category is still processing. Skip tracking objects for this category.
-        log.info("Tracker work queue is not empty", category, queue.qsize())
-        continue
+      tracker = self.trackers[category]
+      tracker.metrics_key = metrics_key
       new_objects = [obj for obj in objects if obj.category == category]
-      queue.put((new_objects, when, already_tracked_objects))
+      merge = tracker.mergeBatches if self.coalesce_batches else None
+      if not scheduler.submit(tracker, (new_objects, when, already_tracked_objects, queued, sources),
+                              merge):
+        # Tracker specific to this category is still busy. Skip tracking objects for this category.
+        tracker.dropped_batches += 1
+        stage_metrics.recorder.countDrop(metrics_key, DROP_TRACKER_BUSY)
+        log.info("Tracker work queue is full", category, scheduler.queueDepth(tracker))
     return
 
+  def mergeBatches(self, waiting, batch):
+    """
+    Merge a batch into one waiting for the busy tracker, keeping the newest detections per camera.
+    The detections of every source of the batch are replaced, even when the
+    source reported no objects in the batch.
+    """
+    objects, when, already_tracked_objects, _, sources = batch
+    waiting_objects, waiting_when, waiting_tracked, queued, waiting_sources = waiting
+    cameras = set(sources)
+    cameras.update(id(obj.camera) for obj in objects)
+    cameras.update(id(obj.camera) for obj in already_tracked_objects)
+    objects = [obj for obj in waiting_objects if id(obj.camera) not in cameras] + objects
+    already_tracked_objects = [obj for obj in waiting_tracked
+                               if id(obj.camera) not in cameras] + already_tracked_objects
+    self.merged_batches += 1
+    return objects, max(when, waiting_when), already_tracked_objects, queued, \
+      waiting_sources | sources
+
+  def batchCounts(self):
+    """Return the processed, merged and dropped batch counters and the Re-ID feature memory for each category"""
+    scheduler = self.getScheduler()
+    return {category: {'processed': tracker.processed_batches,
+                       'merged': tracker.merged_batches,
+                       'dropped': tracker.dropped_batches,
+                       'queue_depth': scheduler.queueDepth(tracker),
+                       'reid_feature_bytes': tracker.uuid_manager.featureMemoryUsage()}
+            for category, tracker in self.trackers.items()}
+
   def updateRefCameraFrameRate(self, ref_camera_frame_rate, category):
     if ref_camera_frame_rate is not None and \
         self.trackers[category].ref_camera_frame_rate != ref_camera_frame_rate:
@@ -78,7 +143,7 @@ class Tracking(Thread):
       if category not in self.trackers:
         tracker = self.__class__(max_unreliable_time, non_measurement_time_dynamic, non_measurement_time_static)
         self.trackers[category] = tracker
-        tracker.start()
+        tracker.uuid_manager.connectDatabase()
     return
 
   def updateObjectClasses(self, assets):
@@ -124,29 +189,37 @@ class Tracking(Thread):
       cur_objects = self.groupObjects(cur_objects)
     return cur_objects
 
-  def run(self):
-    self.uuid_manager.connectDatabase()
-    while True:
-      objects, when, already_tracked_objects = self.queue.get()
-      if objects is None:
-        self.queue.task_done()
-        break
-      self.trackCategory(objects, when, already_tracked_objects)
-      self.curObjects = (self._objects + self.already_tracked_objects).copy()
-      self.queue.task_done()
+  def processWork(self, objects, when, already_tracked_objects, queued=None, sources=()):
+    """Called by the scheduler on one of its worker threads"""
+    start = stage_metrics.recorder.record(self.metrics_key, TRACKER_QUEUE_WAIT, queued)
+    previous = self.curObjects
+    self.trackCategory(objects, when, already_tracked_objects)
+    stage_metrics.recorder.record(self.metrics_key, TRACK_CATEGORY, start)
+    self.curObjects = (self._objects + self.already_tracked_objects).copy()
+    self.releasePrunedTracks(previous, self.curObjects)
+    self.processed_batches += 1
+    return
+
+  def releasePrunedTracks(self, previous, current):
+    """Frees the location history of the tracks that were in previous but not in current"""
+    active = {id(obj.chain_data) for obj in current}
+    pruned = {id(obj.chain_data): obj.chain_data for obj in previous
+              if obj.chain_data is not None and id(obj.chain_data) not in active}
+    for chain_data in pruned.values():
+      chain_data.release()
     return
 
   def waitForComplete(self):
-    if hasattr(self, 'queue'):
-      self.queue.join()
+    scheduler = self.getScheduler()
+    scheduler.waitForComplete(self)
+    for tracker in self.trackers.values():
+      scheduler.waitForComplete(tracker)
     return
 
   def join(self):
+    scheduler = self.getScheduler()
     for category in self.trackers:
-      tracker = self.trackers[category]
-      tracker.queue.put((None, None, None))
-      tracker.waitForComplete()
-      tracker.join()
+      scheduler.remove(self.trackers[category])
     return
 
   @staticmethod
@@ -0,0 +1,137 @@
+# Copyright (C) 2024 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import collections
+import os
+import threading
+
+from scene_common import log
+
+DEFAULT_TRACKER_WORKERS = min(8, os.cpu_count() or 1)
+# One frame being tracked and one waiting, like the single slot queue of the per-category threads
+DEFAULT_TRACKER_QUEUE_DEPTH = 2
+
+class TrackingScheduler:
+  """
+  Bounded pool of worker threads shared by the category trackers of all scenes.
+
+  Each tracker has its own bounded work queue. Work for a single tracker is run
+  in order and never concurrently, since the tracker state is not thread safe.
+  Trackers with pending work are served round robin so a busy scene or category
+  cannot starve the others.
+  """
+
+  def __init__(self, max_workers=DEFAULT_TRACKER_WORKERS,
+               max_queue_depth=DEFAULT_TRACKER_QUEUE_DEPTH):
+    """
+    @param  max_workers      Number of worker threads shared by all trackers
+    @param  max_queue_depth  Work items allowed per tracker, including the one
+                             being processed, before new work is rejected
+    """
+    self.max_workers = max(1, max_workers)
+    self.max_queue_depth = max(1, max_queue_depth)
+    self.queues = {}
+    self.ready = collections.deque()
+    self.running = set()
+    self.workers = []
+    self.condition = threading.Condition()
+    return
+
+  def submit(self, tracker, work, merge=None):
+    """
+    Queues work for a tracker unless its queue is already full.
+
+    When merge is given, work for a full queue is not rejected. Instead it is
+    combined with the newest work still waiting, or held as the single waiting
+    item if the tracker is busy with everything else.
+
+    @param  tracker  Tracker whose processWork() will be called with the work
+    @param  work     Tuple of arguments for tracker.processWork()
+    @param  merge    Optional callable merge(waiting, work) returning the combined work
+    @return True if the work was queued or merged, False if it was rejected
+    """
+    with self.condition:
+      queue = self.queues.setdefault(tracker, collections.deque())
+      if self._depth(tracker) >= self.max_queue_depth:
+        if merge is None:
+          return False
+        if queue:
+          queue[-1] = merge(queue[-1], work)
+          return True
+      queue.append(work)
+      if tracker not in self.running and len(queue) == 1:
+        self.ready.append(tracker)
+        self.condition.notify_all()
+      self._startWorkers()
+    return True
+
+  def queueDepth(self, tracker):
+    """
+    Returns the number of work items queued or being processed for a tracker.
+    """
+    with self.condition:
+      return self._depth(tracker)
+
+  def waitForComplete(self, tracker):
+    """
+    Blocks until all work queued for the tracker has been processed.
+    """
+    with self.condition:
+      while self._depth(tracker):
+        self.condition.wait()
+    return
+
+  def remove(self, tracker):
+    """
+    Waits for pending work of the tracker and stops scheduling it.
+    """
+    with self.condition:
+      while self._depth(tracker):
+        self.condition.wait()
+      self.queues.pop(tracker, None)
+    return
+
+  def _depth(self, tracker):
+    depth = len(self.queues.get(tracker, ()))
+    if tracker in self.running:
+      depth += 1
+    return depth
+
+  def _startWorkers(self):
+    needed = min(self.max_workers, len(self.ready) + len(self.running))
+    while len(self.workers) < needed:
+      worker = threading.Thread(target=self._run, daemon=True,
+                                name=f"tracker-worker-{len(self.workers)}")
+      self.workers.append(worker)
+      worker.start()
+    return
+
+  def _run(self):
+    while True:
+      with self.condition:
+        while not self.ready:
+          self.condition.wait()
+        tracker = self.ready.popleft()
+        work = self.queues[tracker].popleft()
+        self.running.add(tracker)
+
+      try:
+        tracker.processWork(*work)
+      except Exception as e:
+        log.error("Tracker failed to process work", e)
+
+      with self.condition:
+        self.running.discard(tracker)
+        if self.queues.get(tracker):
+          # Go to the back of the line so other trackers get their turn
+          self.ready.append(tracker)
+        self.condition.notify_all()
+    return
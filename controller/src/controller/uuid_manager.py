@@ -13,6 +13,11 @@ import collections
 import concurrent.futures
 import threading
 
+from controller.active_ids import ActiveIDs
+from controller.feature_buffer import (DEFAULT_FEATURE_CAPACITY, RESERVOIR,
+                                       SAMPLING_POLICIES, FeatureBuffer)
+from controller.reid_batcher import ReIDBatcher
+from controller.reid_gallery import InMemoryDatabase
 from controller.vdms_adapter import VDMSDatabase
 from scene_common import log
 from scene_common.timestamp import get_epoch_time
@@ -21,23 +26,34 @@ DEFAULT_DATABASE = "VDMS"
 DEFAULT_SIMILARITY_THRESHOLD = 60
 DEFAULT_MINIMUM_BBOX_AREA = 5000
 DEFAULT_MINIMUM_FEATURE_COUNT = 12
-DEFAULT_FEATURE_SLICE_SIZE = 10
 DEFAULT_MAX_QUERY_TIME = 4
+DEFAULT_QUERY_TIMEOUT = 10
 DEFAULT_MAX_SIMILARITY_QUERIES_TRACKED = 10
 
 available_databases = {
   "VDMS": VDMSDatabase,
+  "memory": InMemoryDatabase,
 }
 
 class UUIDManager:
-  def __init__(self, database=DEFAULT_DATABASE):
-    self.active_ids = {}
-    self.active_ids_lock = threading.Lock()
+  database = DEFAULT_DATABASE
+  database_options = {}
+  feature_capacity = DEFAULT_FEATURE_CAPACITY
+  feature_sampling = RESERVOIR
+  # Query with the mean of the features of a track instead of each of them
+  query_mean = False
+
+  def __init__(self, database=None):
+    self.active_ids = ActiveIDs()
     self.active_query = {}
     self.features_for_database = {}
     self.quality_features = {}
     self.unique_id_count = 0
-    self.reid_database = available_databases[database]()
+    if database is None:
+      database = self.database
+    options = self.database_options if database == self.database else {}
+    self.reid_database = available_databases[database](**options)
+    self.batcher = ReIDBatcher(self.reid_database)
     self.pool = concurrent.futures.ThreadPoolExecutor()
     self.similarity_query_times = collections.deque(
       maxlen=DEFAULT_MAX_SIMILARITY_QUERIES_TRACKED)
@@ -45,25 +61,58 @@ class UUIDManager:
     self.reid_enabled = True
     return
 
+  @classmethod
+  def configureDatabase(cls, database, **options):
+    """
+    Selects the Re-ID database used by the trackers created from now on
+
+    @param  database  Key of the database in available_databases
+    @param  options   Keyword arguments for the constructor of the database
+    """
+    if database not in available_databases:
+      raise ValueError(f"Unknown Re-ID database '{database}',"
+                       f" expected one of {list(available_databases)}")
+    UUIDManager.database = database
+    UUIDManager.database_options = options
+    return
+
+  @classmethod
+  def configureFeatures(cls, capacity=DEFAULT_FEATURE_CAPACITY, sampling=RESERVOIR,
+                        query_mean=False):
+    """
+    Sets how the Re-ID features of each track are kept, for the trackers created from now on
+
+    @param  capacity    Maximum number of features kept per track
+    @param  sampling    RESERVOIR to keep a sample of the whole track, RING to keep the newest
+    @param  query_mean  Query the database with the mean feature of the track
+    """
+    if sampling not in SAMPLING_POLICIES:
+      raise ValueError(f"Unknown feature sampling '{sampling}', expected one of {SAMPLING_POLICIES}")
+    UUIDManager.feature_capacity = capacity
+    UUIDManager.feature_sampling = sampling
+    UUIDManager.query_mean = query_mean
+    return
+
+  def _newFeatureBuffer(self):
+    return FeatureBuffer(self.feature_capacity, self.feature_sampling, self.query_mean)
+
+  def featureMemoryUsage(self):
+    """Returns the number of bytes used by the Re-ID features of the tracks"""
+    buffers = {id(buffer): buffer for buffer in list(self.quality_features.values())}
+    for features in list(self.features_for_database.values()):
+      buffers[id(features['reid_vectors'])] = features['reid_vectors']
+    return sum(buffer.nbytes for buffer in buffers.values())
+
   def connectDatabase(self):
     self.pool.submit(self.reid_database.connect)
 
-  def pruneInactiveTracks(self, tracked_objects):
+  def pruneInactiveTracks(self, active_track_ids):
     """
-    Removes inactive tracks from the active_ids dict and adds pending features to the database
+    Removes inactive tracks from active_ids and adds pending features to the database
 
-    @param  tracked_objects  The objects currently tracked by the tracker
+    @param  active_track_ids  The ids of the tracks currently tracked by the tracker
     """
-    active_tracks = [tracked_object.id for tracked_object in tracked_objects]
-    inactive_tracks = []
-    new_active_ids = {}
-    with self.active_ids_lock:
-      for k, v in self.active_ids.items():
-        if k in active_tracks:
-          new_active_ids[k] = v
-        else:
-          inactive_tracks.append((k, v))
-      self.active_ids = new_active_ids
+    inactive_tracks = self.active_ids.prune(active_track_ids)
 
     for track_id, data in inactive_tracks:
       self.active_query.pop(track_id, None)
@@ -74,25 +123,22 @@ class UUIDManager:
       self._addNewFeaturesToDatabase(track_id)
     return
 
-  def _addNewFeaturesToDatabase(self, track_id, slice_size=DEFAULT_FEATURE_SLICE_SIZE):
+  def _addNewFeaturesToDatabase(self, track_id):
     """
     Add the features when the track is no longer active to reduce the total number of
-    queries sent to the database. Also only take a subset of the captured features to
-    add to the database otherwise too many features will impede performance of the
-    similiarity search.
-    Note: Slice size should be relative to frame rate, but this will only be implemented
-    when the tracker is refactored to take into account frame rate.
+    queries sent to the database. Only the subset of the captured features kept by the
+    feature buffer of the track is added, otherwise too many features will impede
+    performance of the similiarity search.
 
     @param  track_id    The ID of the track with features to add to the database
-    @param  slice_size  The size of the slice to use to reduce the size of the feature list
     """
     features = self.features_for_database.pop(track_id, None)
     if features:
-      features['reid_vectors'] = features['reid_vectors'][::slice_size]
-      log.debug(
-        f"Adding {len(features['reid_vectors'])} features for track {track_id} to database")
-      self.pool.submit(self.reid_database.addEntry, features['gid'], track_id,
-                       features['category'], features['reid_vectors'])
+      reid_vectors = features['reid_vectors'].snapshot()
+      if len(reid_vectors):
+        log.debug(
+          f"Adding {len(reid_vectors)} features for track {track_id} to database")
+        self.batcher.addEntry(features['gid'], track_id, features['category'], reid_vectors)
 
   def isNewTrackerID(self, sscape_object):
     """
@@ -117,10 +163,10 @@ class UUIDManager:
     """
     if sscape_object.reidVector is not None and self.reid_enabled:
       if sscape_object.boundingBoxPixels.area > minimum_bbox_area:
-        if sscape_object.rv_id in self.quality_features:
-          self.quality_features[sscape_object.rv_id].append(sscape_object.reidVector)
-        else:
-          self.quality_features[sscape_object.rv_id] = [sscape_object.reidVector]
+        features = self.quality_features.get(sscape_object.rv_id, None)
+        if features is None:
+          features = self.quality_features[sscape_object.rv_id] = self._newFeatureBuffer()
+        features.add(sscape_object.reidVector)
     return
 
   def pickBestID(self, sscape_object):
@@ -140,7 +186,7 @@ class UUIDManager:
       sscape_object.similarity = result[1]
       if sscape_object.reidVector is not None:
         if sscape_object.rv_id in self.features_for_database:
-          self.features_for_database[sscape_object.rv_id]['reid_vectors'].append(
+          self.features_for_database[sscape_object.rv_id]['reid_vectors'].add(
             sscape_object.reidVector)
     # DATABASE ID IS NULL
     else:
@@ -158,19 +204,19 @@ class UUIDManager:
                                     for a tracker ID is greater than the minimum value;
                                     otherwise, returns False
     """
-    count = len(self.quality_features.get(sscape_object.rv_id, []))
-    return count >= minimum_feature_count
+    features = self.quality_features.get(sscape_object.rv_id, None)
+    return features is not None and features.seen >= minimum_feature_count
 
   def querySimilarity(self, sscape_object):
     """
-    Query the database for a match and update the active_ids dictionary. This function is
+    Query the database for a match and update the active IDs. This function is
     mainly used as a wrapper to run the query in its own thread.
 
     @param  sscape_object  The current Scenescape object
     """
     similarity_scores = self.sendSimilarityQuery(sscape_object)
     database_id, similarity = self.parseQueryResults(similarity_scores)
-    with self.active_ids_lock:
+    with self.active_ids.lock:
       # Make sure object is still in active_ids before updating since there is a chance
       # that the similiarity search does not complete until after the object leaves
       if sscape_object.rv_id in self.active_ids:
@@ -180,18 +226,33 @@ class UUIDManager:
           f"Track {sscape_object.rv_id} left scene before ID query finished")
     return
 
-  def sendSimilarityQuery(self, sscape_object, max_query_time=DEFAULT_MAX_QUERY_TIME):
+  def sendSimilarityQuery(self, sscape_object, max_query_time=DEFAULT_MAX_QUERY_TIME,
+                          timeout=DEFAULT_QUERY_TIMEOUT):
     """
     Sends a query to find similarity scores for a given sscape_object and stores the time it
     takes for query completion. If the time is over a threshold, disables re-id queries.
 
     @param   sscape_object  The sscape_object for which similarity scores are to be found
+    @param   timeout        Seconds to wait for the scores, a query that takes longer
+                            is treated as finding no match
     @return  scores         The similarity scores for the given sscape_object
     """
-    reid_vectors = self.quality_features.get(sscape_object.rv_id)
+    features = self.quality_features.get(sscape_object.rv_id, None)
+    if features is None:
+      return None
+    if self.query_mean:
+      reid_vectors = [features.meanVector()]
+    else:
+      reid_vectors = features.snapshot()
     log.debug(f"Finding similarity scores for track {sscape_object.rv_id}")
     start_time = get_epoch_time()
-    scores = self.reid_database.findSimilarityScores(sscape_object.category, reid_vectors)
+    future = self.batcher.findSimilarityScores(sscape_object.category, reid_vectors)
+    try:
+      scores = future.result(timeout=timeout)
+    except concurrent.futures.TimeoutError:
+      # The batcher still completes the future, its late result is ignored
+      scores = None
+      log.warn(f"Similarity query for track {sscape_object.rv_id} timed out after {timeout} seconds")
     query_time = get_epoch_time() - start_time
     log.debug(
       f"Similarity scores for track {sscape_object.rv_id} found in {query_time} seconds")
@@ -247,9 +308,9 @@ class UUIDManager:
 
   def updateActiveDict(self, sscape_object, database_id, similarity):
     """
-    Updates the dictionary tracking the active tracker IDs and their corresponding database
-    IDs. Also adds creates an entry in the features_for_database dictionary to be added to the
-    database when the track leaves the scene.
+    Updates the active tracker IDs and their corresponding database IDs, with the
+    active_ids lock held. Also adds creates an entry in the features_for_database dictionary
+    to be added to the database when the track leaves the scene.
 
     @param  sscape_object  The current Scenescape object
     @param  database_id    The ID from the database
@@ -257,12 +318,12 @@ class UUIDManager:
     """
     # MATCH FOUND - YES + DB ID ALREADY IN DICT - NO
     if database_id and self.isNewID(database_id):
-      self.active_ids[sscape_object.rv_id] = [database_id, similarity]
+      self.active_ids.assign(sscape_object.rv_id, database_id, similarity)
       log.debug(
         f"Match found for {sscape_object.rv_id}: {database_id},{similarity}")
     # MATCH FOUND - NO / DB ID ALREADY IN DICT - YES
     else:
-      self.active_ids[sscape_object.rv_id] = [sscape_object.gid, None]
+      self.active_ids.assign(sscape_object.rv_id, sscape_object.gid)
       database_id = sscape_object.gid
 
     self.features_for_database[sscape_object.rv_id] = {
@@ -279,8 +340,7 @@ class UUIDManager:
     @param   database_id  An ID retrieved from the database
     @return  bool         Returns True if the ID is not found; otherwise, returns False
     """
-    database_ids = [v[0] for v in self.active_ids.values()]
-    return database_id not in database_ids
+    return not self.active_ids.isAssigned(database_id)
 
   def assignID(self, sscape_object):
     """
@@ -289,8 +349,7 @@ class UUIDManager:
     @param  sscape_object  The current Scenescape object
     """
     if self.isNewTrackerID(sscape_object):
-      with self.active_ids_lock:
-        self.active_ids.setdefault(sscape_object.rv_id, [None, None])
+      self.active_ids.add(sscape_object.rv_id)
       self.gatherQualityVisualFeatures(sscape_object)
       self.pickBestID(sscape_object)
       if self.haveSufficientVisualFeatures(sscape_object) and self.reid_enabled:
@@ -10,8 +10,8 @@
 # or implied warranties, other than those that are expressly stated in the License.
 
 import os
+import queue
 import socket
-import threading
 
 import numpy as np
 import vdms
@@ -24,22 +24,37 @@ DIMENSIONS = 256
 K_NEIGHBORS = 1
 SCHEMA_NAME = "reid_vector"
 SIMILARITY_METRIC = "L2"
+DEFAULT_CONNECTIONS = 1
 
 class VDMSDatabase(ReIDDatabase):
   def __init__(self, set_name=SCHEMA_NAME,
-               similarity_metric=SIMILARITY_METRIC, dimensions=DIMENSIONS):
-    self.db = vdms.vdms(
-      use_tls=True,
-      ca_cert_file="/run/secrets/certs/scenescape-ca.pem",
-      client_cert_file="/run/secrets/certs/scenescape-vdms-c.crt",
-      client_key_file="/run/secrets/certs/scenescape-vdms-c.key"
-    )
+               similarity_metric=SIMILARITY_METRIC, dimensions=DIMENSIONS,
+               connections=DEFAULT_CONNECTIONS, use_tls=True):
+    """
+    @param  connections  Number of connections, each used by one query at a time
+    @param  use_tls      Connect with the client certificates of the controller
+    """
+    tls_options = {}
+    if use_tls:
+      tls_options = {
+        'ca_cert_file': "/run/secrets/certs/scenescape-ca.pem",
+        'client_cert_file': "/run/secrets/certs/scenescape-vdms-c.crt",
+        'client_key_file': "/run/secrets/certs/scenescape-vdms-c.key",
+      }
+    self.clients = [vdms.vdms(use_tls=use_tls, **tls_options)
+                    for _ in range(max(1, connections))]
+    self.idle_clients = queue.Queue()
+    for client in self.clients:
+      self.idle_clients.put(client)
     self.set_name = set_name
     self.similarity_metric = similarity_metric
     self.dimensions = dimensions
-    self.lock = threading.Lock()
     return
 
+  @property
+  def connections(self):
+    return len(self.clients)
+
   def sendQuery(self, query, blob=None):
     """
     Helper function for handling the responses from sending queries to VDMS. There are three
@@ -54,11 +69,14 @@ class VDMSDatabase(ReIDDatabase):
     """
     responses = []
     response_blob = []
-    with self.lock:
+    client = self.idle_clients.get()
+    try:
       if blob:
-        r = self.db.query(query, blob)
+        r = client.query(query, blob)
       else:
-        r = self.db.query(query)
+        r = client.query(query)
+    finally:
+      self.idle_clients.put(client)
     if r and r != "NOT CONNECTED":
       response_blob = r[1]
       for (item, response) in zip(query, r[0]):
@@ -71,7 +89,8 @@ class VDMSDatabase(ReIDDatabase):
 
   def connect(self, hostname=DEFAULT_HOSTNAME):
     try:
-      self.db.connect(hostname)
+      for client in self.clients:
+        client.connect(hostname)
       if not self.findSchema(self.set_name):
         self.addSchema(self.set_name, self.similarity_metric, self.dimensions)
       log.info(f"VDMS connection ready")
@@ -94,7 +113,11 @@ class VDMSDatabase(ReIDDatabase):
     return
 
   def addEntry(self, uuid, rvid, object_type, reid_vectors, set_name=SCHEMA_NAME):
-    query = {
+    self.processBatch([(uuid, rvid, object_type, reid_vectors)], [], set_name)
+    return
+
+  def _addQuery(self, uuid, rvid, object_type, set_name):
+    return {
       "AddDescriptor": {
         "set": f"{set_name}",
         "properties": {
@@ -104,30 +127,9 @@ class VDMSDatabase(ReIDDatabase):
         }
       }
     }
-    blob = [[np.array(reid_vector, dtype="float32").tobytes()] for reid_vector in reid_vectors]
-    add_query = [query] * len(reid_vectors)
-    response, _ = self.sendQuery(add_query, blob)
-    if response:
-      for item in response:
-        if item.get('status') != 0:
-          log.warn(
-            f"Failed to add the descriptor to the database. Received response {item}")
-    return
 
-  def findSchema(self, set_name):
-    query = [{
-      "FindDescriptorSet": {
-        "set": f"{set_name}"
-      }
-    }]
-    response, _ = self.sendQuery(query)
-    if response and response[0].get('status') == 0 and response[0].get('returned') > 0:
-      return True
-    return False
-
-  def findSimilarityScores(self, object_type, reid_vectors, set_name=SCHEMA_NAME,
-                           k_neighbors=K_NEIGHBORS):
-    find_query = {
+  def _findQuery(self, object_type, set_name, k_neighbors):
+    return {
       "FindDescriptor": {
         "set": f"{set_name}",
         "constraints": {
@@ -144,14 +146,58 @@ class VDMSDatabase(ReIDDatabase):
         }
       }
     }
-    blob = [[np.array(reid_vector, dtype="float32").tobytes()] for reid_vector in reid_vectors]
-    query = [find_query] * len(reid_vectors)
+
+  def _blob(self, reid_vectors):
+    return [[np.array(reid_vector, dtype="float32").tobytes()] for reid_vector in reid_vectors]
+
+  def findSchema(self, set_name):
+    query = [{
+      "FindDescriptorSet": {
+        "set": f"{set_name}"
+      }
+    }]
+    response, _ = self.sendQuery(query)
+    if response and response[0].get('status') == 0 and response[0].get('returned') > 0:
+      return True
+    return False
+
+  def findSimilarityScores(self, object_type, reid_vectors, set_name=SCHEMA_NAME,
+                           k_neighbors=K_NEIGHBORS):
+    return self.processBatch([], [(object_type, reid_vectors)], set_name, k_neighbors)[0]
+
+  def processBatch(self, entries, queries, set_name=SCHEMA_NAME, k_neighbors=K_NEIGHBORS):
+    """
+    Sends all entries and similarity queries as a single VDMS transaction,
+    with the entries added before the queries run.
+    """
+    query = []
+    blob = []
+    for uuid, rvid, object_type, reid_vectors in entries:
+      query.extend([self._addQuery(uuid, rvid, object_type, set_name)] * len(reid_vectors))
+      blob.extend(self._blob(reid_vectors))
+    added = len(query)
+    for object_type, reid_vectors in queries:
+      query.extend([self._findQuery(object_type, set_name, k_neighbors)] * len(reid_vectors))
+      blob.extend(self._blob(reid_vectors))
+    if not query:
+      return [None] * len(queries)
+
     response, _ = self.sendQuery(query, blob)
-    if response:
-      result = [
+    if not response:
+      return [None] * len(queries)
+    for item in response[:added]:
+      if item.get('status') != 0:
+        log.warn(
+          f"Failed to add the descriptor to the database. Received response {item}")
+
+    results = []
+    start = added
+    for _, reid_vectors in queries:
+      end = start + len(reid_vectors)
+      results.append([
         item.get('entities')
-        for item in response
+        for item in response[start:end]
         if (item.get('status') == 0 and item.get('returned') > 0)
-      ]
-      return result
-    return None
+      ])
+      start = end
+    return results
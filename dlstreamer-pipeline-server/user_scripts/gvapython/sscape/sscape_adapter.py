@@ -14,7 +14,7 @@ import json
 import logging
 import math
 import os
-import struct
+import threading
 import time
 from collections import defaultdict
 from datetime import datetime
@@ -28,9 +28,37 @@ from pytz import timezone
 
 from utils import publisher_utils as utils
 
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
 ROOT_CA = os.environ.get('ROOT_CA', '/run/secrets/certs/scenescape-ca.pem')
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 TIMEZONE = "UTC"
+# float32, float16 or int8, see scene_common.reid_codec
+REID_ENCODING = os.environ.get('REID_ENCODING', 'float32')
+
+def encodeJSON(data):
+  """Serialize a message, using orjson when it is available in the pipeline image"""
+  if orjson is not None:
+    return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+  return json.dumps(data)
+
+def encodeReIDVector(vector, encoding=REID_ENCODING):
+  """Encode a reid vector, mirrors scene_common.reid_codec.encodeReIDVector
+  which is not available in the pipeline server image"""
+  values = np.asarray(vector, dtype='<f4').reshape(-1)
+  if encoding == 'float16':
+    data = values.astype('<f2').tobytes()
+  elif encoding == 'int8':
+    peak = float(np.max(np.abs(values))) if len(values) else 0.0
+    scale = np.array([peak / 127 if peak else 1.0], dtype='<f4')
+    quantized = np.clip(np.rint(values / scale[0]), -127, 127).astype(np.int8)
+    data = scale.tobytes() + quantized.tobytes()
+  else:
+    return base64.b64encode(values.tobytes()).decode('utf-8')
+  return encoding + ':' + base64.b64encode(data).decode('utf-8')
 
 def getMACAddress():
   if 'MACADDR' in os.environ:
@@ -40,14 +68,65 @@ def getMACAddress():
   h = iter(hex(a)[2:].zfill(12))
   return ":".join(i + next(h) for i in h)
 
+class ClockSync:
+  """Keeps the offset of the local clock to an NTP server in a background
+  thread, mirrors scene_common.timestamp.ClockSync which is not available in
+  the pipeline server image"""
+  SYNC_INTERVAL = 1000
+  RETRY_INTERVAL = 10
+  TIMEOUT = 1
+
+  def __init__(self, server, log, smoothing=0.5, step_threshold=1.0):
+    self.server = server
+    self.log = log
+    self.smoothing = smoothing
+    self.step_threshold = step_threshold
+    self.client = ntplib.NTPClient()
+    # Epoch time at the origin of the monotonic clock, None until synchronized
+    self.base = None
+    self.thread = None
+    return
+
+  def start(self):
+    if self.server is None or self.thread is not None:
+      return
+    synced = self.sync()
+    self.thread = threading.Thread(target=self._run, args=(synced,), daemon=True,
+                                   name="clock-sync")
+    self.thread.start()
+    return
+
+  def sync(self):
+    try:
+      response = self.client.request(host=self.server, port=123, timeout=self.TIMEOUT)
+    except Exception as e:
+      self.log.warning(f"Failed to connect to time server {self.server}: {e}")
+      return False
+    base = time.time() + response.offset - time.monotonic()
+    if self.base is None or abs(base - self.base) > self.step_threshold:
+      self.base = base
+    else:
+      self.base += self.smoothing * (base - self.base)
+    return True
+
+  def now(self):
+    base = self.base
+    if base is None:
+      return time.time()
+    return time.monotonic() + base
+
+  def _run(self, synced):
+    while True:
+      time.sleep(self.SYNC_INTERVAL if synced else self.RETRY_INTERVAL)
+      synced = self.sync()
+    return
+
 class PostDecodeTimestampCapture:
   def __init__(self, ntpServer=None):
     self.log = logging.getLogger('SSCAPE_ADAPTER')
     self.log.setLevel(logging.INFO)
-    self.ntpClient = ntplib.NTPClient()
-    self.ntpServer = ntpServer
-    self.lastTimeSync = None
-    self.timeOffset = 0
+    self.clock = ClockSync(ntpServer, self.log)
+    self.clock.start()
     self.ts = None
     self.timestamp_for_next_block = None
     self.fps = 5.0
@@ -66,14 +145,7 @@ class PostDecodeTimestampCapture:
       self.last_calculated_fps_ts = now
       self.frame_cnt = 0
 
-    if self.ntpServer:
-      # if ntpServer is available, check if it is time to recalibrate
-      if not self.lastTimeSync or now - self.lastTimeSync > 1000 :
-        response = self.ntpClient.request(host=self.ntpServer, port=123)
-        self.timeOffset = response.offset
-        self.lastTimeSync = now
-
-    now += self.timeOffset
+    now = self.clock.now()
     self.timestamp_for_next_block = now
     frame.add_message(json.dumps({
       'postdecode_timestamp': f"{datetime.fromtimestamp(now, tz=timezone(TIMEZONE)).strftime(DATETIME_FORMAT)[:-3]}Z",
@@ -111,9 +183,7 @@ def detectionPolicy(pobj, item, fw, fh):
 def reidPolicy(pobj, item, fw, fh):
   detectionPolicy(pobj, item, fw, fh)
   reid_vector = item['tensors'][1]['data']
-  # following code snippet is from percebro/modelchain.py
-  v = struct.pack("256f",*reid_vector)
-  pobj['reid'] = base64.b64encode(v).decode('utf-8')
+  pobj['reid'] = encodeReIDVector(reid_vector)
   return
 
 def classificationPolicy(pobj, item, fw, fh):
@@ -240,15 +310,16 @@ class PostInferenceDataPublish:
 
       if self.is_publish_image:
         self.buildImgData(imgdatadict, frame, True)
-        self.client.publish(f"scenescape/image/camera/{self.cameraid}", json.dumps(imgdatadict))
+        self.client.publish(f"scenescape/image/camera/{self.cameraid}", encodeJSON(imgdatadict))
         self.is_publish_image = False
 
       if self.is_publish_calibration_image:
         if not imgdatadict:
           self.buildImgData(imgdatadict, frame, False)
-        self.client.publish(f"scenescape/image/calibration/camera/{self.cameraid}", json.dumps(imgdatadict))
+        self.client.publish(f"scenescape/image/calibration/camera/{self.cameraid}", encodeJSON(imgdatadict))
         self.is_publish_calibration_image = False
 
-      self.client.publish(f"scenescape/data/camera/{self.cameraid}", json.dumps(self.frame_level_data))
-      frame.add_message(json.dumps(self.frame_level_data))
+      payload = encodeJSON(self.frame_level_data)
+      self.client.publish(f"scenescape/data/camera/{self.cameraid}", payload)
+      frame.add_message(payload)
     return True
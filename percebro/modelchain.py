@@ -8,14 +8,13 @@
 #
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
-import struct
 import time
-import base64
 
 import numpy as np
 
 from scene_common.geometry import Rectangle
 from scene_common import log
+from scene_common.reid_codec import FLOAT32, encodeReIDVector
 
 from inferizer import Inferizer
 from collections import OrderedDict
@@ -105,6 +104,9 @@ class ModelChain:
         idx += 1
       return models
 
+  # Encoding of published Re-ID vectors, one of scene_common.reid_codec.ENCODINGS
+  reid_encoding = FLOAT32
+
   def __init__(self, spec, params, device="CPU"):
     self.inputReady = []
     self.outputReady = []
@@ -325,10 +327,7 @@ class ModelChain:
     found = ModelChain.findResults(objects, key)
     for obj in found:
       if isinstance(obj[key], np.ndarray):
-        vector = obj[key].flatten().tolist()
-        vector = struct.pack("256f", *vector)
-        vector = base64.b64encode(vector).decode('utf-8')
-        obj[key] = vector
+        obj[key] = encodeReIDVector(obj[key], ModelChain.reid_encoding)
     return
 
   @staticmethod
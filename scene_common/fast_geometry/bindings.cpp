@@ -101,6 +101,7 @@ PYBIND11_MODULE( LIBRARY_NAME, m) {
             py::arg("p1"), py::arg("p2"), py::arg("relative") = false )
         .def("isPointOnLine", &Line::isPointOnLine)
         .def("intersection",  &Line::intersection)
+        .def("intersections", &Line::intersections, py::arg("lines"))
         .def_property_readonly("origin", &Line::origin)
         .def_property_readonly("end", &Line::end)
         .def_property_readonly("x1", &Line::x1)
@@ -149,6 +150,7 @@ PYBIND11_MODULE( LIBRARY_NAME, m) {
         .def_property_readonly("asDict", &Rectangle::asDict)
         .def("__repr__", &Rectangle::repr)
         .def("isPointWithin", &Rectangle::isPointWithin)
+        .def("pointsWithin", &Rectangle::pointsWithin, py::arg("points"))
         .def("offset", &Rectangle::offset)
         .def("intersection", &Rectangle::intersection);
 
@@ -169,6 +171,7 @@ PYBIND11_MODULE( LIBRARY_NAME, m) {
     py::class_<Polygon>(m, "Polygon")
         .def(py::init<const std::vector<std::pair<double, double>>&>())
         .def("getVertices", &Polygon::getVertices)
-        .def("isPointInside", &Polygon::isPointInside);
+        .def("isPointInside", &Polygon::isPointInside)
+        .def("pointsInside", &Polygon::pointsInside, py::arg("points"));
 
 }
@@ -98,6 +98,50 @@ std::tuple<bool, std::pair<double, double>> Line::intersection(const Line& other
     double y = y1 + ua * (y2 - y1);
     return std::make_tuple(true, std::make_pair(x, y)); // Intersection point
 }
+std::tuple<py::array_t<bool>, py::array_t<double>> Line::intersections(const DoubleArray & lines) const
+{
+    if(this->is3D())
+    {
+        throw std::invalid_argument("Cannot mix 2D and 3D lines!\n");
+    }
+    if(lines.ndim() != 2 || lines.shape(1) != 4)
+    {
+        throw std::invalid_argument("Expected an (N, 4) array of lines\n");
+    }
+    auto segs = lines.unchecked<2>();
+    py::ssize_t count = segs.shape(0);
+    py::array_t<bool> found(count);
+    py::array_t<double> points({count, (py::ssize_t) 2});
+    auto mask = found.mutable_unchecked<1>();
+    auto pts = points.mutable_unchecked<2>();
+    double x1 = this->_origin.x();
+    double x2 = this->_end.x();
+    double y1 = this->_origin.y();
+    double y2 = this->_end.y();
+    {
+        py::gil_scoped_release release;
+        for(py::ssize_t i = 0; i < count; i++)
+        {
+            double x3 = segs(i, 0);
+            double y3 = segs(i, 1);
+            double x4 = segs(i, 2);
+            double y4 = segs(i, 3);
+            double denominator = (y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1);
+            if(std::abs(denominator) <= LINE_IS_CLOSE)
+            {
+                mask(i) = false;
+                pts(i, 0) = 0.0;
+                pts(i, 1) = 0.0;
+                continue;
+            }
+            double ua = ((x4 - x3) * (y1 - y3) - (y4 - y3) * (x1 - x3)) / denominator;
+            mask(i) = true;
+            pts(i, 0) = x1 + ua * (x2 - x1);
+            pts(i, 1) = y1 + ua * (y2 - y1);
+        }
+    }
+    return std::make_tuple(found, points);
+}
 double Line::length()
 {
     double delta_x = this->_origin.x() - this->_end.x();
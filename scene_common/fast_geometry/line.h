@@ -36,6 +36,9 @@ class Line {
     bool isPointOnLine(const Point & pt) const;
     // Get point where two lines intersect
     std::tuple<bool, std::pair<double, double>> intersection(const Line& other) const;
+    // Batch version of intersection for an (N, 4) array of 2D lines as x1, y1, x2, y2.
+    // Returns a mask of non parallel lines and an (N, 2) array of intersection points.
+    std::tuple<py::array_t<bool>, py::array_t<double>> intersections(const DoubleArray & lines) const;
 
     // Properties
     double length();
@@ -28,6 +28,9 @@ typedef unsigned int uint;
 
 namespace py = pybind11;
 
+// Contiguous float64 numpy array, only copied if the caller passes another layout or dtype
+typedef py::array_t<double, py::array::c_style | py::array::forcecast> DoubleArray;
+
 class Point {
   public:
 
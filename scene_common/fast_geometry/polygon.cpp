@@ -45,4 +45,21 @@ bool Polygon::isPointInside(double px, double py) const
     }
     return inside;
 }
-
+py::array_t<bool> Polygon::pointsInside(const DoubleArray & points) const
+{
+    if(points.ndim() != 2 || points.shape(1) < 2)
+    {
+        throw std::invalid_argument("Expected an (N, 2) array of points\n");
+    }
+    auto pts = points.unchecked<2>();
+    py::array_t<bool> result(pts.shape(0));
+    auto mask = result.mutable_unchecked<1>();
+    {
+        py::gil_scoped_release release;
+        for(py::ssize_t i = 0; i < pts.shape(0); i++)
+        {
+            mask(i) = this->isPointInside(pts(i, 0), pts(i, 1));
+        }
+    }
+    return result;
+}
@@ -18,6 +18,8 @@
 #include <map>
 #include <vector>
 
+#include "point.h"
+
 class Polygon
 {
   public:
@@ -29,6 +31,9 @@ class Polygon
     // Method to check if a point is inside the region
     bool isPointInside(double px, double py) const ;
 
+    // Batch version of isPointInside for an (N, 2) array of points
+    py::array_t<bool> pointsInside(const DoubleArray & points) const ;
+
   private:
     std::vector<std::pair<double, double>> vertices;
     int region_type;
@@ -329,6 +329,30 @@ bool Rectangle::isPointWithin(const Point & coord) const
     }
     return true;
 }
+py::array_t<bool> Rectangle::pointsWithin(const DoubleArray & points) const
+{
+    if(points.ndim() != 2 || points.shape(1) < 2)
+    {
+        throw std::invalid_argument("Expected an (N, 2) array of points\n");
+    }
+    auto pts = points.unchecked<2>();
+    py::array_t<bool> result(pts.shape(0));
+    auto mask = result.mutable_unchecked<1>();
+    double x1 = this->x();
+    double y1 = this->y();
+    double x2 = this->x2();
+    double y2 = this->y2();
+    {
+        py::gil_scoped_release release;
+        for(py::ssize_t i = 0; i < pts.shape(0); i++)
+        {
+            double px = pts(i, 0);
+            double py = pts(i, 1);
+            mask(i) = !(px < x1 || py < y1 || px > x2 || py > y2);
+        }
+    }
+    return result;
+}
 Rectangle Rectangle::offset(const Point & p)
 {
     return Rectangle( Point(p.x() + this->x(), p.y() + this->y()),
@@ -83,6 +83,8 @@ class Rectangle {
 
     //bool isPointWithin(const py::tuple & coord) const;
     bool isPointWithin(const Point & coord) const;
+    // Batch version of isPointWithin for an (N, 2) array of points
+    py::array_t<bool> pointsWithin(const DoubleArray & points) const;
 
     Rectangle offset(const Point & p);
     Rectangle intersection(const Rectangle & r);
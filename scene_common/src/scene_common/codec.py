@@ -0,0 +1,159 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import json
+
+import numpy as np
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+try:
+  import msgpack
+except ImportError:
+  msgpack = None
+
+def _default(obj):
+  """! Converts NumPy values that the encoders cannot handle natively.
+
+  @param      obj    Object that could not be serialized.
+  @return     Serializable equivalent of obj.
+  """
+  if isinstance(obj, np.generic):
+    return obj.item()
+  if isinstance(obj, np.ndarray):
+    return obj.tolist()
+  raise TypeError(f"Object of type {obj.__class__.__name__} is not serializable")
+
+class JSONCodec:
+  """! JSON payload codec.
+
+  Uses orjson when it is installed, which serializes NumPy arrays and scalars
+  natively, and falls back to the json module otherwise.
+  """
+  name = "json"
+  content_type = "application/json"
+
+  if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def encode(self, data):
+      return orjson.dumps(data, default=_default, option=self._OPTIONS)
+
+    def decode(self, payload):
+      return orjson.loads(payload)
+
+  else:
+    def encode(self, data):
+      return json.dumps(data, default=_default).encode('utf-8')
+
+    def decode(self, payload):
+      return json.loads(payload)
+
+  def encodeFragment(self, data):
+    """! Encodes a value to be embedded later with encodeWithFragments(). """
+    return self.encode(data)
+
+  def encodeWithFragments(self, data, key, fragments):
+    """! Encodes a dictionary with a list of pre-encoded values under key.
+
+    @param      data         Dictionary, any existing value for key is ignored.
+    @param      key          Key of the list of fragments.
+    @param      fragments    Values encoded with encodeFragment().
+    @return     Encoded payload.
+    """
+    header = self.encode({k: v for k, v in data.items() if k != key})
+    body = self.encode(key) + b':[' + b','.join(fragments) + b']}'
+    if header == b'{}':
+      return b'{' + body
+    return header[:-1] + b',' + body
+
+class MsgpackCodec:
+  """! Binary MessagePack payload codec, requires the msgpack package. """
+  name = "msgpack"
+  content_type = "application/msgpack"
+
+  def __init__(self):
+    if msgpack is None:
+      raise ImportError("The msgpack codec requires the msgpack package")
+    return
+
+  def encode(self, data):
+    return msgpack.packb(data, default=_default, use_bin_type=True)
+
+  def decode(self, payload):
+    return msgpack.unpackb(payload, raw=False)
+
+  def encodeFragment(self, data):
+    """! Encodes a value to be embedded later with encodeWithFragments(). """
+    return self.encode(data)
+
+  def encodeWithFragments(self, data, key, fragments):
+    """! Encodes a dictionary with a list of pre-encoded values under key.
+
+    @param      data         Dictionary, any existing value for key is ignored.
+    @param      key          Key of the list of fragments.
+    @param      fragments    Values encoded with encodeFragment().
+    @return     Encoded payload.
+    """
+    packer = msgpack.Packer(default=_default, use_bin_type=True)
+    header = {k: v for k, v in data.items() if k != key}
+    parts = [packer.pack_map_header(len(header) + 1)]
+    for k, v in header.items():
+      parts.append(packer.pack(k))
+      parts.append(packer.pack(v))
+    parts.append(packer.pack(key))
+    parts.append(packer.pack_array_header(len(fragments)))
+    parts.extend(fragments)
+    return b''.join(parts)
+
+CODECS = {
+  JSONCodec.name: JSONCodec,
+  MsgpackCodec.name: MsgpackCodec,
+}
+
+_instances = {}
+
+def getCodec(name):
+  """! Returns the shared codec instance with the given name.
+
+  @param      name    Codec name, one of CODECS.
+  @return     Codec instance.
+  """
+  if name not in _instances:
+    if name not in CODECS:
+      raise ValueError(f"Unknown codec '{name}', expected one of {list(CODECS)}")
+    _instances[name] = CODECS[name]()
+  return _instances[name]
+
+def detectCodec(payload):
+  """! Returns the codec for a received payload.
+
+  A JSON document never starts with a byte above 0x7f, while MessagePack maps
+  and arrays always do, so the payload identifies its own content type.
+
+  @param      payload    Received payload as bytes or str.
+  @return     Codec instance.
+  """
+  if isinstance(payload, (bytes, bytearray, memoryview)) and len(payload) \
+     and payload[0] >= 0x80:
+    return getCodec(MsgpackCodec.name)
+  return getCodec(JSONCodec.name)
+
+def decode(payload):
+  """! Decodes a received payload with the codec it was encoded with.
+
+  @param      payload    Received payload as bytes or str.
+  @return     Decoded message.
+  """
+  return detectCodec(payload).decode(payload)
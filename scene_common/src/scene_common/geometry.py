@@ -16,6 +16,7 @@ import numpy as np
 from fast_geometry import Point, Line, Rectangle, Polygon, Size
 
 DEFAULTZ = 0
+MAX_INDEX_CELLS_PER_REGION = 4096
 
 # Re-export modules from fast geometry as our own
 __all__ = ['Point', 'Line', 'Rectangle', 'Size']
@@ -127,6 +128,35 @@ class Region:
       return True
     return False
 
+  def pointsWithin(self, points):
+    """! Batch version of isPointWithin.
+
+    @param   points  (N, 2) or (N, 3) array of coordinates
+    @return  mask    Boolean numpy array, True for points within the region
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if not len(points):
+      return np.zeros(0, dtype=bool)
+    if self.area == Region.REGION_SCENE:
+      return np.ones(len(points), dtype=bool)
+
+    mask = self.boundingBox.pointsWithin(points)
+
+    if self.area == Region.REGION_POLY:
+      if len(self.points) <= 2:
+        return np.zeros(len(points), dtype=bool)
+      if self.polygon is None:
+        pts = [x.as2Dxy.asNumpyCartesian.flatten().tolist() for x in self.points]
+        self.polygon = Polygon(pts)
+      if mask.any():
+        mask[mask] = self.polygon.pointsInside(points[mask])
+      return mask
+
+    dx = np.abs(points[:, 0] - self.center.x)
+    dy = np.abs(points[:, 1] - self.center.y)
+    return mask & ((dx + dy <= self.radius)
+                   | (dx * dx + dy * dy <= self.radius * self.radius))
+
   def serialize(self):
     data = {'points':[], 'title':self.name, 'uuid':self.uuid}
     if self.area == self.REGION_SCENE:
@@ -178,3 +208,131 @@ class Tripwire(Region):
       'uuid': self.uuid,
     }
     return data
+
+
+class RegionIndex:
+  """Uniform grid over the bounding boxes of a collection of regions.
+
+  The index only depends on the bounding boxes, so it only needs to be
+  rebuilt when those change. Exact containment is still answered by the
+  regions themselves, but only for the regions that share a grid cell with
+  the point being tested.
+  """
+
+  def __init__(self, max_cells_per_region=MAX_INDEX_CELLS_PER_REGION):
+    self.max_cells_per_region = max_cells_per_region
+    self.cell_size = None
+    self._bounds = {}
+    self._cells = {}
+    self._unbounded = []
+    return
+
+  def update(self, regions):
+    """! Rebuilds the grid if the bounding boxes of the regions changed.
+
+    @param   regions  Dictionary of Region or Tripwire objects keyed by uuid
+    @return  bool     True if the grid was rebuilt
+    """
+    bounds = {key: self._regionBounds(region) for key, region in regions.items()}
+    if bounds == self._bounds:
+      return False
+    self._bounds = bounds
+    self._build()
+    return True
+
+  @staticmethod
+  def _regionBounds(region):
+    if region.area == Region.REGION_SCENE or not hasattr(region, 'boundingBox'):
+      return None
+    bbox = region.boundingBox
+    return (bbox.x1, bbox.y1, bbox.x2, bbox.y2)
+
+  def _build(self):
+    self._cells = {}
+    self._unbounded = []
+    extents = [max(b[2] - b[0], b[3] - b[1]) for b in self._bounds.values() if b is not None]
+    extents = [e for e in extents if e > 0]
+    self.cell_size = float(np.median(extents)) if extents else 1.0
+
+    for key, bounds in self._bounds.items():
+      if bounds is None:
+        self._unbounded.append(key)
+        continue
+      i0, j0 = self._cellOf(bounds[0], bounds[1])
+      i1, j1 = self._cellOf(bounds[2], bounds[3])
+      if (i1 - i0 + 1) * (j1 - j0 + 1) > self.max_cells_per_region:
+        self._unbounded.append(key)
+        continue
+      for i in range(i0, i1 + 1):
+        for j in range(j0, j1 + 1):
+          self._cells.setdefault((i, j), []).append(key)
+    return
+
+  def _cellOf(self, x, y):
+    return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+  def candidates(self, regions, x1, y1, x2=None, y2=None):
+    """! Returns keys of the regions whose bounding box may overlap the
+    given point or axis aligned rectangle.
+
+    @param   regions  Dictionary of Region objects that was passed to update()
+    @param   x1, y1   Point, or one corner of the rectangle
+    @param   x2, y2   Opposite corner of the rectangle (optional)
+    @return  set      Region keys
+    """
+    found = set(key for key in regions if key not in self._bounds)
+    found.update(self._unbounded)
+    if self.cell_size is not None:
+      if x2 is None:
+        x2, y2 = x1, y1
+      i0, j0 = self._cellOf(min(x1, x2), min(y1, y2))
+      i1, j1 = self._cellOf(max(x1, x2), max(y1, y2))
+      if (i1 - i0 + 1) * (j1 - j0 + 1) > self.max_cells_per_region:
+        return set(regions)
+      for i in range(i0, i1 + 1):
+        for j in range(j0, j1 + 1):
+          found.update(self._cells.get((i, j), ()))
+    return found.intersection(regions)
+
+  def membership(self, regions, points):
+    """! Finds which of the points lie within each region using one pass
+    over the grid.
+
+    Regions that are present in regions but were never indexed (for
+    example added directly to the dictionary) are tested exhaustively.
+
+    @param   regions  Dictionary of Region objects that was passed to update()
+    @param   points   List of Point objects or (N, 2) array of coordinates
+    @return  dict     Region key -> ascending list of point indices within it
+    """
+    unindexed = [key for key in regions if key not in self._bounds]
+    if isinstance(points, np.ndarray):
+      coords = np.asarray(points[:, :2], dtype=np.float64)
+    else:
+      coords = np.array([(point.x, point.y) for point in points], dtype=np.float64).reshape(-1, 2)
+    by_cell = {}
+    if self.cell_size is None:
+      by_cell[None] = np.arange(len(coords))
+    else:
+      cells = np.floor(coords / self.cell_size).astype(np.int64)
+      for idx, cell in enumerate(map(tuple, cells)):
+        by_cell.setdefault(cell, []).append(idx)
+
+    result = {}
+    for cell, indices in by_cell.items():
+      keys = list(self._unbounded) + unindexed
+      if cell is not None:
+        keys += self._cells.get(cell, [])
+      indices = np.asarray(indices)
+      cell_coords = coords[indices]
+      for key in keys:
+        region = regions.get(key, None)
+        if region is None:
+          continue
+        within = indices[region.pointsWithin(cell_coords)]
+        if len(within):
+          result.setdefault(key, []).extend(within.tolist())
+
+    for key in result:
+      result[key].sort()
+    return result
@@ -18,7 +18,7 @@ import threading
 from enum import Enum, auto
 from string import Template
 
-from scene_common import log
+from scene_common import codec, log
 
 # FIXME - find a way for javascript/HTML to use these and not hardcode topics
 
@@ -45,6 +45,8 @@ class _Topic(Enum):
   IMAGE_CAMERA = auto()
   SYS_AUTOCALIB_STATUS = auto()
   SYS_CHILDSCENE_STATUS = auto()
+  SYS_CONTROLLER_METRICS = auto()
+  SYS_CONTROLLER_SHARD = auto()
   SYS_PERCEBRO_STATUS = auto()
 
 # Really gross way to put above constants directly into PubSub class
@@ -74,12 +76,16 @@ class PubSub(_PubSubTopicBase):
     _Topic.IMAGE_CAMERA: Template(TOPIC_BASE + "/image/camera/${camera_id}"),
     _Topic.SYS_AUTOCALIB_STATUS: Template(TOPIC_BASE + "/sys/autocalibration/status"),
     _Topic.SYS_CHILDSCENE_STATUS: Template(TOPIC_BASE + "/sys/child/status/${scene_name}"),
+    _Topic.SYS_CONTROLLER_METRICS: Template(TOPIC_BASE + "/sys/controller/metrics"),
+    _Topic.SYS_CONTROLLER_SHARD: Template(TOPIC_BASE + "/sys/controller/shard/${instance_id}"),
     _Topic.SYS_PERCEBRO_STATUS: Template(TOPIC_BASE + "/sys/percebro/status/${camera_id}"),
   }
 
   def __init__(self, auth, cert, rootca, broker, port=None, keepalive=60,
-               insecure=False, transport="tcp", userdata=None):
+               insecure=False, transport="tcp", userdata=None, codec_name=codec.JSONCodec.name):
     self.broker = broker
+    self.codec = codec.getCodec(codec_name)
+    self.topic_codecs = []
     self.port = port
     self.keepalive = keepalive
 
@@ -148,6 +154,7 @@ class PubSub(_PubSubTopicBase):
     regex = regex.replace(r'\$\{sensor_id\}', r'([^/]+)')
     regex = regex.replace(r'\$\{region_type\}', r'([^/]+)')
     regex = regex.replace(r'\$\{event_type\}', r'([^/]+)')
+    regex = regex.replace(r'\$\{instance_id\}', r'([^/]+)')
     pattern = re.compile(f'^{regex}$')
 
     match = pattern.match(topic)
@@ -193,6 +200,41 @@ class PubSub(_PubSubTopicBase):
   def publish(self, topic, payload, qos=0, retain=False):
     return self.client.publish(topic, payload, qos, retain)
 
+  def setWill(self, topic, payload, qos=0, retain=False):
+    """Sets the message the broker publishes when the client disconnects
+       unexpectedly. Only takes effect on the next connect().
+    """
+    return self.client.will_set(topic, payload, qos, retain)
+
+  def setTopicCodec(self, topic_filter, codec_name):
+    """Selects the codec used to encode data published on topics matching
+       the filter, which may contain MQTT wildcards. Filters added later
+       take precedence.
+    """
+    self.topic_codecs.insert(0, (topic_filter, codec.getCodec(codec_name)))
+    return
+
+  def codecForTopic(self, topic):
+    for topic_filter, topic_codec in self.topic_codecs:
+      if mqtt.topic_matches_sub(topic_filter, topic):
+        return topic_codec
+    return self.codec
+
+  def encode(self, topic, data):
+    """Encodes data with the codec selected for the topic."""
+    return self.codecForTopic(topic).encode(data)
+
+  def publishData(self, topic, data, qos=0, retain=False):
+    """Encodes data with the codec selected for the topic and publishes it."""
+    return self.publish(topic, self.encode(topic, data), qos, retain)
+
+  @staticmethod
+  def decode(payload):
+    """Decodes a received payload. JSON and MessagePack payloads are told
+       apart by their first byte, so receivers need no configuration.
+    """
+    return codec.decode(payload)
+
   def disconnect(self):
     return self.client.disconnect()
 
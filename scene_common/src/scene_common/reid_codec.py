@@ -0,0 +1,73 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import base64
+
+import numpy as np
+
+FLOAT32 = "float32"
+FLOAT16 = "float16"
+INT8 = "int8"
+ENCODINGS = (FLOAT32, FLOAT16, INT8)
+
+_SEPARATOR = ":"
+_SCALE_SIZE = 4
+
+def encodeReIDVector(vector, encoding=FLOAT32):
+  """! Encodes a Re-ID vector for a detection message.
+
+  float32 vectors are the base64 of their little endian values, as published
+  before other encodings were added. Other encodings prefix the base64 with
+  their name and a colon, which never occurs in base64, so each message
+  signals its encoding. float16 halves the size, int8 stores a float32 scale
+  and the values quantized with it in a quarter of the size.
+
+  @param      vector      Re-ID vector as a NumPy array or list of any shape.
+  @param      encoding    One of ENCODINGS.
+  @return     Encoded vector string.
+  """
+  values = np.asarray(vector, dtype='<f4').reshape(-1)
+  if encoding == FLOAT32:
+    return base64.b64encode(values.tobytes()).decode('ascii')
+
+  if encoding == FLOAT16:
+    data = values.astype('<f2').tobytes()
+  elif encoding == INT8:
+    peak = float(np.max(np.abs(values))) if len(values) else 0.0
+    scale = np.array([peak / 127 if peak else 1.0], dtype='<f4')
+    quantized = np.clip(np.rint(values / scale[0]), -127, 127).astype(np.int8)
+    data = scale.tobytes() + quantized.tobytes()
+  else:
+    raise ValueError(f"Unknown reid encoding '{encoding}', expected one of {ENCODINGS}")
+  return encoding + _SEPARATOR + base64.b64encode(data).decode('ascii')
+
+def decodeReIDVector(data):
+  """! Decodes a Re-ID vector from a detection message.
+
+  float32 vectors are returned as a read-only view of the decoded bytes
+  without copying the values, other encodings are converted to float32.
+
+  @param      data    Encoded vector string.
+  @return     float32 NumPy array of shape (1, dimensions).
+  """
+  encoding, _, encoded = data.rpartition(_SEPARATOR)
+  raw = base64.b64decode(encoded)
+  if not encoding or encoding == FLOAT32:
+    values = np.frombuffer(raw, dtype='<f4')
+  elif encoding == FLOAT16:
+    values = np.frombuffer(raw, dtype='<f2').astype(np.float32)
+  elif encoding == INT8:
+    scale = np.frombuffer(raw, dtype='<f4', count=1)[0]
+    values = np.multiply(np.frombuffer(raw, dtype=np.int8, offset=_SCALE_SIZE), scale,
+                         dtype=np.float32)
+  else:
+    raise ValueError(f"Unknown reid encoding '{encoding}', expected one of {ENCODINGS}")
+  return values.reshape(1, -1)
@@ -211,6 +211,15 @@ class RESTClient:
     """
     return self._get("scenes", filter)
 
+  def getSceneUpdates(self, since):
+    """Gets the version of every scene and the scenes updated since a timestamp.
+
+    @param      since           `timestamp` of a previous reply, or None to get all scenes
+    @return                     RESTResult with `timestamp`, `versions` and `results`
+                                on success, empty with `errors` set on failure
+    """
+    return self._get("scenes/updates", {'since': since} if since else None)
+
   def createScene(self, data):
     """Creates a new scene
 
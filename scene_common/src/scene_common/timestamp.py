@@ -9,46 +9,183 @@
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
 
+import calendar
+import math
+import threading
 import time
-from datetime import datetime
-from pytz import timezone
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from scene_common import log
 
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 TIMEZONE = "UTC"
+UTC = timezone.utc
+
+# Fixed message format YYYY-MM-DDTHH:MM:SS.mmmZ
+ISO_TIME_LENGTH = len("2000-01-01T00:00:00.000Z")
+_MINUTE_FORMAT = "%Y-%m-%dT%H:%M"
+_SECOND_FORMAT = "%Y-%m-%dT%H:%M:%S"
+# Lookup tables for the parts of the format that change on every message
+_MILLISECOND_SUFFIXES = [f".{ms:03d}Z" for ms in range(1000)]
+_SECOND_MICROSECONDS = {f"{sec:02d}": sec * 1000000 for sec in range(60)}
+_MILLISECOND_MICROSECONDS = {f"{ms:03d}": ms * 1000 for ms in range(1000)}
+
+@lru_cache(maxsize=64)
+def _format_second(seconds: int) -> str:
+  """! Returns the ISO 8601 date and time of a whole second, without fraction. """
+  return time.strftime(_SECOND_FORMAT, time.gmtime(seconds))
+
+@lru_cache(maxsize=64)
+def _parse_minute(minute: str) -> int:
+  """! Returns the epoch seconds of a YYYY-MM-DDTHH:MM string. """
+  return calendar.timegm(datetime.strptime(minute, _MINUTE_FORMAT).timetuple())
 
 def get_iso_time(timestamp: float=None) -> str:
   """! Returns ISO 8601 timestamp in UTC as string.
 
+  Rounds to the microsecond like datetime.fromtimestamp() and truncates to
+  milliseconds. The date and time of the whole second are cached, since
+  consecutive calls almost always fall in the same few seconds.
+
   @param      timestamp    Time in seconds as float type.
   @return     Time as string.
   """
   if timestamp is None:
     timestamp = time.time()
 
-  utc_time = datetime.fromtimestamp(timestamp, tz=timezone(TIMEZONE))
-  return f"{utc_time.strftime(DATETIME_FORMAT)[:-3]}Z"
+  fraction, seconds = math.modf(timestamp)
+  seconds = int(seconds)
+  microseconds = round(fraction * 1e6)
+  if microseconds >= 1000000:
+    seconds += 1
+    microseconds -= 1000000
+  elif microseconds < 0:
+    seconds -= 1
+    microseconds += 1000000
+  return _format_second(seconds) + _MILLISECOND_SUFFIXES[microseconds // 1000]
 
 def get_epoch_time(timestamp: str=None) -> float:
   """! Returns Epoch/POSIX timestamp in UTC as float.
 
+  Timestamps in the fixed YYYY-MM-DDTHH:MM:SS.mmmZ message format only parse
+  the seconds and milliseconds, the date and time of the minute are cached.
+  Any other fraction length is parsed with datetime.strptime().
+
   @param      timestamp    Time as string type.
   @return     Time as float.
   """
   if not timestamp:
     return time.time()
 
+  if len(timestamp) == ISO_TIME_LENGTH and timestamp[16] == ':' and timestamp[19] == '.' \
+     and timestamp[23] == 'Z':
+    seconds = _SECOND_MICROSECONDS.get(timestamp[17:19])
+    milliseconds = _MILLISECOND_MICROSECONDS.get(timestamp[20:23])
+    if seconds is not None and milliseconds is not None:
+      # Same integer microseconds divided as in datetime.timestamp() for the identical float
+      minute = _parse_minute(timestamp[:16])
+      return (minute * 1000000 + seconds + milliseconds) / 1000000
+
   utc_time = datetime.strptime(timestamp, f"{DATETIME_FORMAT}Z")
-  return utc_time.replace(tzinfo=timezone(TIMEZONE)).timestamp()
+  return utc_time.replace(tzinfo=UTC).timestamp()
+
+class ClockSync:
+  """! Keeps the offset of the local clock to an NTP server in a background thread.
+
+  Hot paths only read the cached offset, so message handling never waits on
+  the network. Between synchronizations time advances with the monotonic
+  clock, so it is not affected by jumps of the local wall clock. New offsets
+  are smoothed with an exponential moving average, unless they differ from
+  the current offset by more than step_threshold seconds.
+  """
+  SYNC_INTERVAL = 300
+  RETRY_INTERVAL = 10
+  TIMEOUT = 1
 
-def adjust_time(now, server, client, lastTimeSync, timeOffset, exception):
-  if server is not None and (not lastTimeSync or now - lastTimeSync > 300):
+  def __init__(self, server, interval=SYNC_INTERVAL, timeout=TIMEOUT, smoothing=0.5,
+               step_threshold=1.0, client=None):
+    """! Initializes the time synchronization, see start().
+
+    @param      server            NTP server, None to use the local clock.
+    @param      interval          Seconds between synchronizations.
+    @param      timeout           Timeout of each NTP request in seconds.
+    @param      smoothing         Weight of a new offset in the moving average.
+    @param      step_threshold    Offset change in seconds applied at once.
+    @param      client            NTP client, ntplib.NTPClient() by default.
+    """
+    self.server = server
+    self.interval = interval
+    self.timeout = timeout
+    self.smoothing = smoothing
+    self.step_threshold = step_threshold
+    self.client = client
+    # Epoch time at the origin of the monotonic clock, None until synchronized
+    self.base = None
+    self.last_sync = None
+    self.stopped = threading.Event()
+    self.thread = None
+    return
+
+  def start(self):
+    """! Synchronizes once and keeps synchronizing in a background thread. """
+    if self.server is None or self.thread is not None:
+      return
+    if self.client is None:
+      import ntplib
+      self.client = ntplib.NTPClient()
+    self.stopped.clear()
+    self.sync()
+    self.thread = threading.Thread(target=self._run, daemon=True, name="clock-sync")
+    self.thread.start()
+    return
+
+  def stop(self):
+    self.stopped.set()
+    if self.thread is not None:
+      self.thread.join()
+      self.thread = None
+    return
+
+  def sync(self):
+    """! Queries the NTP server and updates the offset.
+
+    @return     True if the server responded.
+    """
     try:
-      response = client.request(server, timeout=1)
-      timeOffset = response.offset
-      lastTimeSync = now
-    except exception:
-      print("Failed to connect to time server. Using old offset")
-  return timeOffset, lastTimeSync
+      response = self.client.request(self.server, timeout=self.timeout)
+    except Exception as e:
+      log.warn("Failed to connect to time server. Using old offset", e)
+      return False
+
+    base = time.time() + response.offset - time.monotonic()
+    if self.base is None or abs(base - self.base) > self.step_threshold:
+      self.base = base
+    else:
+      self.base += self.smoothing * (base - self.base)
+    self.last_sync = time.monotonic()
+    return True
+
+  @property
+  def offset(self) -> float:
+    """! Seconds to add to the local wall clock, 0 until synchronized. """
+    base = self.base
+    if base is None:
+      return 0.0
+    return time.monotonic() + base - time.time()
+
+  def now(self) -> float:
+    """! Returns the synchronized Epoch/POSIX time in UTC as float. """
+    base = self.base
+    if base is None:
+      return time.time()
+    return time.monotonic() + base
+
+  def _run(self):
+    wait = self.interval if self.last_sync is not None else self.RETRY_INTERVAL
+    while not self.stopped.wait(wait):
+      wait = self.interval if self.sync() else self.RETRY_INTERVAL
+    return
 
 def get_datetime_from_string(date_string: str) -> datetime:
   """! Returns datetime object from string.
@@ -56,4 +193,4 @@ def get_datetime_from_string(date_string: str) -> datetime:
   @param      date_string    Date in string format.
   @return     Date as datetime object.
   """
-  return datetime.strptime(date_string, f"{DATETIME_FORMAT}Z").replace(tzinfo=timezone(TIMEZONE))
+  return datetime.strptime(date_string, f"{DATETIME_FORMAT}Z").replace(tzinfo=UTC)
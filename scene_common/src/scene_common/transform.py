@@ -188,6 +188,20 @@ class CameraIntrinsics:
       raise ValueError("Invalid Point", pt.x, pt.y)
     return pt
 
+  def infer3DCoordsFrom2DDetections(self, boxes):
+    """Convert bounding boxes in pixels to the normalized image plane of the
+    camera, undistorting the corners of all boxes in a single call
+    @param boxes Array of shape (N, 4) of x, y, width and height in pixels
+    @return Array of shape (N, 4) of x, y, width and height on the normalized image plane
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if not len(boxes):
+      return boxes.copy()
+    corners = np.concatenate([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]])
+    undistorted = cv2.undistortPoints(corners.reshape(-1, 1, 2), self.intrinsics,
+                                      self.distortion).reshape(2, -1, 2)
+    return np.hstack([undistorted[0], undistorted[1] - undistorted[0]])
+
   def asDict(self):
     # FIXME - find a way to return fov and hfov/vfov if that is how
     # the user originally specified the intrinsics
@@ -275,10 +289,7 @@ class CameraPose:
     else:
       raise ValueError("Unable to understand pose", pose)
 
-    inverted = np.linalg.inv(self.pose_mat)
-    rmat = inverted[0:3, 0:3]
-    self._extrinsicsTVecs = inverted[0:3, 3:4]
-    self._extrinsicsRVecs = cv2.Rodrigues(rmat)[0]
+    self._setExtrinsics()
 
     pdict = self._poseMatToPose(self.pose_mat)
     self.translation = pdict['translation']
@@ -291,6 +302,16 @@ class CameraPose:
       self._calculateRegionOfView(self.resolution)
     return
 
+  def _setExtrinsics(self):
+    """Precompute the world to camera transform used to project points"""
+    inverted = np.linalg.inv(self.pose_mat)
+    rmat = inverted[0:3, 0:3]
+    self._extrinsicsTVecs = inverted[0:3, 3:4]
+    self._extrinsicsRVecs = cv2.Rodrigues(rmat)[0]
+    self._worldToCameraRotation = np.ascontiguousarray(rmat.T)
+    self._worldToCameraTranslation = inverted[0:3, 3].copy()
+    return
+
   def cameraPointToWorldPoint(self, point):
     if point.is3D:
       npt = np.hstack((point.asNumpyCartesian, (1,)))
@@ -314,6 +335,22 @@ class CameraPose:
       pt = start
     return pt
 
+  def cameraPointsToWorldPoints(self, points):
+    """Project points on the normalized image plane to the ground plane of the
+    world coordinate system, see cameraPointToWorldPoint
+    @param points Array of shape (N, 2)
+    @return Array of shape (N, 3)
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    start = self.pose_mat[:3, 3]
+    rays = points @ self.pose_mat[:3, :2].T + self.pose_mat[:3, 2]
+    world = np.tile(start, (len(points), 1))
+    # Rays parallel to the ground plane keep the camera position
+    hits = rays[:, 2] != 0
+    scale = -start[2] / rays[hits, 2]
+    world[hits] += rays[hits] * scale[:, np.newaxis]
+    return world
+
   def transformObjectPoseInScene(self, obj, obj_T, obj_R):
     obj.translate(obj_T)
     obj.rotate(obj_R,center=(0,0,0))
@@ -342,28 +379,44 @@ class CameraPose:
     @return   obj_T, obj_R translation and rotation of object projected to map
     """
 
+    raycaster = MapRaycaster(self.transformObjectPoseInScene(map_obj, map_T, map_R))
+    translations, rotations = self.projectToMapBatch([obj_T], [obj_R], raycaster)
+    return translations[0], rotations[0]
+
+  def projectToMapBatch(self, translations, rotations, raycaster):
+    """!
+    Project all object detections of a camera frame onto the map, casting
+    their rays in a single call. The map stays in world coordinates and the
+    rays are moved from the camera to the world coordinate system instead.
+    @param    translations  object translations in camera csys
+    @param    rotations     object rotations in camera csys as quaternions
+    @param    raycaster     MapRaycaster of the map in scene csys
+
+    @return   translations, rotations of the objects projected to map, an
+              object whose ray misses the map keeps its translation and rotation
+    """
+    translations = list(translations)
+    rotations = list(rotations)
+    if not translations:
+      return translations, rotations
+
     cam_T = self.translation.asNumpyCartesian
     cam_R = Rotation.from_quat(np.radians(self.quaternion_rotation)).as_matrix()
-    map_obj = self.transformObjectPoseInScene(map_obj, map_T, map_R)
-    map_obj = self.transformSceneToCameraCoordinates(map_obj, cam_T, cam_R)
-
-    scene = o3d.t.geometry.RaycastingScene()
-    scene.add_triangles(map_obj)
-    rays = o3d.core.Tensor([[0, 0, 0, obj_T[0], obj_T[1], obj_T[2]]],dtype=o3d.core.Dtype.Float32)
-    rcast = scene.cast_rays(rays)
-    distance_ratio = rcast['t_hit'].numpy()[0]
-
-    if not distance_ratio == np.inf:
-      obj_R = Rotation.from_quat(obj_R).as_matrix()
-      obj_T = (distance_ratio * np.array(obj_T)).tolist()
-      v1 = (obj_R @ np.array([0, 0, 1]).reshape([3,1])).reshape([1,3]
-        )[0] #object local z axis in camera csys
-      v2 = rcast['primitive_normals'].numpy()[0] #surface normal vector in camera csys
-
-      obj_R = Rotation.from_matrix(
-        (rotationToTarget(v1,v2).as_matrix()) @ obj_R
+    directions = np.asarray(translations, dtype=np.float64).reshape(-1, 3)
+    rays = np.hstack([np.tile(cam_T, (len(directions), 1)), directions @ cam_R.T])
+    rcast = raycaster.scene.cast_rays(o3d.core.Tensor(rays.astype(np.float32)))
+    distance_ratios = rcast['t_hit'].numpy()
+    # Surface normal vectors in camera csys
+    normals = rcast['primitive_normals'].numpy() @ cam_R
+
+    for idx in np.flatnonzero(np.isfinite(distance_ratios)):
+      obj_R = Rotation.from_quat(rotations[idx]).as_matrix()
+      translations[idx] = (distance_ratios[idx] * directions[idx]).tolist()
+      v1 = obj_R[:, 2] #object local z axis in camera csys
+      rotations[idx] = Rotation.from_matrix(
+        (rotationToTarget(v1, normals[idx]).as_matrix()) @ obj_R
         ).as_quat()
-    return obj_T, obj_R
+    return translations, rotations
 
   def projectBounds(self, rect):
     """Project the bounding box from camera coordinate system to world coordinate system
@@ -386,14 +439,84 @@ class CameraPose:
     baseAngle = math.degrees(math.atan2(self.translation.z, baseLen))
     return bounds, shadow, baseAngle
 
+  def projectBoundsBatch(self, boxes):
+    """Vectorized projectBounds for bounding boxes on the normalized image plane
+    @param boxes Array of shape (N, 4) of x, y, width and height
+    @return Tuple of the world corners of shape (N, 4, 3) in the order
+            topLeft, topRight, bottomLeft, bottomRight, the metric width and
+            height of shape (N, 2) and the base angles of shape (N,) in degrees
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    corners = np.stack([np.stack([x1, y1], 1), np.stack([x2, y1], 1),
+                        np.stack([x1, y2], 1), np.stack([x2, y2], 1)], 1)
+    world = self.cameraPointsToWorldPoints(corners.reshape(-1, 2)).reshape(-1, 4, 3)
+    bl, br, far_l = world[:, 0], world[:, 1], world[:, 2]
+
+    camera = self.translation.asNumpyCartesian
+    ll1 = np.linalg.norm(far_l - camera, axis=1)
+    ll2 = np.linalg.norm(far_l - bl, axis=1)
+    lh = np.sin(np.arctan2(camera[2], ll1)) * ll2
+    lw = np.linalg.norm(br - bl, axis=1)
+
+    base = (bl + br) / 2
+    base_len = np.linalg.norm(base - [camera[0], camera[1], 0], axis=1)
+    base_angles = np.degrees(np.arctan2(camera[2], base_len))
+    return world, np.stack([lw, lh], 1), base_angles
+
   def projectWorldPointToCameraPixels(self, point):
-    # FIXME - speed this up. cv2.projectPoints is very time consuming.
-    # 10000 runs:
-    # 15.508s    {projectPoints}
-    pts, _ = cv2.projectPoints(point.asNumpyCartesian,
-                               self._extrinsicsRVecs, self._extrinsicsTVecs,
-                               self.intrinsics.intrinsics, self.intrinsics.distortion)
-    return Point(np.squeeze(pts.reshape(-1, 2)))
+    return Point(self.projectWorldPointsToCameraPixels(point.asNumpyCartesian)[0])
+
+  def projectWorldPointsToCameraPixels(self, points):
+    """Project world points to camera pixels in a single call
+
+    @param    points   array like of shape (N, 3) with world coordinates
+    @return   array of shape (N, 2) with pixel coordinates
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if not len(points):
+      return np.empty((0, 2))
+
+    distortion = self.intrinsics.distortion
+    if np.any(distortion):
+      # cv2.projectPoints has a large fixed cost per call, so project all points at once
+      pts, _ = cv2.projectPoints(points, self._extrinsicsRVecs, self._extrinsicsTVecs,
+                                 self.intrinsics.intrinsics, distortion)
+      return pts.reshape(-1, 2)
+
+    camera_points = points @ self._worldToCameraRotation + self._worldToCameraTranslation
+    pixels = camera_points @ self.intrinsics.intrinsics.T
+    return pixels[:, :2] / pixels[:, 2:3]
+
+  def projectEstimatedBoundsToCameraPixelsBatch(self, points, metric_sizes):
+    """Estimate the pixel bounds of several objects in this camera at once
+
+    Equivalent to calling projectEstimatedBoundsToCameraPixels() for every
+    object, but projects all bound corners with a single projection.
+
+    @param    points        array like of shape (N, 3) with object world locations
+    @param    metric_sizes  array like of shape (N, 2) with object width and height in meters
+    @return   array of shape (N, 4) with the x, y, width and height of each bound
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    metric_sizes = np.asarray(metric_sizes, dtype=np.float64).reshape(-1, 2)
+    # Same offsets as the polar points in projectEstimatedBoundsToCameraPixels()
+    left = points + self._polarOffsets(metric_sizes[:, 0] / 2, self.angle - 90, 0)
+    top = points + self._polarOffsets(metric_sizes[:, 1], 0, 90)
+    pixels = self.projectWorldPointsToCameraPixels(np.vstack((points, left, top)))
+    sensor_pt, sensor_left, sensor_top = np.split(pixels, 3)
+    return np.column_stack((sensor_left[:, 0], sensor_top[:, 1],
+                            (sensor_pt[:, 0] - sensor_left[:, 0]) * 2,
+                            sensor_pt[:, 1] - sensor_top[:, 1]))
+
+  @staticmethod
+  def _polarOffsets(radius, azimuth, inclination):
+    azimuth = math.radians(azimuth)
+    inclination = math.radians(inclination)
+    return np.column_stack((radius * math.cos(azimuth),
+                            radius * math.cos(inclination) * math.sin(azimuth),
+                            radius * math.sin(inclination) * math.cos(azimuth)))
 
   def projectEstimatedBoundsToCameraPixels(self, point, metricSize):
     left = Line(point, Point(metricSize.width / 2,
@@ -532,6 +655,44 @@ class CameraPose:
   def __repr__(self):
     return f"{self.__class__.__name__}: {{'translation': {self.translation}, 'rotation': {self.euler_rotation}, 'scale': {self.scale}}}"
 
+class MapRaycaster:
+  """Ray casting scene of a map mesh in world coordinates, built once and
+  shared by every camera of a scene"""
+
+  def __init__(self, map_obj):
+    """
+    @param map_obj Map as type o3d.t.geometry.TriangleMesh in scene csys
+    """
+    self.scene = o3d.t.geometry.RaycastingScene()
+    self.scene.add_triangles(map_obj)
+    self.source = None
+    return
+
+  @classmethod
+  def fromSceneMap(cls, map_obj, map_T=None, map_R=None):
+    """Places a copy of the scene map at its translation and rotation
+    @param map_obj Map as type o3d.t.geometry.TriangleMesh
+    @param map_T   Map translation in scene csys
+    @param map_R   Map rotation in scene csys as xyz euler angles
+    """
+    mesh = map_obj.clone()
+    if map_T is not None:
+      mesh.translate(o3d.core.Tensor(map_T, dtype=o3d.core.Dtype.Float32))
+    if map_R is not None:
+      mesh.rotate(o3d.geometry.get_rotation_matrix_from_xyz(map_R), center=(0, 0, 0))
+    raycaster = cls(mesh)
+    raycaster.source = (map_obj, cls._key(map_T), cls._key(map_R))
+    return raycaster
+
+  def isFor(self, map_obj, map_T=None, map_R=None):
+    """Whether the raycaster was built from this map placement"""
+    return self.source is not None and self.source[0] is map_obj \
+      and self.source[1:] == (self._key(map_T), self._key(map_R))
+
+  @staticmethod
+  def _key(value):
+    return None if value is None else tuple(np.asarray(value, dtype=np.float64).ravel())
+
 def getPoseMatrix(sceneobj, rot_adjust=None):
   """! Extract the pose matrix of the scenescape object.
 
@@ -576,6 +737,7 @@ class PointCorrespondenceTransform(CameraPose):
     self.euler_rotation = pdict['euler_rotation']
     self.scale = pdict['scale']
     self.pose_mat = pose_mat
+    self._setExtrinsics()
     return
 
   def setResolution(self, size):
@@ -30,6 +30,7 @@ from django.db import models, transaction
 from django.conf import settings
 from django.contrib.sessions.models import Session
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 from scene_common.camera import Camera as ScenescapeCamera, CameraPose as ScenescapeCameraPose
 from scene_common.geometry import Line as ScenescapeLine
@@ -73,6 +74,18 @@ def sendUpdateCommand(scene_id=None, camera_data=None):
         client.loopStop()
   return
 
+def touchScene(scene_id):
+  """Bumps the version of a scene and of the scenes it is a child of, since
+  a parent scene is serialized with its children.
+  @param  scene_id  Scene whose camera, sensor, region, tripwire or child changed
+  """
+  visited = set()
+  while scene_id is not None and scene_id not in visited:
+    visited.add(scene_id)
+    Scene.objects.filter(pk=scene_id).update(updated=timezone.now())
+    scene_id = ChildScene.objects.filter(child=scene_id).values_list('parent', flat=True).first()
+  return
+
 class FailedLogin(models.Model):
   ip = models.GenericIPAddressField(null=True)
   delay = models.FloatField(default=0.0)
@@ -144,6 +157,7 @@ class Scene(models.Model):
   regulated_rate = models.FloatField("Regulate Rate (Hz)", default=30, blank=True, validators=[MinValueValidator(0.001)])
   external_update_rate = models.FloatField("Max External Update Rate (Hz)", default=30, blank=True, validators=[MinValueValidator(0.001)])
   inlier_threshold = models.FloatField("Feature Match Confidence Threshold", default=0.5, blank=True, validators=[MinValueValidator(0.0)])
+  updated = models.DateTimeField("Last Updated at", auto_now=True)
 
   def __str__(self):
     return self.name
@@ -265,11 +279,15 @@ class Scene(models.Model):
         super().save(*args, **kwargs)
     except FileNotFoundError as e:
       log.error(f"Failed to save scene , {str(e)}")
+    touchScene(updated_scene)
     transaction.on_commit(partial(sendUpdateCommand, scene_id = updated_scene))
     return
 
   def delete(self, *args, **kwargs):
+    parents = list(ChildScene.objects.filter(child=self).values_list('parent', flat=True))
     super(Scene, self).delete(*args, **kwargs)
+    for parent in parents:
+      touchScene(parent)
     transaction.on_commit(sendUpdateCommand)
     if self.map:
       storage, path = self.map.storage, self.map.path
@@ -509,11 +527,15 @@ class ChildScene(models.Model):
 
   def save(self, *args, **kwargs):
     super().save(*args, **kwargs)
+    touchScene(self.parent_id)
+    touchScene(self.child_id)
     transaction.on_commit(sendUpdateCommand)
     return
 
   def delete(self, *args, **kwargs):
     super().delete(*args, **kwargs)
+    touchScene(self.parent_id)
+    touchScene(self.child_id)
     transaction.on_commit(sendUpdateCommand)
     return
 
@@ -559,6 +581,7 @@ class Sensor(models.Model):
     super().__init__(*args, **kwargs)
     self._original_sensor_id = self.sensor_id
     self._original_name = self.name
+    self._original_scene_id = self.scene_id
 
   def calibrateString(self):
     return "calibrate-" + self.type
@@ -578,8 +601,16 @@ class Sensor(models.Model):
 
     return json.dumps(rdict)
 
+  def touchScenes(self):
+    touchScene(self.scene_id)
+    if self._original_scene_id != self.scene_id:
+      touchScene(self._original_scene_id)
+      self._original_scene_id = self.scene_id
+    return
+
   def save(self, *args, **kwargs):
     super().save(*args, **kwargs)
+    self.touchScenes()
     transaction.on_commit(sendUpdateCommand)
     return
 
@@ -596,6 +627,7 @@ class Sensor(models.Model):
       storage.delete(path)
     else:
       super().delete(*args, **kwargs)
+    self.touchScenes()
     return
 
 class Cam(Sensor):
@@ -773,6 +805,7 @@ class SingletonSensor(Sensor):
                                     default='environmental')
 
   def notifydbupdate(self):
+    self.touchScenes()
     transaction.on_commit(sendUpdateCommand)
     return
 
@@ -878,6 +911,7 @@ class BoundingBox(models.Model):
     return True
 
   def notifydbupdate(self):
+    touchScene(getattr(self, 'scene_id', None))
     transaction.on_commit(sendUpdateCommand)
     return
 
@@ -493,6 +493,7 @@ class SceneSerializer(NonNullSerializer):
   mesh_scale = serializers.SerializerMethodField('get_scale')
   children = serializers.SerializerMethodField('get_children')
   map_processed = serializers.DateTimeField(format=f"{DATETIME_FORMAT}Z")
+  updated = serializers.DateTimeField(format=f"{DATETIME_FORMAT}Z", read_only=True)
 
   def get_uid(self, obj):
     return obj.id
@@ -619,7 +620,7 @@ class SceneSerializer(NonNullSerializer):
               'mesh_scale', 'scale', 'children', 'regulated_rate', 'external_update_rate',
               'camera_calibration', 'apriltag_size', 'map_processed', 'polycam_data',
               'number_of_localizations', 'global_feature', 'local_feature', 'matcher',
-              'minimum_number_of_matches', 'inlier_threshold']
+              'minimum_number_of_matches', 'inlier_threshold', 'updated']
 
 class PubSubACLSerializer(NonNullSerializer):
   class Meta:
@@ -132,6 +132,7 @@ urlpatterns += [
   re_path(r'api/v1/(asset)$', views.ManageThing.as_view()),
   re_path(r'api/v1/(asset)/([^/]+)$', views.ManageThing.as_view()),
   re_path(r'api/v1/scenes/(child)$', views.ListThings.as_view()),
+  re_path(r'api/v1/scenes/updates$', views.SceneUpdates.as_view()),
   re_path(r'api/v1/(child)$', views.ManageThing.as_view()),
   re_path(r'api/v1/(child)/([^/]+)$', views.ManageThing.as_view()),
   re_path(r'api/v1/(calibrationmarkers)$', views.ListThings.as_view()),
@@ -31,6 +31,8 @@ from django.dispatch.dispatcher import receiver
 from django.http import FileResponse, HttpResponse, HttpResponseNotFound, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.views.generic import DetailView, ListView, TemplateView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
@@ -809,6 +811,33 @@ class ManageThing(APIView):
     log.info("DELETED", thing_type, data)
     return Response(data, status=status.HTTP_200_OK)
 
+class SceneUpdates(APIView):
+  """
+  Lists the version of every scene and the scenes updated since a timestamp,
+  so that clients only need to fetch the scenes that changed.
+  """
+  authentication_classes = [authentication.TokenAuthentication]
+  permission_classes = [permissions.IsAuthenticated]
+
+  def get(self, request):
+    # Taken before the query so that scenes saved during it are listed again next time
+    timestamp = timezone.now()
+    since = request.query_params.get('since', None)
+    queryset = Scene.objects.all()
+    if since:
+      since_time = parse_datetime(since)
+      if since_time is None:
+        raise ValidationError({'since': "Invalid timestamp"})
+      queryset = queryset.filter(updated__gte=since_time)
+
+    updated_field = SceneSerializer().fields['updated']
+    versions = {str(uid): updated_field.to_representation(updated)
+                for uid, updated in Scene.objects.values_list('id', 'updated')}
+    results = SceneSerializer(queryset, many=True, context={'request': request}).data
+    return Response({'timestamp': updated_field.to_representation(timestamp),
+                     'versions': versions,
+                     'results': results})
+
 class CustomAuthToken(ObtainAuthToken):
   serializer_class = CustomAuthTokenSerializer
 
@@ -13,13 +13,11 @@ import numpy as np
 import random
 from tests.functional import FunctionalTest
 from scene_common import log
-from controller.vdms_adapter import VDMSDatabase, vdms
+from controller.vdms_adapter import VDMSDatabase
 
 class BackendFunctionalTest(FunctionalTest):
   def vdms_connect(self, use_tls=True):
-    self.vdb = VDMSDatabase()
-    if not use_tls:
-      self.vdb.db = vdms.vdms(use_tls=False)
+    self.vdb = VDMSDatabase(use_tls=use_tls)
     self.vdb.connect()
     return
 
@@ -59,5 +57,5 @@ class BackendFunctionalTest(FunctionalTest):
     }]
 
     query = find * len(reid_vectors)
-    response, res_arr = self.vdb.db.query(query, blob)
+    response, res_arr = self.vdb.clients[0].query(query, blob)
     return (response, res_arr)
@@ -37,7 +37,7 @@ class VDMSSimilaritySearch(BackendFunctionalTest):
     all_queries = []
     all_queries.append(descriptor_set)
 
-    response, res_arr = self.vdb.db.query(all_queries)
+    response, res_arr = self.vdb.clients[0].query(all_queries)
     log.debug(f"RESPONSE: {response}\nRES_ARR: {res_arr}")
     assert response[0]['AddDescriptorSet']['status'] == 0, "The response status for the descriptor set should be 0!"
     return
@@ -69,7 +69,7 @@ class VDMSSimilaritySearch(BackendFunctionalTest):
     all_queries.append(descriptor_1)
     all_queries.append(descriptor_2)
 
-    response, res_arr = self.vdb.db.query(all_queries, [descriptor_blob])
+    response, res_arr = self.vdb.clients[0].query(all_queries, [descriptor_blob])
 
     log.debug(f"RESPONSE: {response}\nRES_ARR: {res_arr}")
     assert response[0]['AddDescriptor']['status'] == 0 and response[1]['AddDescriptor']['status'] == 0, \
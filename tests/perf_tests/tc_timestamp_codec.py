@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import time
+from datetime import datetime
+
+from pytz import timezone
+
+from scene_common import log
+from scene_common.timestamp import DATETIME_FORMAT, get_epoch_time, get_iso_time
+
+# Camera messages of a 10 minute stream at 30 fps
+START_TIME = 1700000000.0
+FRAME_INTERVAL = 1 / 30
+MESSAGES = 30 * 600
+REPEAT = 3
+MIN_SPEEDUP = 5.0
+
+def legacy_get_iso_time(timestamp):
+  utc_time = datetime.fromtimestamp(timestamp, tz=timezone("UTC"))
+  return f"{utc_time.strftime(DATETIME_FORMAT)[:-3]}Z"
+
+def legacy_get_epoch_time(timestamp):
+  utc_time = datetime.strptime(timestamp, f"{DATETIME_FORMAT}Z")
+  return utc_time.replace(tzinfo=timezone("UTC")).timestamp()
+
+def timeCalls(function, values):
+  best = None
+  for _ in range(REPEAT):
+    start = time.perf_counter()
+    for value in values:
+      function(value)
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+  return best / len(values)
+
+def compare(name, legacy, fast, values):
+  for value in values:
+    assert legacy(value) == fast(value), value
+  legacy_time = timeCalls(legacy, values)
+  fast_time = timeCalls(fast, values)
+  speedup = legacy_time / fast_time
+  log.log("{}: legacy {:6.2f} us fast {:6.2f} us speedup {:5.1f}x".format(
+    name, legacy_time * 1e6, fast_time * 1e6, speedup))
+  return speedup
+
+def test():
+  epochs = [START_TIME + idx * FRAME_INTERVAL for idx in range(MESSAGES)]
+  iso_times = [legacy_get_iso_time(epoch) for epoch in epochs]
+
+  speedups = [compare("get_iso_time", legacy_get_iso_time, get_iso_time, epochs),
+              compare("get_epoch_time", legacy_get_epoch_time, get_epoch_time, iso_times)]
+  assert min(speedups) >= MIN_SPEEDUP
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2024 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import time
+
+import numpy as np
+
+from controller.ilabs_tracking import IntelLabsTracking
+from controller.moving_object import MovingObject
+from controller.tracking import (MAX_UNRELIABLE_TIME,
+                                 NON_MEASUREMENT_TIME_DYNAMIC,
+                                 NON_MEASUREMENT_TIME_STATIC)
+from scene_common import log
+
+OBJECT_COUNTS = [500, 1000, 2000, 5000]
+STEPS = 3
+# Allowed growth of the per object time between the smallest and largest count
+MAX_PER_OBJECT_GROWTH = 3.0
+
+def createObjects(count, when):
+  objects = []
+  for idx in range(count):
+    mobj = MovingObject({'id': idx, 'category': 'person',
+                         'translation': [idx * 0.1, idx * 0.2, 0.0]}, when, None)
+    mobj.sceneLoc
+    objects.append(mobj)
+  return objects
+
+def createTracks(objects):
+  """Create reliable track arrays as returned by MultipleObjectTracker.track_arrays()"""
+  track_ids = np.arange(len(objects), dtype=np.int32)
+  states = np.zeros((len(objects), 8))
+  for idx, obj in enumerate(objects):
+    states[idx, :5] = (obj.sceneLoc.x, obj.sceneLoc.y, 0.0, 0.1, 0.1)
+  measurement_indices = np.arange(len(objects), dtype=np.int64)
+  return track_ids, states, measurement_indices
+
+def timeTrackingStep(tracker, count):
+  """Time the python side of trackCategory for count objects over several steps"""
+  tracker._objects = []
+  tracker.already_tracked_objects = []
+  elapsed = 0
+  for step in range(STEPS):
+    when = float(step)
+    objects = createObjects(count, when)
+    already_tracked = createObjects(count, when)
+    tracks = createTracks(objects)
+
+    start = time.perf_counter()
+    tracker.rv_measurements(objects)
+    tracks_from_detections = tracker.tracksFromDetections(*tracks, objects)
+    tracker.already_tracked_objects = tracker.mergeAlreadyTrackedObjects(already_tracked)
+    tracker._objects = tracks_from_detections + tracker.already_tracked_objects
+    elapsed += time.perf_counter() - start
+  return elapsed / STEPS
+
+def test():
+  tracker = IntelLabsTracking(MAX_UNRELIABLE_TIME, NON_MEASUREMENT_TIME_DYNAMIC,
+                              NON_MEASUREMENT_TIME_STATIC)
+  tracker.uuid_manager.reid_enabled = False
+
+  per_object = []
+  for count in OBJECT_COUNTS:
+    elapsed = timeTrackingStep(tracker, count)
+    per_object.append(elapsed / count)
+    log.log("Objects: {:5d} step: {:8.2f} ms per object: {:6.2f} us".format(
+      count, elapsed * 1000, elapsed / count * 1e6))
+
+  growth = per_object[-1] / per_object[0]
+  log.log("Per object time growth {} to {} objects: {:.2f}x".format(
+    OBJECT_COUNTS[0], OBJECT_COUNTS[-1], growth))
+  assert growth < MAX_PER_OBJECT_GROWTH
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from controller.uuid_manager import UUIDManager
+from scene_common import log
+
+TRACK_COUNTS = [1000, 2000, 5000]
+FRAMES = 20
+# Fraction of the tracks leaving and entering the scene every frame
+TURNOVER = 0.05
+QUERY_THREADS = 4
+# Seconds a similarity query waits for the database
+QUERY_TIME = 0.0005
+DATABASE_IDS = 20000
+# Allowed growth of the per track time between the smallest and largest count
+MAX_PER_TRACK_GROWTH = 3.0
+
+def createTrack(manager, rv_id):
+  manager.quality_features[rv_id] = manager._newFeatureBuffer()
+  return SimpleNamespace(rv_id=rv_id, gid=f"gid{rv_id}", category="person",
+                         reidVector=None, similarity=None)
+
+def runQueries(manager, tracks, stop):
+  """Complete one similarity query per track like the query pool of a UUIDManager"""
+  rng = random.Random(threading.get_ident())
+  token = object()
+  while not stop.is_set():
+    sscape_object = rng.choice(tracks)
+    if manager.active_query.setdefault(sscape_object.rv_id, token) is not token:
+      continue
+    time.sleep(QUERY_TIME)
+    database_id = f"db{rng.randrange(DATABASE_IDS)}"
+    with manager.active_ids.lock:
+      if sscape_object.rv_id in manager.active_ids:
+        manager.updateActiveDict(sscape_object, database_id, 1.0)
+  return
+
+def checkConsistency(manager):
+  active_ids = manager.active_ids
+  for database_id, track_ids in active_ids.reverse.items():
+    assert len(track_ids) == 1, database_id
+    for track_id in track_ids:
+      assert active_ids.get(track_id)[0] == database_id
+  assigned = sum(1 for entry in active_ids.forward.values() if entry[0] is not None)
+  assert assigned == len(active_ids.reverse)
+  return
+
+def timeFrames(count):
+  """Time assignID of every track and pruning per frame while queries complete"""
+  manager = UUIDManager("memory")
+  tracks = [createTrack(manager, rv_id) for rv_id in range(count)]
+  next_id = count
+  stop = threading.Event()
+  for sscape_object in tracks:
+    manager.active_ids.add(sscape_object.rv_id)
+  threads = [threading.Thread(target=runQueries, args=(manager, tracks, stop))
+             for _ in range(QUERY_THREADS)]
+  for thread in threads:
+    thread.start()
+
+  elapsed = 0
+  try:
+    for _ in range(FRAMES):
+      leaving = int(count * TURNOVER)
+      for idx in range(leaving):
+        tracks[idx] = createTrack(manager, next_id)
+        next_id += 1
+      random.shuffle(tracks)
+
+      start = time.perf_counter()
+      for sscape_object in tracks:
+        manager.assignID(sscape_object)
+      manager.pruneInactiveTracks([sscape_object.rv_id for sscape_object in tracks])
+      elapsed += time.perf_counter() - start
+  finally:
+    stop.set()
+    for thread in threads:
+      thread.join()
+
+  assert len(manager.active_ids) == count
+  checkConsistency(manager)
+  return elapsed / FRAMES
+
+def test():
+  per_track = []
+  for count in TRACK_COUNTS:
+    elapsed = timeFrames(count)
+    per_track.append(elapsed / count)
+    log.log("Tracks: {:5d} frame: {:8.2f} ms per track: {:6.2f} us".format(
+      count, elapsed * 1000, elapsed / count * 1e6))
+
+  growth = per_track[-1] / per_track[0]
+  log.log("Per track time growth {} to {} tracks: {:.2f}x".format(
+    TRACK_COUNTS[0], TRACK_COUNTS[-1], growth))
+  assert growth < MAX_PER_TRACK_GROWTH
+  return 0
+
+if __name__ == '__main__':
+  exit(test() or 0)
@@ -176,3 +176,20 @@ def test_inclination(line3d):
   assert line3d.inclination == expected_output
 
   return
+
+def test_intersections(line2d, line3d):
+  """! Verifies 'geometry.Line.intersections()' matches 'intersection()'. """
+
+  lines = [geometry.Line(geometry.Point(3., 5.), geometry.Point(5., 7.)),
+           geometry.Line(geometry.Point(1., 3.), geometry.Point(2., 3.)),
+           geometry.Line(geometry.Point(-1., 4.), geometry.Point(6., -2.))]
+  found, points = line2d.intersections(np.array([(l.x1, l.y1, l.x2, l.y2) for l in lines]))
+  for idx, line in enumerate(lines):
+    expected_found, expected_point = line2d.intersection(line)
+    assert found[idx] == expected_found
+    assert points[idx] == pytest.approx(expected_point)
+
+  with pytest.raises(ValueError, match="Cannot mix 2D and 3D lines"):
+    line3d.intersections(np.zeros((1, 4)))
+
+  return
@@ -9,6 +9,7 @@
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
 
+import numpy as np
 import pytest
 
 from scene_common import geometry
@@ -107,3 +108,15 @@ def test_offset(rectangle):
 
   assert repr(rectangle.offset(point)) == repr(expected_result)
   return
+
+def test_pointsWithin(rectangle):
+  """! Verifies 'geometry.Rectangle.pointsWithin()' matches 'isPointWithin()'. """
+
+  points = np.array([(x / 2, y / 2) for x in range(-4, 16) for y in range(-4, 16)])
+  expected = [rectangle.isPointWithin(geometry.Point(x, y)) for x, y in points]
+  assert rectangle.pointsWithin(points).tolist() == expected
+
+  with pytest.raises(ValueError):
+    rectangle.pointsWithin(np.zeros(3))
+
+  return
@@ -9,6 +9,7 @@
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
 
+import numpy as np
 import pytest
 
 from scene_common import geometry
@@ -86,3 +87,54 @@ def test_repr(region_poly):
   assert expected_result in repr(region_poly)
 
   return
+
+def test_region_index_membership():
+  """! Verifies 'geometry.RegionIndex.membership()' matches per region checks. """
+
+  regions = {
+    'poly': geometry.Region("poly", "poly", [[2, 1], [5, 1], [5, 4], [2, 4]]),
+    'circle': geometry.Region("circle", "circle", {"area": "circle", "center": [5, 5], "radius": 2}),
+    'scene': geometry.Region("scene", "scene", {"area": "scene"}),
+    'far': geometry.Region("far", "far", [[50, 50], [60, 50], [60, 60]]),
+  }
+  index = geometry.RegionIndex()
+  assert index.update(regions)
+  assert not index.update(regions)
+
+  points = [geometry.Point(x / 2, y / 2) for x in range(-2, 130, 3) for y in range(-2, 130, 5)]
+  membership = index.membership(regions, points)
+  for key, region in regions.items():
+    expected = [idx for idx, pt in enumerate(points) if region.isPointWithin(pt)]
+    assert membership.get(key, []) == expected
+
+  return
+
+def test_region_index_unindexed_region():
+  """! Verifies regions missing from the index are still tested. """
+
+  regions = {'poly': geometry.Region("poly", "poly", [[2, 1], [5, 1], [5, 4], [2, 4]])}
+  index = geometry.RegionIndex()
+  index.update(regions)
+  regions['late'] = geometry.Region("late", "late", [[20, 20], [25, 20], [25, 25]])
+
+  membership = index.membership(regions, [geometry.Point(3, 3), geometry.Point(24, 21)])
+  assert membership == {'poly': [0], 'late': [1]}
+  assert index.candidates(regions, 24, 21) == {'late'}
+
+  return
+
+@pytest.mark.parametrize("info",
+                [([[2, 1], [5, 1], [5, 4], [2, 4]]),
+                ({"area": "circle", "center": [5, 5], "radius": 2}),
+                ({"area": "scene"})])
+
+def test_region_points_within(info):
+  """! Verifies 'geometry.Region.pointsWithin()' matches 'isPointWithin()'. """
+
+  region = geometry.Region("batch", "batch", info)
+  points = np.array([(x / 2, y / 2) for x in range(-2, 20) for y in range(-2, 20)])
+  expected = [region.isPointWithin(geometry.Point(x, y)) for x, y in points]
+  assert region.pointsWithin(points).tolist() == expected
+  assert region.pointsWithin(np.empty((0, 2))).shape == (0,)
+
+  return
@@ -0,0 +1,57 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+from types import SimpleNamespace
+
+from controller.active_ids import ActiveIDs
+from controller.uuid_manager import UUIDManager
+
+def test_forward_and_reverse_maps():
+  """! Verifies assigning and pruning tracks keeps both maps consistent. """
+
+  active_ids = ActiveIDs()
+  for track_id in range(4):
+    active_ids.add(track_id)
+  active_ids.assign(0, "db0", 10.0)
+  active_ids.assign(1, "db1")
+  active_ids.add(0)
+  assert active_ids.get(0) == ("db0", 10.0) and active_ids.get(2) == (None, None)
+  assert active_ids.isAssigned("db0") and not active_ids.isAssigned(None)
+
+  active_ids.assign(0, "db2", 5.0)
+  assert not active_ids.isAssigned("db0") and active_ids.isAssigned("db2")
+
+  removed = active_ids.prune([0, 3])
+  assert sorted(removed) == [(1, ("db1", None)), (2, (None, None))]
+  assert len(active_ids) == 2 and 1 not in active_ids
+  assert active_ids.reverse == {"db2": {0}}
+  return
+
+def test_query_keeps_database_ids_unique(monkeypatch):
+  """! Verifies a database ID matched by two tracks is only given to the first one. """
+
+  manager = UUIDManager("memory")
+  monkeypatch.setattr(manager, 'sendSimilarityQuery', lambda sscape_object: None)
+  monkeypatch.setattr(manager, 'parseQueryResults', lambda scores: ("known", 20.0))
+  for rv_id in (1, 2):
+    manager.active_ids.add(rv_id)
+    manager.quality_features[rv_id] = manager._newFeatureBuffer()
+    manager.querySimilarity(SimpleNamespace(rv_id=rv_id, gid=f"gid{rv_id}", category="person"))
+
+  assert manager.active_ids.get(1) == ("known", 20.0)
+  assert manager.active_ids.get(2) == ("gid2", None)
+  assert not manager.isNewID("known")
+
+  manager.pruneInactiveTracks([2])
+  assert manager.isNewID("known") and manager.unique_id_count == 0
+  manager.pruneInactiveTracks([])
+  assert manager.unique_id_count == 1 and len(manager.active_ids) == 0
+  return
@@ -0,0 +1,162 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import time
+
+import pytest
+
+from controller import cache_manager
+from controller.cache_manager import CacheManager
+from scene_common.rest_client import RESTResult
+
+class FakeREST:
+  """Scene updates endpoint where versions and timestamps are a save counter"""
+
+  def __init__(self, url, rootcert=None, auth=None):
+    self.scenes = {}
+    self.children = {}
+    self.clock = 0
+    self.uncommitted = set()
+    self.served = []
+    self.child_requests = []
+    return
+
+  def save(self, uid, cameras=(), children=()):
+    self.clock += 1
+    self.scenes[uid] = {
+      'uid': uid, 'name': uid, 'updated': str(self.clock),
+      'cameras': [{'uid': camera, 'resolution': [640, 480], 'intrinsics': 70,
+                   'camera points': [[278, 61], [621, 132], [559, 460], [66, 289]],
+                   'map points': [[1.0, 1.05], [3.04, 1.08], [3.05, 4.01], [1.0, 3.98]]}
+                  for camera in cameras],
+      'children': [{'name': child} for child in children],
+    }
+    self.children[uid] = [{'child': child, 'child_type': 'local', 'retrack': True}
+                          for child in children]
+    return
+
+  def _result(self, data):
+    result = RESTResult(200)
+    result.update(data)
+    return result
+
+  def getSceneUpdates(self, since):
+    committed = [scene for uid, scene in self.scenes.items() if uid not in self.uncommitted]
+    results = [scene for scene in committed if int(scene['updated']) >= int(since or 0)]
+    self.served.append([scene['uid'] for scene in results])
+    return self._result({'timestamp': str(self.clock),
+                         'versions': {scene['uid']: scene['updated'] for scene in committed},
+                         'results': results})
+
+  def getScene(self, uid):
+    self.served.append([uid])
+    return self._result(self.scenes[uid])
+
+  def getChildScene(self, filter):
+    self.child_requests.append(filter['parent'])
+    return self._result({'results': self.children.get(filter['parent'], [])})
+
+@pytest.fixture()
+def manager(monkeypatch):
+  monkeypatch.setattr(cache_manager, 'RESTClient', FakeREST)
+  manager = CacheManager("https://web.scenescape.intel.com/api/v1", None, None, {})
+  yield manager
+  manager.stop()
+
+def test_refresh_fetches_changed_scenes(manager):
+  """! Verifies a refresh only fetches and updates the scenes that changed. """
+
+  rest = manager.rest
+  rest.save('scene1', cameras=['camera1'])
+  rest.save('scene2', cameras=['camera2'])
+  rest.save('scene3')
+
+  scene1 = manager.sceneWithCameraID('camera1')
+  scene2 = manager.sceneWithCameraID('camera2')
+  assert scene1.uid == 'scene1' and scene2.uid == 'scene2'
+  assert rest.served == [['scene1', 'scene2', 'scene3']]
+
+  rest.save('scene2', cameras=['camera2', 'camera4'])
+  del rest.scenes['scene3']
+  manager.invalidate()
+
+  assert manager.sceneWithCameraID('camera4') is scene2
+  assert manager.sceneWithCameraID('camera1') is scene1
+  assert rest.served[1] == ['scene2']
+  assert sorted(scene.uid for scene in manager.allScenes()) == ['scene1', 'scene2']
+
+  manager.invalidate()
+  manager.allScenes()
+  assert rest.served[2] == ['scene2']
+  assert len(rest.served) == 3
+  return
+
+def test_refresh_fetches_late_commits(manager):
+  """! Verifies a scene saved before the previous fetch but committed after it is fetched. """
+
+  rest = manager.rest
+  rest.save('scene1', cameras=['camera1'])
+  rest.save('scene2')
+  rest.uncommitted.add('scene2')
+  rest.save('scene3')
+  assert manager.sceneWithID('scene2') is None
+
+  rest.uncommitted.clear()
+  manager.invalidate()
+  assert manager.sceneWithID('scene2').uid == 'scene2'
+  assert rest.served[1:] == [['scene3'], ['scene2']]
+  return
+
+def test_child_scenes_fetched_with_scene(manager):
+  """! Verifies child scenes are fetched again only after their parent changed. """
+
+  rest = manager.rest
+  rest.save('child')
+  rest.save('parent', children=['child'])
+
+  for scene in manager.allScenes():
+    manager.getChildScenes(scene.uid)
+  assert manager.getChildScenes('parent')['results'][0]['child'] == 'child'
+  assert rest.child_requests == ['parent']
+
+  rest.save('child')
+  manager.invalidate()
+  manager.getChildScenes('parent')
+  assert rest.child_requests == ['parent']
+
+  rest.save('parent')
+  manager.invalidate()
+  manager.allScenes()
+  assert manager.getChildScenes('parent')['results'] == []
+  assert rest.child_requests == ['parent']
+  return
+
+def test_background_refresh(manager):
+  """! Verifies invalidate() fetches in the background and lookups swap in the new maps. """
+
+  rest = manager.rest
+  rest.save('scene1', cameras=['camera1'])
+  scene1 = manager.sceneWithCameraID('camera1')
+  maps = manager._cached_scenes_by_cameraID
+
+  manager.start()
+  rest.save('scene1', cameras=['camera2'])
+  manager.invalidate()
+  deadline = time.monotonic() + 5
+  while manager.changes is None and time.monotonic() < deadline:
+    time.sleep(0.01)
+  assert manager.changes is not None
+  assert manager._cached_scenes_by_cameraID is maps
+
+  assert manager.sceneWithCameraID('camera2') is scene1
+  assert manager.sceneWithCameraID('camera1') is None
+  assert maps == {'camera1': scene1}
+  return
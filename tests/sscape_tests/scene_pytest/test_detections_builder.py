@@ -0,0 +1,115 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from controller import detections_builder
+from controller.detections_builder import (DetectionsCache,
+                                           buildDetectionsList,
+                                           computeCameraBoundsForObjects,
+                                           prepareObjDict)
+from controller.moving_object import ChainData, MovingObject
+from controller.scene import TripwireEvent
+from scene_common.codec import decode, getCodec
+from scene_common.geometry import Point, Size
+from scene_common.transform import CameraIntrinsics, CameraPose
+
+def createObject(gid, when):
+  obj = MovingObject({'id': gid, 'category': 'person', 'confidence': 0.9,
+                      'translation': [gid, 2.0, 0.0]}, when, None)
+  obj.gid = str(gid)
+  obj.chain_data = ChainData(regions={'region1': {'entered': when}}, sensors={})
+  return obj
+
+def test_prepare_obj_dict_keeps_info():
+  """! Verifies 'prepareObjDict()' does not modify the detection info of the object. """
+
+  obj = createObject(1, 10.0)
+  info = dict(obj.info)
+  obj_dict = prepareObjDict(None, obj, False)
+  assert obj.info == info
+  assert obj_dict['id'] == '1'
+  assert obj_dict['translation'] == [1.0, 2.0, 0.0]
+  assert obj_dict['regions'] == {'region1': {'entered': '1970-01-01T00:00:10.000Z'}}
+  assert obj.chain_data.regions == {'region1': {'entered': 10.0}}
+  return
+
+def test_cache_builds_each_object_once(monkeypatch):
+  """! Verifies the frame cache builds and encodes each object only once. """
+
+  calls = []
+  def countingPrepare(scene, obj, update_visibility):
+    calls.append(obj.gid)
+    return prepareObjDict(scene, obj, update_visibility)
+  monkeypatch.setattr(detections_builder, 'prepareObjDict', countingPrepare)
+
+  objects = [createObject(gid, 10.0) for gid in range(3)]
+  cache = DetectionsCache(None, 10.0)
+  codec = getCodec('json')
+  scene_list = buildDetectionsList(objects, None, cache=cache)
+  region_list = buildDetectionsList(objects[:2], None, cache=cache)
+  fragments = [cache.fragment(obj, codec) for obj in objects]
+  fragments += [cache.fragment(obj, codec) for obj in objects[:2]]
+
+  assert calls == ['0', '1', '2']
+  assert region_list == scene_list[:2]
+  assert [json.loads(fragment) for fragment in fragments[:3]] == scene_list
+
+  payload = codec.encodeWithFragments({'id': 'scene', 'objects': None}, 'objects', fragments[:3])
+  assert decode(payload) == {'id': 'scene', 'objects': scene_list}
+  return
+
+def test_cache_tripwire_direction():
+  """! Verifies tripwire directions do not leak into the cached object. """
+
+  obj = createObject(1, 10.0)
+  cache = DetectionsCache(None, 10.0)
+  event_dict = cache.objectDict(TripwireEvent(obj, -1))
+  assert event_dict['direction'] == -1
+  assert 'direction' not in cache.objectDict(obj)
+  assert json.loads(cache.fragment(TripwireEvent(obj, 1), getCodec('json')))['direction'] == 1
+  return
+
+def createCamera(camera_id, map_points):
+  intrinsics = CameraIntrinsics([905, 905, 640, 360])
+  pose = CameraPose({'camera points': [[278, 61], [621, 132], [559, 460], [66, 289]],
+                     'map points': map_points, 'resolution': [1280, 720]}, intrinsics)
+  return SimpleNamespace(cameraID=camera_id, pose=pose)
+
+def test_camera_bounds_batch():
+  """! Verifies batched camera bounds match projecting each object separately. """
+
+  cameras = {
+    'camera1': createCamera('camera1', [[1.0, 1.05], [3.04, 1.08], [3.05, 4.01], [1.0, 3.98]]),
+    'camera2': createCamera('camera2', [[0.5, 0.5], [2.5, 0.6], [2.6, 3.5], [0.4, 3.4]]),
+  }
+  scene = SimpleNamespace(cameraWithID=cameras.get)
+  obj_dicts = [
+    {'visibility': ['camera2', 'missing', 'camera1'], 'translation': [1.5, 2.0, 0.0],
+     'bb_meters': {'width': 0.5, 'height': 1.8}},
+    {'visibility': ['camera1'], 'translation': [2.5, 3.0, 0.2],
+     'bb_meters': {'width': 0.6, 'height': 1.6}},
+    {'visibility': ['camera1'], 'translation': [2.0, 2.0, 0.0]},
+  ]
+  computeCameraBoundsForObjects(scene, [(None, obj_dict) for obj_dict in obj_dicts])
+
+  assert list(obj_dicts[0]['camera_bounds']) == ['camera2', 'camera1']
+  assert obj_dicts[2]['camera_bounds'] == {}
+  for obj_dict in obj_dicts[:2]:
+    for camera_id, bounds in obj_dict['camera_bounds'].items():
+      size = Size(obj_dict['bb_meters']['width'], obj_dict['bb_meters']['height'])
+      expected = cameras[camera_id].pose.projectEstimatedBoundsToCameraPixels(
+        Point(obj_dict['translation']), size).asDict
+      assert bounds == pytest.approx(expected)
+  return
@@ -0,0 +1,91 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import concurrent.futures
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from controller.feature_buffer import RESERVOIR, RING, FeatureBuffer
+from controller.uuid_manager import UUIDManager
+
+def test_ring_keeps_newest():
+  """! Verifies a ring buffer overwrites the oldest vectors and keeps the mean of all of them. """
+
+  buffer = FeatureBuffer(3, RING, keep_mean=True)
+  for idx in range(5):
+    assert buffer.add(np.full((1, 4), idx))
+  assert len(buffer) == 3 and buffer.seen == 5
+  assert sorted(buffer.snapshot()[:, 0].tolist()) == [2.0, 3.0, 4.0]
+  assert buffer.meanVector().tolist() == pytest.approx([2.0] * 4)
+  assert buffer.nbytes == 3 * 4 * 4 + 4 * 4
+  assert not buffer.add(np.zeros(8))
+  return
+
+def test_reservoir_is_bounded():
+  """! Verifies a reservoir buffer never grows and samples the whole track. """
+
+  buffer = FeatureBuffer(8, RESERVOIR)
+  assert buffer.snapshot().shape == (0, 0) and buffer.nbytes == 0
+  for idx in range(1000):
+    buffer.add([idx, idx])
+  vectors = buffer.snapshot()
+  assert vectors.shape == (8, 2) and buffer.nbytes == 8 * 2 * 4
+  assert vectors[:, 0].max() > 8
+  assert buffer.meanVector() is None
+  with pytest.raises(ValueError):
+    FeatureBuffer(8, "newest")
+  return
+
+def test_uuid_manager_feature_capacity(monkeypatch):
+  """! Verifies the tracks of a UUIDManager keep bounded features and query with their mean. """
+
+  monkeypatch.setattr(UUIDManager, 'feature_capacity', UUIDManager.feature_capacity)
+  monkeypatch.setattr(UUIDManager, 'feature_sampling', UUIDManager.feature_sampling)
+  monkeypatch.setattr(UUIDManager, 'query_mean', UUIDManager.query_mean)
+  UUIDManager.configureFeatures(capacity=4, sampling=RING, query_mean=True)
+  with pytest.raises(ValueError):
+    UUIDManager.configureFeatures(sampling="newest")
+
+  manager = UUIDManager("memory")
+  bbox = SimpleNamespace(area=10000)
+  for idx in range(10):
+    sscape_object = SimpleNamespace(rv_id=1, reidVector=np.full((1, 256), idx),
+                                    boundingBoxPixels=bbox)
+    manager.gatherQualityVisualFeatures(sscape_object)
+  assert manager.haveSufficientVisualFeatures(sscape_object, 10)
+  assert len(manager.quality_features[1]) == 4
+  assert manager.featureMemoryUsage() == 4 * 256 * 4 + 256 * 4
+
+  queries = []
+  def processBatch(entries, batch_queries, set_name, k_neighbors):
+    queries.extend(vectors for _, vectors in batch_queries)
+    return [[] for _ in batch_queries]
+  monkeypatch.setattr(manager.reid_database, 'processBatch', processBatch)
+  sscape_object.category = "person"
+  manager.sendSimilarityQuery(sscape_object)
+  assert len(queries[0]) == 1 and queries[0][0][0] == pytest.approx(4.5)
+  return
+
+def test_similarity_query_timeout(monkeypatch):
+  """! Verifies a similarity query that does not finish in time finds no match. """
+
+  manager = UUIDManager("memory")
+  manager.quality_features[1] = manager._newFeatureBuffer()
+  manager.quality_features[1].add(np.ones((1, 256)))
+  pending = concurrent.futures.Future()
+  monkeypatch.setattr(manager.batcher, 'findSimilarityScores',
+                      lambda object_type, reid_vectors: pending)
+  sscape_object = SimpleNamespace(rv_id=1, category="person")
+  assert manager.sendSimilarityQuery(sscape_object, timeout=0.01) is None
+  assert manager.reid_enabled
+  return
@@ -0,0 +1,106 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+from controller.location_history import LocationHistory
+from controller.moving_object import LOCATION_LIMIT, ChainData, MovingObject
+from controller.tracking import Tracking
+from scene_common.geometry import Point
+
+def createObject(idx, bounding_box=None):
+  info = {'id': 1, 'category': 'person', 'translation': [idx, 2.0 * idx, 0.0]}
+  if bounding_box is not None:
+    info['bounding_box'] = bounding_box
+  mobj = MovingObject(info, 10.0 + idx, None)
+  mobj.sceneLoc
+  return mobj
+
+def createTrack(history, count):
+  objects = [createObject(0)]
+  objects[0].setGID("track", history)
+  for idx in range(1, count):
+    mobj = createObject(idx, {'x': idx, 'y': 1, 'width': 2, 'height': 3})
+    mobj.setPrevious(objects[-1])
+    objects.append(mobj)
+  return objects
+
+def test_track_history():
+  """! Verifies objects of a track read the newest locations of the track newest first. """
+
+  history = LocationHistory(LOCATION_LIMIT, 2)
+  objects = createTrack(history, LOCATION_LIMIT + 5)
+  newest = objects[-1]
+  assert len(newest.location) == LOCATION_LIMIT and newest.frameCount == LOCATION_LIMIT + 5
+  assert [loc.point.x for loc in newest.location] == \
+    [float(idx) for idx in range(LOCATION_LIMIT + 4, 4, -1)]
+  assert newest.location[1].point.asNumpyCartesian.tolist() == \
+    objects[-2].sceneLoc.asNumpyCartesian.tolist()
+  assert newest.location[1].when == objects[-2].when
+  assert newest.location[1].bounds.asDict == objects[-2].boundingBox.asDict
+  assert newest.location[-1].bounds.asDict == objects[5].boundingBox.asDict
+
+  # Only the locations still held by the ring buffer are visible to older objects
+  assert len(objects[-3].location) == LOCATION_LIMIT - 1
+  assert len(objects[2].location) == 1
+  assert objects[-3].location[1].point.x == objects[-4].sceneLoc.x
+  return
+
+def test_branch_and_slots():
+  """! Verifies a track continued from an older object copies its history and slots are reused. """
+
+  history = LocationHistory(4, 1)
+  objects = createTrack(history, 6)
+  branch = createObject(9)
+  branch.setPrevious(objects[3])
+  assert [loc.point.x for loc in branch.location] == [9.0, 3.0, 2.0, 1.0]
+  assert [loc.point.x for loc in objects[5].location][:2] == [5.0, 4.0]
+
+  second = createTrack(history, 2)
+  assert history.slots == 2
+  assert [loc.point.x for loc in second[-1].location] == [1.0, 0.0]
+  assert second[-1].location[1].bounds is None
+
+  locations = objects[5].location
+  assert locations[1].point.x == 4.0
+  objects[0].chain_data.release()
+  third = createTrack(history, 1)
+  assert history.slots == 2 and third[0].chain_data.slot == 0
+  assert len(third[0].location) == 1
+  # Objects of a released track no longer read the history of the slot
+  assert len(objects[5].location) == 1 and objects[5].chain_data.publishedSegment() is None
+  assert [loc.point.x for loc in locations] == [5.0, 4.0]
+  return
+
+def test_release_pruned_tracks():
+  """! Verifies a tracker frees the slots of the tracks missing from its new objects. """
+
+  history = LocationHistory(4, 2)
+  tracker = Tracking()
+  kept = createTrack(history, 2)
+  pruned = createTrack(history, 2)
+  slot = pruned[0].chain_data.slot
+  tracker.releasePrunedTracks(kept + pruned, kept[1:])
+  assert pruned[0].chain_data.slot is None and kept[0].chain_data.slot is not None
+  assert history.free == [slot]
+  return
+
+def test_published_locations():
+  """! Verifies published locations and the tripwire segment are read from the buffer. """
+
+  chain_data = ChainData()
+  assert chain_data.publishedSegment() is None
+  for idx in range(LOCATION_LIMIT + 2):
+    chain_data.addPublishedLocation(Point(idx, -idx, 0.0))
+  assert chain_data.publishedSegment() == (LOCATION_LIMIT + 1, -LOCATION_LIMIT - 1,
+                                           LOCATION_LIMIT, -LOCATION_LIMIT)
+  published = chain_data.publishedLocations
+  assert len(published) == LOCATION_LIMIT and published[0].x == LOCATION_LIMIT + 1
+  assert not hasattr(chain_data, '__dict__') and not hasattr(createObject(0), '__dict__')
+  return
@@ -0,0 +1,95 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+from types import SimpleNamespace
+
+import open3d as o3d
+import pytest
+
+from controller.moving_object import MovingObject
+from scene_common.geometry import Point
+from scene_common.options import TYPE_1, TYPE_2
+from scene_common.transform import CameraIntrinsics, CameraPose, MapRaycaster
+
+BOXES = [[278, 61, 40, 120], [621, 132, 55, 160], [559, 400, 80, 60], [66, 289, 20, 30]]
+
+def createCamera():
+  intrinsics = CameraIntrinsics([905, 905, 640, 360], [-0.2, 0.05, 0.001, 0.002, 0.0])
+  pose = CameraPose({'camera points': [[278, 61], [621, 132], [559, 460], [66, 289]],
+                     'map points': [[1.0, 1.05], [3.04, 1.08], [3.05, 4.01], [1.0, 3.98]],
+                     'resolution': [1280, 720]}, intrinsics)
+  return SimpleNamespace(cameraID='camera1', pose=pose)
+
+def createObjects(camera):
+  objects = []
+  for idx, box in enumerate(BOXES):
+    info = {'id': idx, 'category': 'person',
+            'bounding_box_px': dict(zip(('x', 'y', 'width', 'height'), box))}
+    if idx == 3:
+      info['size'] = [0.4, 0.8, 1.2]
+    mobj = MovingObject(info, 10.0, camera)
+    mobj.shift_type = TYPE_2 if idx % 2 else TYPE_1
+    objects.append(mobj)
+  return objects
+
+def test_map_detections_to_world():
+  """! Verifies mapping all detections at once matches mapping each object on access. """
+
+  camera = createCamera()
+  batched = createObjects(camera)
+  MovingObject.mapDetectionsToWorld(batched, camera)
+  assert all(mobj.location for mobj in batched)
+
+  for batch_obj, mobj in zip(batched, createObjects(camera)):
+    assert batch_obj.sceneLoc.asNumpyCartesian == pytest.approx(mobj.sceneLoc.asNumpyCartesian)
+    assert batch_obj.baseAngle == pytest.approx(mobj.baseAngle)
+    assert batch_obj.size == pytest.approx(mobj.size)
+    assert [batch_obj.bbMeters.x, batch_obj.bbMeters.width, batch_obj.bbMeters.height] \
+      == pytest.approx([mobj.bbMeters.x, mobj.bbMeters.width, mobj.bbMeters.height])
+    assert batch_obj.vectors[0].camera is camera
+  return
+
+def test_map_detections_skips_translation():
+  """! Verifies objects with a detected translation are left to map themselves. """
+
+  camera = createCamera()
+  mobj = MovingObject({'id': 1, 'category': 'person', 'translation': [0.1, 0.2, 3.0]},
+                      10.0, camera)
+  MovingObject.mapDetectionsToWorld([mobj], camera)
+  assert mobj.location is None
+  assert mobj.sceneLoc.asNumpyCartesian == pytest.approx(
+    camera.pose.cameraPointToWorldPoint(Point(0.1, 0.2, 3.0)).asNumpyCartesian)
+  return
+
+def test_map_detections_projected_to_map():
+  """! Verifies objects projected to the map are mapped as when each object maps itself. """
+
+  camera = createCamera()
+  floor = o3d.t.geometry.TriangleMesh.create_box(100.0, 100.0, 0.5)
+  raycaster = MapRaycaster.fromSceneMap(floor, [-50.0, -50.0, -0.5], [0.0, 0.0, 0.0])
+
+  def createProjected():
+    objects = []
+    for idx, translation in enumerate([[0.1, 0.2, 1.0], [-0.3, 0.1, 2.0], [0.0, -0.4, 1.5]]):
+      mobj = MovingObject({'id': idx, 'category': 'box', 'translation': translation,
+                           'rotation': [0.0, 0.0, 0.0, 1.0]}, 10.0, camera)
+      mobj.project_to_map = True
+      mobj.map_raycaster = raycaster
+      objects.append(mobj)
+    return objects
+
+  batched = createProjected()
+  MovingObject.mapDetectionsToWorld(batched, camera)
+  assert all(mobj.location for mobj in batched)
+  for batch_obj, mobj in zip(batched, createProjected()):
+    assert batch_obj.sceneLoc.asNumpyCartesian == pytest.approx(mobj.sceneLoc.asNumpyCartesian)
+    assert batch_obj.rotation == pytest.approx(mobj.rotation)
+  return
@@ -0,0 +1,121 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+from types import SimpleNamespace
+
+from controller import regulated_publisher
+from controller.regulated_publisher import RegulatedPublisher
+
+class FakePubSub:
+  def __init__(self):
+    self.published = []
+    return
+
+  def publishData(self, topic, data):
+    self.published.append((topic, data))
+    return
+
+class FakeCache:
+  def __init__(self):
+    self.dicts = {}
+    return
+
+  def objectDict(self, obj):
+    return self.dicts.setdefault(obj.gid, {'id': obj.gid, 'visibility': ['camera1']})
+
+def jdata(timestamp):
+  return {'timestamp': timestamp, 'id': 'scene1', 'name': 'Scene', 'rate': 10.0}
+
+def test_publishes_at_regulated_rate():
+  """! Verifies the regulated topic is published once per interval and only with new data. """
+
+  pubsub = FakePubSub()
+  publisher = RegulatedPublisher(pubsub, False)
+  scene = SimpleNamespace(uid='scene1', regulated_rate=10, cameras={'camera1': None})
+  objects = [SimpleNamespace(gid='a'), SimpleNamespace(gid='b')]
+
+  publisher.update(scene, objects, 'person', jdata('t1'), 'camera1', FakeCache(), 10.0)
+  assert publisher.publishDue(100.0) is None
+  assert len(pubsub.published) == 1
+  topic, data = pubsub.published[0]
+  assert topic == "scenescape/regulated/scene/scene1"
+  assert [obj['id'] for obj in data['objects']] == ['a', 'b']
+  assert data['rate'] == {'camera1': 10.0}
+
+  publisher.update(scene, objects[:1], 'person', jdata('t2'), 'camera1', FakeCache(), 10.0)
+  assert publisher.publishDue(100.05) == 100.1
+  assert len(pubsub.published) == 1
+  assert publisher.publishDue(100.1) is None
+  assert len(pubsub.published) == 2
+  assert pubsub.published[1][1]['timestamp'] == 't2'
+  assert [obj['id'] for obj in pubsub.published[1][1]['objects']] == ['a']
+
+  # Nothing new to publish
+  assert publisher.publishDue(100.5) is None
+  assert len(pubsub.published) == 2
+  return
+
+def test_camera_bounds_only_for_updated_objects(monkeypatch):
+  """! Verifies camera bounds are only projected for objects updated since the last emission. """
+
+  projected = []
+  batches = []
+  cameras = []
+  def fakeCameraBounds(scene, objects):
+    batches.append(len(objects))
+    cameras.append(scene.cameraWithID('camera1'))
+    for source, obj_dict in objects:
+      projected.append(source)
+      obj_dict['camera_bounds'] = {}
+    return
+  monkeypatch.setattr(regulated_publisher, 'computeCameraBoundsFromSources', fakeCameraBounds)
+  # Object fields are copied when the objects are updated
+  monkeypatch.setattr(regulated_publisher, 'cameraBoundsSource',
+                      lambda aobj, obj_dict: aobj.gid)
+
+  pubsub = FakePubSub()
+  publisher = RegulatedPublisher(pubsub, True)
+  scene = SimpleNamespace(uid='scene1', regulated_rate=1, cameras={'camera1': 'pose1'})
+  person = SimpleNamespace(gid='a')
+  vehicle = SimpleNamespace(gid='b')
+
+  publisher.update(scene, [person], 'person', jdata('t1'), None, FakeCache(), 10.0)
+  publisher.update(scene, [vehicle], 'vehicle', jdata('t1'), None, FakeCache(), 10.0)
+  # Cameras and objects changed after the update are not seen by the timer thread
+  scene.cameras.pop('camera1')
+  vehicle.gid = 'c'
+  publisher.publishDue(100.0)
+  assert sorted(projected) == ['a', 'b']
+  assert batches == [2]
+  assert cameras == ['pose1']
+
+  publisher.update(scene, [person], 'person', jdata('t2'), None, FakeCache(), 10.0)
+  publisher.publishDue(101.0)
+  assert sorted(projected) == ['a', 'a', 'b']
+  objects = pubsub.published[-1][1]['objects']
+  assert all('camera_bounds' in obj for obj in objects)
+  assert all('camera_bounds' not in obj_dict for obj_dict in
+             [publisher.scenes['scene1'].objects['person']['a'][1]])
+  return
+
+def test_remove_stale_scenes():
+  """! Verifies scenes and cameras that were removed are forgotten. """
+
+  publisher = RegulatedPublisher(FakePubSub(), False)
+  scene = SimpleNamespace(uid='scene1', regulated_rate=1, cameras={'camera1': None})
+  publisher.update(scene, [], 'person', jdata('t1'), 'camera1', FakeCache(), 10.0)
+  publisher.update(scene, [], 'person', jdata('t1'), 'camera2', FakeCache(), 10.0)
+
+  publisher.removeStale([scene])
+  assert list(publisher.scenes['scene1'].rate) == ['camera1']
+  publisher.removeStale([])
+  assert publisher.scenes == {}
+  return
@@ -0,0 +1,90 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import threading
+
+import numpy as np
+
+from controller import vdms_adapter
+from controller.reid_batcher import ReIDBatcher
+from controller.vdms_adapter import VDMSDatabase
+
+class FakeVDMSClient:
+  """Answers every FindDescriptor with one entity named after its position in the query"""
+
+  def __init__(self, use_tls=True, **kwargs):
+    self.queries = []
+    return
+
+  def connect(self, hostname):
+    return
+
+  def query(self, query, blob=None):
+    self.queries.append((query, blob))
+    responses = []
+    for idx, item in enumerate(query):
+      if 'FindDescriptor' in item:
+        responses.append({'FindDescriptor': {'status': 0, 'returned': 1,
+                                             'entities': [{'uuid': f"match{idx}",
+                                                           'rvid': "1", '_distance': 1.0}]}})
+      else:
+        responses.append({next(iter(item)): {'status': 0}})
+    return responses, []
+
+def test_vdms_batch_transaction(monkeypatch):
+  """! Verifies entries and queries go out as one transaction and results are split per query. """
+
+  monkeypatch.setattr(vdms_adapter.vdms, 'vdms', FakeVDMSClient)
+  database = VDMSDatabase(connections=2)
+  vector = np.zeros((1, 256))
+  results = database.processBatch([("uuid1", 1, "person", [vector, vector])],
+                                  [("person", [vector]), ("vehicle", [vector, vector])])
+
+  queries = [client.queries for client in database.clients]
+  assert sorted(len(sent) for sent in queries) == [0, 1]
+  query, blob = next(sent for sent in queries if sent)[0]
+  assert [next(iter(item)) for item in query] == ["AddDescriptor"] * 2 + ["FindDescriptor"] * 3
+  assert len(blob) == 5
+  assert query[3]['FindDescriptor']['constraints']['type'] == ["==", "vehicle"]
+  assert [[entities[0]['uuid'] for entities in result] for result in results] == \
+    [["match2"], ["match3", "match4"]]
+  return
+
+class RecordingDatabase:
+  connections = 1
+
+  def __init__(self):
+    self.batches = []
+    self.release = threading.Event()
+    return
+
+  def processBatch(self, entries, queries, set_name, k_neighbors):
+    self.release.wait()
+    self.batches.append((entries, queries))
+    return [[[{'uuid': object_type, '_distance': 0.0}]] for object_type, _ in queries]
+
+def test_batcher_groups_requests():
+  """! Verifies requests arriving within the batch window are sent together. """
+
+  database = RecordingDatabase()
+  batcher = ReIDBatcher(database, max_delay=0.5, max_batch=3)
+  futures = [batcher.findSimilarityScores(f"type{idx}", [idx]) for idx in range(2)]
+  batcher.addEntry("uuid1", 1, "person", [0])
+  database.release.set()
+
+  assert [future.result(timeout=5)[0][0]['uuid'] for future in futures] == ["type0", "type1"]
+  batcher.flush()
+  assert database.batches == [([("uuid1", 1, "person", [0])], [("type0", [0]), ("type1", [1])])]
+
+  batcher.addEntry("uuid2", 2, "person", [0])
+  batcher.flush()
+  assert len(database.batches) == 2
+  return
@@ -0,0 +1,102 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import numpy as np
+import pytest
+
+from controller import reid_gallery
+from controller.reid_gallery import InMemoryDatabase, ReIDGallery
+from controller.uuid_manager import UUIDManager
+
+@pytest.fixture(autouse=True)
+def gallery_sets(monkeypatch):
+  monkeypatch.setattr(reid_gallery, 'gallery_sets', {})
+  return
+
+def test_search_matches_brute_force():
+  """! Verifies batched queries return the nearest vectors and squared L2 distances. """
+
+  rng = np.random.default_rng(1)
+  vectors = rng.standard_normal((300, 16)).astype(np.float32)
+  gallery = ReIDGallery(16, max_entries=1000)
+  for idx in range(0, 300, 30):
+    gallery.add(f"uuid{idx}", idx, vectors[idx:idx + 30], 1.0)
+
+  queries = vectors[[5, 150]] + 0.01
+  results = gallery.search(queries, 3, 2.0)
+  for query, neighbors in zip(queries, results):
+    expected = np.sort(((vectors - query) ** 2).sum(axis=1))[:3]
+    assert [item['_distance'] for item in neighbors] == pytest.approx(expected, rel=1e-4, abs=1e-4)
+  assert results[0][0]['uuid'] == "uuid0" and results[1][0]['uuid'] == "uuid150"
+  assert len(gallery.search(queries, 500, 2.0)[0]) == 300
+  return
+
+def test_eviction():
+  """! Verifies a full gallery replaces the least recently used vectors and drops old ones. """
+
+  gallery = ReIDGallery(2, max_entries=4, max_age=10)
+  gallery.add("a", 1, np.array([[0, 0], [0, 1]], np.float32), 1.0)
+  gallery.add("b", 2, np.array([[5, 5], [5, 6]], np.float32), 2.0)
+  gallery.search(np.array([[0, 0]], np.float32), 2, 3.0)
+  gallery.add("c", 3, np.array([[9, 9], [9, 8]], np.float32), 4.0)
+  assert gallery.size == 4
+  assert sorted(gallery.uuids[:gallery.size]) == ["a", "a", "c", "c"]
+  assert gallery.search(np.array([[0, 1]], np.float32), 1, 3.5)[0][0]['_distance'] == 0
+
+  gallery.search(np.array([[9, 9]], np.float32), 2, 13.8)
+  assert sorted(gallery.uuids[:gallery.size]) == ["c", "c"]
+  assert gallery.search(np.array([[0, 0]], np.float32), 1, 30.0) == []
+  return
+
+def test_dimensions_from_first_vectors():
+  """! Verifies a gallery takes its vector length from the first vectors and ignores other lengths. """
+
+  gallery = ReIDGallery(max_entries=10)
+  assert gallery.search(np.ones((1, 8), np.float32), 1, 1.0) == []
+  gallery.add("a", 1, np.ones((2, 8), np.float32), 1.0)
+  assert gallery.dimensions == 8 and gallery.size == 2
+  gallery.add("b", 2, np.ones((1, 4), np.float32), 1.0)
+  assert gallery.size == 2
+  assert gallery.search(np.ones((1, 4), np.float32), 1, 1.0) == []
+  assert gallery.search(np.ones((1, 8), np.float32), 1, 1.0)[0][0]['uuid'] == "a"
+  return
+
+def test_snapshot(tmp_path):
+  """! Verifies galleries are saved to and restored from the snapshot file. """
+
+  snapshot_file = str(tmp_path / "reid.npz")
+  database = InMemoryDatabase(dimensions=4, snapshot_file=snapshot_file)
+  database.connect()
+  database.addEntry("uuid1", 7, "person", [np.ones((1, 4))])
+  database.addEntry("uuid2", 8, "vehicle", [np.zeros((1, 4))])
+  database.gallery_set.save()
+
+  reid_gallery.gallery_sets.clear()
+  database = InMemoryDatabase(snapshot_file=snapshot_file)
+  database.connect()
+  result = database.findSimilarityScores("person", [np.ones((1, 4))])
+  assert result == [[{'uuid': "uuid1", 'rvid': "7", '_distance': 0.0}]]
+  assert database.findSimilarityScores("bicycle", [np.ones((1, 4))]) == []
+  return
+
+def test_uuid_manager_with_memory_database():
+  """! Verifies the tracker ID manager matches objects with the in-memory database. """
+
+  manager = UUIDManager("memory")
+  manager.reid_database.connect()
+  vectors = [np.full((1, 256), 0.1 * idx) for idx in range(4)]
+  manager.reid_database.addEntry("known", 1, "person", vectors)
+
+  scores = manager.reid_database.findSimilarityScores("person", vectors)
+  assert manager.parseQueryResults(scores) == ("known", 0.0)
+  with pytest.raises(ValueError):
+    UUIDManager.configureDatabase("unknown")
+  return
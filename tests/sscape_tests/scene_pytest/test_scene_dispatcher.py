@@ -0,0 +1,114 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import threading
+import time
+
+import pytest
+
+from controller.scene_dispatcher import DROP_NEWEST, DROP_OLDEST, SceneDispatcher
+
+def test_scene_messages_in_order():
+  """! Verifies messages of a scene run in order and one at a time while scenes run in parallel. """
+
+  dispatcher = SceneDispatcher(max_workers=4, max_queue_depth=100)
+  lock = threading.Lock()
+  processed = {'scene1': [], 'scene2': []}
+  running = {'scene1': 0, 'scene2': 0}
+  overlap = []
+
+  def process(scene, idx):
+    with lock:
+      running[scene] += 1
+      overlap.append(running['scene1'] and running['scene2'])
+      assert running[scene] == 1
+    time.sleep(0.001)
+    with lock:
+      processed[scene].append(idx)
+      running[scene] -= 1
+    return
+
+  for idx in range(50):
+    for scene in processed:
+      assert dispatcher.submit(scene, process, scene, idx)
+  dispatcher.waitForComplete()
+
+  assert processed == {'scene1': list(range(50)), 'scene2': list(range(50))}
+  assert any(overlap)
+  stats = dispatcher.stats('scene1')
+  assert stats['processed'] == 50 and stats['dropped'] == 0 and stats['depth'] == 0
+  assert stats['processing_time'] > 0
+  return
+
+@pytest.mark.parametrize("policy,expected", [(DROP_OLDEST, [0, 3, 4]), (DROP_NEWEST, [0, 1, 2])])
+def test_drop_policy(policy, expected):
+  """! Verifies a full scene queue drops the oldest waiting or the new message. """
+
+  dispatcher = SceneDispatcher(max_workers=2, max_queue_depth=3, drop_policy=policy)
+  started = threading.Event()
+  release = threading.Event()
+  processed = []
+
+  def process(idx):
+    if idx == 0:
+      started.set()
+      release.wait()
+    processed.append(idx)
+    return
+
+  dispatcher.submit('scene1', process, 0)
+  started.wait()
+  accepted = [dispatcher.submit('scene1', process, idx) for idx in range(1, 5)]
+  assert dispatcher.stats('scene1')['depth'] == 3
+  release.set()
+  dispatcher.waitForComplete()
+
+  assert processed == expected
+  assert accepted == ([True] * 4 if policy == DROP_OLDEST else [True, True, False, False])
+  assert dispatcher.stats('scene1')['dropped'] == 2
+  return
+
+def test_paused():
+  """! Verifies no message runs while the dispatcher is paused. """
+
+  dispatcher = SceneDispatcher(max_workers=2)
+  processed = []
+  with dispatcher.paused():
+    with dispatcher.paused():
+      dispatcher.submit('scene1', processed.append, 1)
+      time.sleep(0.05)
+      assert processed == []
+  dispatcher.waitForComplete()
+  assert processed == [1]
+
+  dispatcher.removeStale(['scene2'])
+  assert dispatcher.stats('scene1') is None
+  with pytest.raises(ValueError):
+    SceneDispatcher(drop_policy='random')
+  return
+
+def test_depth_one_drop_oldest():
+  """! Verifies a depth 1 queue that drops its waiting message keeps a single ready entry. """
+
+  dispatcher = SceneDispatcher(max_workers=1, max_queue_depth=1)
+  processed = []
+  with dispatcher.paused():
+    assert dispatcher.submit('scene1', processed.append, 1)
+    assert dispatcher.submit('scene1', processed.append, 2)
+    assert list(dispatcher.ready) == ['scene1']
+  dispatcher.waitForComplete()
+  assert processed == [2]
+
+  dispatcher.submit('scene1', processed.append, 3)
+  dispatcher.waitForComplete()
+  assert processed == [2, 3]
+  assert all(worker.is_alive() for worker in dispatcher.workers)
+  return
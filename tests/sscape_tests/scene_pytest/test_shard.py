@@ -0,0 +1,99 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import uuid
+from collections import Counter
+from types import SimpleNamespace
+
+from controller.shard import HashRing, ShardMembership
+from scene_common.mqtt import PubSub
+
+SCENES = [str(uuid.UUID(int=idx * 7919 + 1, version=4)) for idx in range(1000)]
+
+def test_hash_ring_balance():
+  """! Verifies scenes are spread over the instances and only move from or to a changed instance. """
+
+  ring = HashRing(['controller1', 'controller2', 'controller3'])
+  owners = {scene: ring.owner(scene) for scene in SCENES}
+  counts = Counter(owners.values())
+  assert set(counts) == {'controller1', 'controller2', 'controller3'}
+  assert min(counts.values()) > len(SCENES) / 6
+
+  ring.setMembers(['controller1', 'controller2', 'controller3', 'controller4'])
+  moved = [scene for scene in SCENES if ring.owner(scene) != owners[scene]]
+  assert moved and all(ring.owner(scene) == 'controller4' for scene in moved)
+  assert len(moved) < len(SCENES) / 2
+
+  ring.setMembers(['controller1', 'controller3'])
+  moved = [scene for scene in SCENES if ring.owner(scene) != owners[scene]]
+  assert all(owners[scene] == 'controller2' for scene in moved)
+  assert HashRing().owner(SCENES[0]) is None
+  return
+
+class FakePubSub:
+  def __init__(self):
+    self.will = None
+    self.published = []
+    self.callbacks = {}
+    return
+
+  def setWill(self, topic, payload, qos=0, retain=False):
+    self.will = (topic, payload, retain)
+    return
+
+  def addCallback(self, topic, callback, qos=0):
+    self.callbacks[topic] = callback
+    return
+
+  def publish(self, topic, payload, qos=0, retain=False):
+    self.published.append((topic, payload, retain))
+    return SimpleNamespace(wait_for_publish=lambda timeout=None: None)
+
+  def publishData(self, topic, data, qos=0, retain=False):
+    return self.publish(topic, data, qos, retain)
+
+  def receive(self, instance_id, payload):
+    topic = PubSub.formatTopic(PubSub.SYS_CONTROLLER_SHARD, instance_id=instance_id)
+    message = SimpleNamespace(topic=topic, payload=payload)
+    for callback in self.callbacks.values():
+      callback(self, None, message)
+    return
+
+def test_shard_membership():
+  """! Verifies instances join and leave through their retained presence messages. """
+
+  pubsub = FakePubSub()
+  changes = []
+  shard = ShardMembership(pubsub, 'controller1', lambda: changes.append(sorted(shard.ring.members)))
+  topic = PubSub.formatTopic(PubSub.SYS_CONTROLLER_SHARD, instance_id='controller1')
+  assert pubsub.will == (topic, b"", True)
+  assert all(shard.owns(scene) for scene in SCENES[:10])
+
+  shard.join()
+  assert pubsub.published[-1][0] == topic and pubsub.published[-1][2]
+  pubsub.receive('controller1', b'{"id": "controller1"}')
+  pubsub.receive('controller2', b'{"id": "controller2"}')
+  assert changes == [['controller1', 'controller2']]
+  owned = [scene for scene in SCENES if shard.owns(scene)]
+  assert 0 < len(owned) < len(SCENES)
+
+  pubsub.receive('controller1', b'')
+  assert len(pubsub.published) == 2
+  pubsub.receive('controller2', b'')
+  assert changes[-1] == ['controller1']
+  assert all(shard.owns(scene) for scene in SCENES)
+
+  shard.leave()
+  assert pubsub.published[-1] == (topic, b"", True)
+  # The echo of the empty presence message does not announce the instance again
+  pubsub.receive('controller1', b'')
+  assert pubsub.published[-1] == (topic, b"", True)
+  return
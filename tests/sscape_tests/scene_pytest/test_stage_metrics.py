@@ -0,0 +1,98 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import urllib.request
+
+import pytest
+
+from controller import stage_metrics
+from controller.stage_metrics import (DECODE, DROP_LAG, TRACK_CATEGORY,
+                                      TRACKER_QUEUE_WAIT, Histogram, StageMetrics)
+from controller.tracking import Tracking
+
+def test_disabled_records_nothing():
+  """! Verifies a disabled recorder keeps no metrics. """
+
+  metrics = StageMetrics()
+  start = metrics.start()
+  assert start is None
+  assert metrics.record('scene1', DECODE, start) is None
+  metrics.countDrop('scene1', DROP_LAG)
+  assert metrics.histograms == {} and metrics.drops == {}
+  return
+
+def test_histogram_and_summary():
+  """! Verifies stage latencies land in their buckets and are summarized per scene. """
+
+  histogram = Histogram(buckets=(0.01, 0.1))
+  for value in (0.005, 0.05, 0.05, 0.5):
+    histogram.observe(value)
+  assert histogram.counts == [1, 2, 1]
+  assert histogram.quantile(0.5) == 0.1
+  assert histogram.quantile(1.0) == float('inf')
+
+  metrics = StageMetrics()
+  metrics.enable()
+  metrics.observe('scene1', DECODE, 0.002)
+  metrics.observe('scene1', DECODE, 0.004)
+  metrics.observe('scene2', DECODE, 0.1)
+  metrics.countDrop('scene1', DROP_LAG)
+  summary = metrics.summary('scene1')
+  assert summary['stages'][DECODE]['count'] == 2
+  assert summary['stages'][DECODE]['mean'] == pytest.approx(0.003)
+  assert summary['stages'][DECODE]['p95'] == 0.005
+  assert summary['dropped'] == {DROP_LAG: 1}
+
+  metrics.removeStale(['scene1'])
+  assert metrics.summary('scene2') == {'stages': {}, 'dropped': {}}
+  return
+
+def test_metrics_endpoint():
+  """! Verifies the HTTP endpoint serves cumulative buckets in Prometheus format. """
+
+  metrics = StageMetrics()
+  metrics.serve(0, "127.0.0.1")
+  try:
+    metrics.observe('scene1', DECODE, 0.002)
+    metrics.countDrop('scene1', DROP_LAG)
+    port = metrics.server.server_address[1]
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+      body = response.read().decode('utf-8')
+  finally:
+    metrics.stop()
+
+  labels = 'scene="scene1",stage="decode"'
+  assert f'scenescape_controller_stage_seconds_bucket{{{labels},le="0.001"}} 0' in body
+  assert f'scenescape_controller_stage_seconds_bucket{{{labels},le="0.0025"}} 1' in body
+  assert f'scenescape_controller_stage_seconds_bucket{{{labels},le="+Inf"}} 1' in body
+  assert f'scenescape_controller_stage_seconds_count{{{labels}}} 1' in body
+  assert 'scenescape_controller_dropped_messages_total{scene="scene1",reason="lag"} 1' in body
+  return
+
+class FakeTracking(Tracking):
+  def trackCategory(self, objects, when, tracks):
+    return
+
+def test_tracker_stages(monkeypatch):
+  """! Verifies trackers record their queue wait and tracking time for their scene. """
+
+  metrics = StageMetrics()
+  metrics.enable()
+  monkeypatch.setattr(stage_metrics, 'recorder', metrics)
+
+  tracker = FakeTracking()
+  tracker.metrics_key = 'scene1'
+  tracker.processWork([], 1.0, [], metrics.start())
+  tracker.processWork([], 2.0, [])
+  stages = metrics.summary('scene1')['stages']
+  assert stages[TRACKER_QUEUE_WAIT]['count'] == 1
+  assert stages[TRACK_CATEGORY]['count'] == 1
+  return
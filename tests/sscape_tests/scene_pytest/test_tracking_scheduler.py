@@ -0,0 +1,119 @@
+# Copyright (C) 2024 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import threading
+from types import SimpleNamespace
+
+from controller.tracking import Tracking
+from controller.tracking_scheduler import TrackingScheduler
+
+class FakeTracker:
+  def __init__(self, release=None):
+    self.release = release
+    self.started = threading.Event()
+    self.processed = []
+    self.active = 0
+    self.max_active = 0
+    self.lock = threading.Lock()
+    return
+
+  def processWork(self, value):
+    self.started.set()
+    with self.lock:
+      self.active += 1
+      self.max_active = max(self.max_active, self.active)
+    if self.release is not None:
+      self.release.wait()
+    self.processed.append(value)
+    with self.lock:
+      self.active -= 1
+    return
+
+def test_scheduler_rejects_when_full():
+  """! Verifies work is rejected once a tracker queue reaches its depth. """
+
+  release = threading.Event()
+  scheduler = TrackingScheduler(max_workers=2)
+  tracker = FakeTracker(release)
+
+  assert scheduler.submit(tracker, (1,))
+  tracker.started.wait()
+  # By default one frame waits while another is tracked
+  assert scheduler.submit(tracker, (2,))
+  assert not scheduler.submit(tracker, (3,))
+  assert scheduler.queueDepth(tracker) == 2
+
+  release.set()
+  scheduler.waitForComplete(tracker)
+  assert tracker.processed == [1, 2]
+  assert tracker.max_active == 1
+  assert scheduler.queueDepth(tracker) == 0
+  return
+
+def test_scheduler_serves_all_trackers():
+  """! Verifies every tracker gets its work processed by the shared pool. """
+
+  scheduler = TrackingScheduler(max_workers=2, max_queue_depth=4)
+  trackers = [FakeTracker() for _ in range(5)]
+  for tracker in trackers:
+    for value in range(4):
+      assert scheduler.submit(tracker, (value,))
+
+  for tracker in trackers:
+    scheduler.remove(tracker)
+    assert tracker.processed == list(range(4))
+  assert len(scheduler.workers) == 2
+  return
+
+def test_scheduler_merges_when_full():
+  """! Verifies work for a busy tracker is merged into its next batch. """
+
+  release = threading.Event()
+  scheduler = TrackingScheduler(max_workers=1, max_queue_depth=1)
+  tracker = FakeTracker(release)
+  merge = lambda waiting, work: (waiting[0] + work[0],)
+
+  assert scheduler.submit(tracker, ([1],), merge)
+  tracker.started.wait()
+  assert scheduler.submit(tracker, ([2],), merge)
+  assert scheduler.submit(tracker, ([3],), merge)
+  assert scheduler.queueDepth(tracker) == 2
+
+  release.set()
+  scheduler.waitForComplete(tracker)
+  assert tracker.processed == [[1], [2, 3]]
+  return
+
+def test_tracking_merge_batches_keeps_newest_per_camera():
+  """! Verifies 'Tracking.mergeBatches()' replaces detections from the same camera. """
+
+  camera1 = SimpleNamespace(cameraID="camera1")
+  camera2 = SimpleNamespace(cameraID="camera2")
+  old1 = SimpleNamespace(camera=camera1)
+  old2 = SimpleNamespace(camera=camera2)
+  new1 = SimpleNamespace(camera=camera1)
+
+  tracking = Tracking()
+  objects, when, already_tracked, queued, sources = tracking.mergeBatches(
+    ([old1, old2], 1.0, [], 10.0, frozenset([id(camera1), id(camera2)])),
+    ([new1], 2.0, [], 11.0, frozenset([id(camera1)])))
+  assert objects == [old2, new1]
+  assert when == 2.0
+  assert already_tracked == []
+  assert queued == 10.0
+  assert sources == {id(camera1), id(camera2)}
+  assert tracking.merged_batches == 1
+
+  # An empty frame from a camera removes the waiting detections of that camera
+  objects, _, _, _, _ = tracking.mergeBatches((objects, when, [], queued, sources),
+                                              ([], 3.0, [], 12.0, frozenset([id(camera2)])))
+  assert objects == [new1]
+  return
@@ -0,0 +1,93 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import json
+
+import numpy as np
+import pytest
+
+from scene_common import codec
+from scene_common.mqtt import PubSub
+
+@pytest.mark.parametrize("data", ["objData", "objData3D", "singletonData"])
+def test_json_codec_matches_json_module(data, request):
+  """! Verifies the JSON codec produces the same message as the json module. """
+
+  jdata = request.getfixturevalue(data)
+  payload = codec.getCodec("json").encode(jdata)
+  assert json.loads(payload) == jdata
+  assert PubSub.decode(payload) == jdata
+  assert PubSub.decode(json.dumps(jdata)) == jdata
+  return
+
+def test_json_codec_encodes_numpy(objData3D):
+  """! Verifies NumPy arrays and scalars are encoded as plain JSON values. """
+
+  obj = objData3D['objects']['person'][0]
+  obj['translation'] = np.array(obj['translation'])
+  obj['rotation'] = np.array(obj['rotation'], dtype=np.float32)[::2]
+  obj['confidence'] = np.float64(0.75)
+  obj['id'] = np.int64(3)
+
+  decoded = PubSub.decode(codec.getCodec("json").encode(objData3D))
+  obj = decoded['objects']['person'][0]
+  assert obj['translation'] == [0.5, 1.0, -0.23]
+  assert obj['rotation'] == pytest.approx([0.43, 0.12])
+  assert obj['confidence'] == 0.75
+  assert obj['id'] == 3
+  return
+
+def test_msgpack_payload_is_detected(schemaObject, objData):
+  """! Verifies MessagePack payloads decode to the same valid detector message. """
+
+  pytest.importorskip("msgpack")
+  payload = codec.getCodec("msgpack").encode(objData)
+  assert codec.detectCodec(payload).name == "msgpack"
+  decoded = PubSub.decode(payload)
+  assert decoded == objData
+  assert schemaObject.validateMessage("detector", decoded)
+  return
+
+@pytest.mark.parametrize("name", ["json", "msgpack"])
+def test_encode_with_fragments(name, objData3D):
+  """! Verifies payloads assembled from encoded objects match encoding the whole message. """
+
+  if name == "msgpack":
+    pytest.importorskip("msgpack")
+  payload_codec = codec.getCodec(name)
+  objects = objData3D['objects']['person'] * 3
+  fragments = [payload_codec.encodeFragment(obj) for obj in objects]
+
+  payload = payload_codec.encodeWithFragments(objData3D, 'objects', fragments)
+  assert PubSub.decode(payload) == dict(objData3D, objects=objects)
+  payload = payload_codec.encodeWithFragments({}, 'objects', [])
+  assert PubSub.decode(payload) == {'objects': []}
+  return
+
+def test_topic_codec_selection():
+  """! Verifies the codec is chosen by the most recently added matching topic filter. """
+
+  pytest.importorskip("msgpack")
+  pubsub = PubSub(None, None, None, None)
+  pubsub.setTopicCodec("scenescape/data/#", "msgpack")
+  pubsub.setTopicCodec("scenescape/data/camera/+", "json")
+
+  assert pubsub.codecForTopic("scenescape/data/scene/1/person").name == "msgpack"
+  assert pubsub.codecForTopic("scenescape/data/camera/camera1").name == "json"
+  assert pubsub.codecForTopic("scenescape/event/region/1/2/count").name == "json"
+  return
+
+def test_unknown_codec():
+  """! Verifies an unknown codec name is rejected. """
+
+  with pytest.raises(ValueError):
+    codec.getCodec("xml")
+  return
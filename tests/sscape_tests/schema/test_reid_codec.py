@@ -0,0 +1,60 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import base64
+import struct
+
+import numpy as np
+import pytest
+
+from scene_common.reid_codec import (FLOAT16, FLOAT32, INT8, decodeReIDVector,
+                                     encodeReIDVector)
+
+VECTOR = np.random.default_rng(7).standard_normal(256).astype(np.float32)
+
+def test_float32_compatible():
+  """! Verifies float32 vectors keep the format of struct packed vectors and decode without a copy. """
+
+  legacy = base64.b64encode(struct.pack("256f", *VECTOR.tolist())).decode('utf-8')
+  assert encodeReIDVector(VECTOR.reshape(1, -1)) == legacy
+
+  decoded = decodeReIDVector(legacy)
+  assert decoded.shape == (1, 256) and decoded.dtype == np.float32
+  assert np.array_equal(decoded[0], VECTOR)
+  assert not decoded.flags.owndata
+  return
+
+@pytest.mark.parametrize("encoding,size,tolerance", [(FLOAT16, 512, 1e-2), (INT8, 260, 5e-2)])
+def test_compact_encodings(encoding, size, tolerance):
+  """! Verifies compact encodings are signalled in the string, smaller and close to the original. """
+
+  encoded = encodeReIDVector(VECTOR, encoding)
+  prefix, data = encoded.split(":")
+  assert prefix == encoding
+  assert len(base64.b64decode(data)) == size
+
+  decoded = decodeReIDVector(encoded)
+  assert decoded.shape == (1, 256) and decoded.dtype == np.float32
+  assert np.max(np.abs(decoded[0] - VECTOR)) < tolerance * np.max(np.abs(VECTOR))
+  return
+
+def test_variable_dimensions():
+  """! Verifies vectors of any length round trip and unknown encodings are rejected. """
+
+  for encoding in (FLOAT32, FLOAT16, INT8):
+    decoded = decodeReIDVector(encodeReIDVector([0.5, -1.0, 0.25], encoding))
+    assert decoded[0].tolist() == pytest.approx([0.5, -1.0, 0.25], abs=0.01)
+  assert decodeReIDVector(encodeReIDVector(np.zeros(64), INT8)).tolist() == [[0.0] * 64]
+  with pytest.raises(ValueError):
+    encodeReIDVector(VECTOR, "float8")
+  with pytest.raises(ValueError):
+    decodeReIDVector("float8:AAAA")
+  return
@@ -9,10 +9,15 @@
 # This software and the related documents are provided as is, with no express
 # or implied warranties, other than those that are expressly stated in the License.
 
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
 import pytest
 import numpy as np
 
-from scene_common.timestamp import get_iso_time, get_epoch_time
+from scene_common.timestamp import (DATETIME_FORMAT, ClockSync, get_iso_time,
+                                    get_epoch_time)
 
 @pytest.mark.parametrize("input_time, expected_time",
                         [(1678924070.942, "2023-03-15T23:47:50.942Z"),
@@ -61,3 +66,96 @@ def test_restored_epoch_time():
 
   assert np.isclose(epoch_time, restored_epoch_time, rtol=0.001)
   return
+
+@pytest.mark.parametrize("input_time",
+                        [1678924070.9425, 1678924070.9999996, 1678924070.0004996,
+                         -1.25, 0.0, 253402300799.999])
+def test_get_iso_time_matches_datetime(input_time):
+  """! Verifies timestamp.get_iso_time() rounds like datetime.fromtimestamp().
+
+  @param    input_time       Input time as float
+  """
+  utc_time = datetime.fromtimestamp(input_time, tz=timezone.utc)
+  assert get_iso_time(input_time) == f"{utc_time.strftime(DATETIME_FORMAT)[:-3]}Z"
+  return
+
+@pytest.mark.parametrize("input_time",
+                        ["2023-03-15T23:47:50.869Z", "1969-12-31T23:59:58.750Z",
+                         "2023-03-15T23:47:50.869123Z", "2023-03-15T23:47:50.8Z"])
+def test_get_epoch_time_matches_datetime(input_time):
+  """! Verifies timestamp.get_epoch_time() returns the same float as datetime.timestamp().
+
+  @param    input_time       Input time as string in ISO format
+  """
+  utc_time = datetime.strptime(input_time, f"{DATETIME_FORMAT}Z").replace(tzinfo=timezone.utc)
+  assert get_epoch_time(input_time) == utc_time.timestamp()
+  return
+
+@pytest.mark.parametrize("input_time",
+                        ["2023-02-30T23:47:50.869Z", "2023-03-15T24:47:50.869Z",
+                         "2023-03-15T23:47:60.869Z", "2023-03-15T23:47:5a.869Z",
+                         "2023-03-15 23:47:50.869Z"])
+def test_get_epoch_time_invalid(input_time):
+  """! Verifies timestamp.get_epoch_time() rejects invalid timestamps.
+
+  @param    input_time       Input time as string
+  """
+  with pytest.raises(ValueError):
+    get_epoch_time(input_time)
+  return
+
+class FakeNTPClient:
+  def __init__(self, offsets):
+    self.offsets = list(offsets)
+    self.requests = 0
+    return
+
+  def request(self, server, timeout):
+    self.requests += 1
+    offset = self.offsets.pop(0)
+    if offset is None:
+      raise OSError("unreachable")
+    return SimpleNamespace(offset=offset)
+
+def test_clock_sync_without_server():
+  """! Verifies the clock follows the local clock when no NTP server is set. """
+
+  clock = ClockSync(None)
+  clock.start()
+  assert clock.thread is None
+  assert clock.offset == 0.0
+  assert abs(clock.now() - time.time()) < 0.1
+  return
+
+def test_clock_sync_smoothing():
+  """! Verifies offsets are applied at once, smoothed and kept when the server fails. """
+
+  client = FakeNTPClient([5.0, 5.2, None, 20.0])
+  clock = ClockSync("ntpserv", smoothing=0.5, client=client)
+  assert clock.sync()
+  assert clock.offset == pytest.approx(5.0, abs=0.01)
+  assert clock.now() - time.time() == pytest.approx(5.0, abs=0.01)
+
+  assert clock.sync()
+  assert clock.offset == pytest.approx(5.1, abs=0.01)
+  assert not clock.sync()
+  assert clock.offset == pytest.approx(5.1, abs=0.01)
+  # Large changes are not smoothed
+  assert clock.sync()
+  assert clock.offset == pytest.approx(20.0, abs=0.01)
+  return
+
+def test_clock_sync_background():
+  """! Verifies the offset is refreshed in the background after the first sync on start. """
+
+  client = FakeNTPClient([1.0] + [2.0] * 100)
+  clock = ClockSync("ntpserv", interval=0.01, smoothing=1.0, client=client)
+  clock.start()
+  assert client.requests >= 1
+  deadline = time.monotonic() + 5
+  while client.requests < 3 and time.monotonic() < deadline:
+    time.sleep(0.01)
+  clock.stop()
+  assert client.requests >= 3
+  assert clock.offset == pytest.approx(2.0, abs=0.01)
+  return
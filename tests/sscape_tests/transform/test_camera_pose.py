@@ -0,0 +1,132 @@
+# Copyright (C) 2025 Intel Corporation
+#
+# This software and the related documents are Intel copyrighted materials,
+# and your use of them is governed by the express license under which they
+# were provided to you ("License"). Unless the License provides otherwise,
+# you may not use, modify, copy, publish, distribute, disclose or transmit
+# this software or the related documents without Intel's prior written permission.
+#
+# This software and the related documents are provided as is, with no express
+# or implied warranties, other than those that are expressly stated in the License.
+
+import cv2
+import numpy as np
+import open3d as o3d
+import pytest
+from scipy.spatial.transform import Rotation
+
+from scene_common.geometry import Point, Rectangle, Size
+from scene_common.transform import (CameraIntrinsics, CameraPose, MapRaycaster,
+                                    rotationToTarget)
+
+POINTS = [[1.0, 2.0, 0.0], [3.5, 1.2, 0.4], [2.2, 4.8, 1.1], [0.3, 0.6, 0.0]]
+SIZES = [[0.5, 1.8], [0.6, 1.6], [2.0, 1.5], [0.4, 1.0]]
+
+def createPose(distortion):
+  intrinsics = CameraIntrinsics([905, 905, 640, 360], distortion)
+  pose = {'camera points': [[278, 61], [621, 132], [559, 460], [66, 289]],
+          'map points': [[1.0, 1.05], [3.04, 1.08], [3.05, 4.01], [1.0, 3.98]],
+          'resolution': [1280, 720]}
+  return CameraPose(pose, intrinsics)
+
+@pytest.mark.parametrize("distortion", [None, [-0.2, 0.05, 0.001, 0.002, 0.0]])
+def test_projectWorldPointsToCameraPixels(distortion):
+  """! Verifies batched projection matches cv2.projectPoints for every point. """
+
+  pose = createPose(distortion)
+  pixels = pose.projectWorldPointsToCameraPixels(POINTS)
+  assert pixels.shape == (len(POINTS), 2)
+  for point, pixel in zip(POINTS, pixels):
+    expected, _ = cv2.projectPoints(np.array(point), pose._extrinsicsRVecs, pose._extrinsicsTVecs,
+                                    pose.intrinsics.intrinsics, pose.intrinsics.distortion)
+    assert pixel == pytest.approx(expected.reshape(2), abs=1e-6)
+    single = pose.projectWorldPointToCameraPixels(Point(point))
+    assert [single.x, single.y] == pytest.approx(expected.reshape(2), abs=1e-6)
+  assert pose.projectWorldPointsToCameraPixels(np.empty((0, 3))).shape == (0, 2)
+  return
+
+@pytest.mark.parametrize("distortion", [None, [-0.2, 0.05, 0.001, 0.002, 0.0]])
+def test_projectEstimatedBoundsToCameraPixelsBatch(distortion):
+  """! Verifies batched bounds match the bounds estimated one object at a time. """
+
+  pose = createPose(distortion)
+  bounds = pose.projectEstimatedBoundsToCameraPixelsBatch(POINTS, SIZES)
+  for point, size, bound in zip(POINTS, SIZES, bounds):
+    expected = pose.projectEstimatedBoundsToCameraPixels(Point(point), Size(*size))
+    assert bound == pytest.approx([expected.x, expected.y, expected.width, expected.height], abs=1e-6)
+  return
+
+BOXES = [[278, 61, 40, 120], [621, 132, 55, 160], [559, 400, 80, 60], [66, 289, 20, 30]]
+
+@pytest.mark.parametrize("distortion", [None, [-0.2, 0.05, 0.001, 0.002, 0.0]])
+def test_infer3DCoordsFrom2DDetections(distortion):
+  """! Verifies batched normalization matches normalizing each box separately. """
+
+  pose = createPose(distortion)
+  boxes = pose.intrinsics.infer3DCoordsFrom2DDetections(BOXES)
+  for box, normalized in zip(BOXES, boxes):
+    rect = Rectangle({'x': box[0], 'y': box[1], 'width': box[2], 'height': box[3]})
+    expected = pose.intrinsics.infer3DCoordsFrom2DDetection(rect)
+    assert normalized == pytest.approx([expected.x, expected.y, expected.width, expected.height])
+  assert pose.intrinsics.infer3DCoordsFrom2DDetections([]).shape == (0, 4)
+  return
+
+def test_projectBoundsBatch():
+  """! Verifies batched bounds projection matches projecting each box separately. """
+
+  pose = createPose(None)
+  boxes = pose.intrinsics.infer3DCoordsFrom2DDetections(BOXES)
+  corners, sizes, base_angles = pose.projectBoundsBatch(boxes)
+  for box, corner, size, base_angle in zip(boxes, corners, sizes, base_angles):
+    rect = Rectangle({'x': box[0], 'y': box[1], 'width': box[2], 'height': box[3]})
+    bounds, shadow, expected_angle = pose.projectBounds(rect)
+    far_l, far_r, br, bl = shadow
+    expected = np.array([pt.asNumpyCartesian for pt in (bl, br, far_l, far_r)])
+    assert corner == pytest.approx(expected)
+    assert size == pytest.approx([bounds.width, bounds.height])
+    assert base_angle == pytest.approx(expected_angle)
+    world = pose.cameraPointsToWorldPoints([rect.bottomLeft.asNumpyCartesian])
+    assert world[0] == pytest.approx(pose.cameraPointToWorldPoint(rect.bottomLeft).asNumpyCartesian)
+  return
+
+def projectToMapInCameraCoordinates(pose, obj_T, obj_R, map_obj):
+  """Reference projection that moves the map into camera coordinates for each detection"""
+  cam_R = Rotation.from_quat(np.radians(pose.quaternion_rotation)).as_matrix()
+  map_obj = pose.transformSceneToCameraCoordinates(map_obj.clone(),
+                                                   pose.translation.asNumpyCartesian, cam_R)
+  scene = o3d.t.geometry.RaycastingScene()
+  scene.add_triangles(map_obj)
+  rcast = scene.cast_rays(o3d.core.Tensor([[0, 0, 0, *obj_T]], dtype=o3d.core.Dtype.Float32))
+  distance_ratio = rcast['t_hit'].numpy()[0]
+  if distance_ratio == np.inf:
+    return obj_T, obj_R
+  obj_R = Rotation.from_quat(obj_R).as_matrix()
+  normal = rcast['primitive_normals'].numpy()[0]
+  obj_R = Rotation.from_matrix(rotationToTarget(obj_R[:, 2], normal).as_matrix() @ obj_R)
+  return (distance_ratio * np.array(obj_T)).tolist(), obj_R.as_quat()
+
+def test_projectToMapBatch():
+  """! Verifies casting all rays against the map in world coordinates matches the camera coordinate projection. """
+
+  pose = createPose(None)
+  floor = o3d.t.geometry.TriangleMesh.create_box(100.0, 100.0, 0.5)
+  map_T = [-50.0, -50.0, -0.5]
+  raycaster = MapRaycaster.fromSceneMap(floor, map_T, [0.0, 0.0, 0.0])
+  assert raycaster.isFor(floor, map_T, [0.0, 0.0, 0.0])
+  assert not raycaster.isFor(floor, [0.0, 0.0, 0.0], [0.0, 0.0, 0.0])
+  assert not raycaster.isFor(floor.clone(), map_T, [0.0, 0.0, 0.0])
+
+  translations = [[0.1, 0.2, 1.0], [-0.3, 0.1, 2.0], [0.0, -0.4, 1.5], [0.2, 0.3, -1.0]]
+  rotations = [[0.0, 0.0, 0.0, 1.0], [0.0, 0.3826834, 0.0, 0.9238795],
+               [0.2, 0.1, 0.0, 0.9746794], [0.0, 0.0, 0.0, 1.0]]
+  world_floor = floor.clone().translate(o3d.core.Tensor(map_T, dtype=o3d.core.Dtype.Float32))
+  batch_T, batch_R = pose.projectToMapBatch(translations, rotations, raycaster)
+
+  hits = 0
+  for obj_T, obj_R, result_T, result_R in zip(translations, rotations, batch_T, batch_R):
+    expected_T, expected_R = projectToMapInCameraCoordinates(pose, obj_T, obj_R, world_floor)
+    hits += expected_T is not obj_T
+    assert result_T == pytest.approx(expected_T, abs=1e-4)
+    assert np.asarray(result_R) == pytest.approx(np.asarray(expected_R), abs=1e-4)
+  assert hits > 0
+  return